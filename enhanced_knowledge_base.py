@@ -17,9 +17,33 @@ This script provides advanced knowledge collection for multi-agent system archit
 # Relevance thresholds - lower value includes more content (range 0-1)
 RELEVANCE_THRESHOLD = 0.35  # Min cosine similarity to be considered relevant
 
-# Rate limiting (requests per second)
+# Rate limiting (requests per second to each host)
 RATE_LIMIT = 1
 
+# Maximum concurrent requests across all hosts
+MAX_CONCURRENCY = 16
+
+# Honor robots.txt rules and crawl delays when following links
+RESPECT_ROBOTS_TXT = True
+
+# Revisit processed sources older than this many days (None never revisits them)
+REFRESH_AGE_DAYS = None
+
+# Worker processes converting and analyzing fetched pages (0 uses every CPU core)
+ANALYSIS_WORKERS = 0
+
+# Relevance scoring: documents are split into chunks of this many characters,
+# up to a maximum number of chunks, and the chunk scores are pooled. A chunk is
+# about as much text as the model reads at once (256 tokens)
+RELEVANCE_CHUNK_SIZE = 1000
+RELEVANCE_MAX_CHUNKS = 50
+# "mean" averages the chunk scores, on the scale RELEVANCE_THRESHOLD was tuned for;
+# "max" takes the best chunk, which scores higher and needs a higher threshold
+RELEVANCE_POOLING = "mean"
+
+# Texts encoded per model call when scoring relevance
+RELEVANCE_BATCH_SIZE = 64
+
 # File type extensions to process
 VALID_EXTENSIONS = ['.md', '.txt', '.html', '.pdf', '.doc', '.docx']
 
@@ -32,6 +56,7 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 
 import os
 import sys
+import asyncio
 import argparse
 import logging
 import json
@@ -44,16 +69,23 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
 import concurrent.futures
+import multiprocessing
 import shutil
 import networkx as nx
 import numpy as np
 
-import requests
 from bs4 import BeautifulSoup, Tag
 import markdown
 from markdownify import markdownify
 from urllib.parse import urljoin, urlparse
 
+# Use the faster lxml parser when it is installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 # If available, use sentence-transformers for semantic processing
 try:
     from sentence_transformers import SentenceTransformer
@@ -82,15 +114,31 @@ except ImportError:
             logger.addHandler(file_handler)
         return logger
 
+from src.utils.web_crawler import AsyncCrawler
+from src.utils.keyword_matcher import KeywordMatcher
+from src.utils.http_cache import HTTPCache, CachedResponse
+
+# Shared on-disk embedding cache, so unchanged documents are not re-encoded
+try:
+    from src.config.config import RAG_SETTINGS
+    from src.utils.embedding_cache import get_embedding_cache, cache_model_key
+    HAVE_EMBEDDING_CACHE = True
+except ImportError:
+    HAVE_EMBEDDING_CACHE = False
+
 # Set up logging
 logger = setup_logger(__name__, "knowledge_base_builder.log")
 
+# Model used for semantic relevance filtering
+SEMANTIC_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
 # Directory settings
 RESOURCES_DIR = os.path.join(project_root, "resources")
 TEMP_DIR = os.path.join(project_root, "temp_downloads")
 CONFIG_DIR = os.path.join(project_root, "kb_config")
 RELATIONSHIP_DIR = os.path.join(project_root, "kb_relationships")
 CODE_EXAMPLES_DIR = os.path.join(project_root, "kb_code_examples")
+HTTP_CACHE_DIR = os.path.join(project_root, "kb_http_cache")
 
 # Architecture patterns to identify
 ARCHITECTURE_PATTERNS = {
@@ -316,12 +364,343 @@ CLOUD ARCHITECTURE PATTERNS
    - Service mesh for enhanced network communication
 """
 
+#######################
+# PAGE ANALYSIS STAGE
+#######################
+
+# One automaton over the keywords of every pattern category, built once
+_PATTERN_KEYWORDS = [(pattern_type, keyword) for pattern_type, keywords in ARCHITECTURE_PATTERNS.items()
+                     for keyword in keywords]
+PATTERN_MATCHER = KeywordMatcher(keyword for _, keyword in _PATTERN_KEYWORDS)
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+
+def relevance_chunks(text: str, chunk_size: int = RELEVANCE_CHUNK_SIZE,
+                     max_chunks: int = RELEVANCE_MAX_CHUNKS) -> List[str]:
+    """Split text into the chunks scored for relevance; empty text gives one empty chunk."""
+    return [text[start:start + chunk_size]
+            for start in range(0, max(len(text), 1), chunk_size)][:max_chunks]
+
+
+def identify_architecture_patterns(text: str) -> Dict[str, List[str]]:
+    """Identify architecture patterns in the text across multiple categories.
+    
+    The text is split into sentences once and each sentence is scanned once
+    for all keywords.
+    
+    Returns:
+        Up to 5 unique sentences per category, taken keyword by keyword in the
+        order of ARCHITECTURE_PATTERNS and in text order for each keyword
+    """
+    sentences = [sentence.strip() for sentence in SENTENCE_SPLIT.split(text)]
+    
+    # Indexes of the sentences containing each keyword
+    keyword_sentences: Dict[int, List[int]] = {}
+    for index, sentence in enumerate(sentences):
+        for keyword_id in PATTERN_MATCHER.matched(sentence):
+            keyword_sentences.setdefault(keyword_id, []).append(index)
+    
+    # Keyword ids follow the category order, so categories come out in order
+    results: Dict[str, List[str]] = {}
+    seen = set()
+    for keyword_id, (pattern_type, _) in enumerate(_PATTERN_KEYWORDS):
+        matches = results.get(pattern_type, [])
+        for index in keyword_sentences.get(keyword_id, ()):
+            # Only keep the first 5 matches to avoid overwhelming
+            if len(matches) >= 5:
+                break
+            if (pattern_type, sentences[index]) not in seen:
+                seen.add((pattern_type, sentences[index]))
+                matches.append(sentences[index])
+        if matches:
+            results[pattern_type] = matches
+    
+    return results
+
+
+def extract_code_blocks(content: str, source: str) -> List[Dict[str, Any]]:
+    """Extract code blocks from markdown or HTML content."""
+    code_blocks = []
+    
+    # Extract markdown-style code blocks
+    markdown_pattern = r'```(?P<language>\w*)\n(?P<code>.*?)\n```'
+    for match in re.finditer(markdown_pattern, content, re.DOTALL):
+        language = match.group('language') or 'unknown'
+        code = match.group('code')
+        
+        # Analyze the code to determine what it demonstrates
+        patterns = identify_architecture_patterns(code)
+        
+        code_blocks.append({
+            'language': language,
+            'code': code,
+            'source': source,
+            'patterns': patterns
+        })
+    
+    # Extract HTML code blocks if BeautifulSoup is available
+    try:
+        soup = BeautifulSoup(content, HTML_PARSER)
+        for pre in soup.find_all('pre'):
+            code_tag = pre.find('code')
+            if code_tag:
+                language = code_tag.get('class', ['unknown'])[0].replace('language-', '')
+                code = code_tag.text
+                
+                # Analyze the code
+                patterns = identify_architecture_patterns(code)
+                
+                code_blocks.append({
+                    'language': language,
+                    'code': code,
+                    'source': source,
+                    'patterns': patterns
+                })
+    except Exception as e:
+        logger.debug(f"Error parsing HTML code blocks: {str(e)}")
+    
+    return code_blocks
+
+
+def _analyze_article(url: str, html: str) -> Dict[str, Any]:
+    """Convert an article to markdown with its title and source."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    
+    # Extract all links before removing elements
+    links = []
+    for a_tag in soup.find_all('a', href=True):
+        href = a_tag['href']
+        if href.startswith('#'):
+            continue
+        
+        # Convert to absolute URL
+        abs_link = urljoin(url, href)
+        links.append(abs_link)
+    
+    # Remove unwanted elements
+    for element in soup.select('nav, header, footer, aside, script, style, [role="navigation"]'):
+        element.decompose()
+    
+    # Extract the title
+    title_tag = soup.find('title')
+    title = title_tag.text if title_tag else "Untitled"
+    
+    # Find the main content
+    main_content = None
+    for selector in ['main', 'article', '.post-content', '.article-content', '.content']:
+        main_content = soup.select_one(selector)
+        if main_content:
+            break
+    
+    if not main_content:
+        main_content = soup.find('body')
+    
+    # Convert HTML to markdown
+    markdown_content = markdownify(str(main_content))
+    
+    # Create a clean title for the filename
+    clean_title = re.sub(r'[^\w\s-]', '', title).strip().lower()
+    clean_title = re.sub(r'[-\s]+', '-', clean_title)
+    
+    # Create a unique filename
+    url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+    filename = f"{clean_title}-{url_hash}.md"
+    
+    # Add title and source to the markdown content
+    final_content = f"# {title}\n\nSource: {url}\n\n{markdown_content}"
+    
+    return {
+        "title": title,
+        "links": links,
+        "filename": filename,
+        "markdown_content": markdown_content,
+        "final_content": final_content,
+        "relevance_text": final_content,
+        "code_blocks": extract_code_blocks(final_content, url),
+        "patterns": identify_architecture_patterns(final_content)
+    }
+
+
+def _analyze_doc_page(url: str, html: str, base_url: str) -> Dict[str, Any]:
+    """Convert a documentation page to markdown and collect its same-site links."""
+    # Extract links first
+    soup = BeautifulSoup(html, HTML_PARSER)
+    links = []
+    
+    for a_tag in soup.find_all('a', href=True):
+        link = a_tag['href']
+        
+        # Skip fragment links
+        if link.startswith('#'):
+            continue
+            
+        # Create absolute URL
+        absolute_url = urljoin(url, link)
+        
+        # Only consider links on the same domain
+        if urlparse(absolute_url).netloc == urlparse(base_url).netloc:
+            links.append(absolute_url)
+    
+    # Extract title
+    title_tag = soup.find('title')
+    title = title_tag.text if title_tag else "Untitled"
+    
+    # Create a filename
+    parsed_url = urlparse(url)
+    path_parts = parsed_url.path.strip('/').split('/')
+    filename = '-'.join(path_parts) if path_parts and path_parts[0] else parsed_url.netloc
+    url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+    filename = f"{filename}-{url_hash}.md"
+    
+    # Find the main content
+    main_content = None
+    for selector in ['main', 'article', '.documentation', '.docs-content', '.content']:
+        main_content = soup.select_one(selector)
+        if main_content:
+            break
+    
+    if not main_content:
+        main_content = soup.find('body')
+    
+    # Convert to markdown
+    markdown_content = markdownify(str(main_content))
+    
+    return {
+        "title": title,
+        "links": links,
+        "filename": filename,
+        "markdown_content": markdown_content,
+        "relevance_text": markdown_content,
+        "code_blocks": extract_code_blocks(markdown_content, url),
+        "patterns": identify_architecture_patterns(markdown_content)
+    }
+
+
+def _analyze_link_page(url: str, html: str) -> Dict[str, Any]:
+    """Get the title and main text of a discovered page."""
+    link_soup = BeautifulSoup(html, HTML_PARSER)
+    link_title = link_soup.find('title')
+    title_text = link_title.get_text() if link_title else url
+    
+    # Get main content
+    main_content = None
+    for selector in ['main', 'article', '.content']:
+        main_content = link_soup.select_one(selector)
+        if main_content:
+            break
+    
+    if not main_content:
+        main_content = link_soup.find('body')
+    
+    # Convert to text for relevance scoring
+    return {
+        "title": title_text,
+        "relevance_text": main_content.get_text() if main_content else None
+    }
+
+
+def analyze_page(kind: str, url: str, html: str, base_url: Optional[str] = None) -> Dict[str, Any]:
+    """Parse a fetched page, convert it to markdown and analyze it.
+    
+    Runs in worker processes. Code blocks and patterns are extracted before
+    relevance is known, so the main process only scores and saves.
+    
+    Args:
+        kind: "article", "documentation" or "link"
+        url: Page URL
+        html: Page HTML
+        base_url: Site root, for documentation pages
+        
+    Returns:
+        Page title, links, filename and content, plus "relevance_text" to score
+    """
+    if kind == "article":
+        return _analyze_article(url, html)
+    if kind == "documentation":
+        return _analyze_doc_page(url, html, base_url)
+    if kind == "link":
+        return _analyze_link_page(url, html)
+    raise ValueError(f"Unknown page kind: {kind}")
+
+
+class PageAnalysisStage:
+    """Pipeline stage analyzing fetched pages in a process pool.
+    
+    Fetch tasks submit pages through a bounded queue, so fetching continues
+    while earlier pages are parsed, and stalls instead of buffering without
+    limit when parsing falls behind.
+    """
+    
+    def __init__(self, relevance_fn, workers: int = ANALYSIS_WORKERS, queue_size: Optional[int] = None):
+        """Initialize the stage.
+        
+        Args:
+            relevance_fn: Function scoring the relevance of a page's text
+            workers: Worker processes; 0 uses every CPU core
+            queue_size: Pages waiting for analysis; defaults to twice the workers
+        """
+        self.relevance_fn = relevance_fn
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * self.workers
+        self._pool = None
+        self._queue = None
+        self._relevance_lock = None
+        self._consumers = []
+    
+    async def __aenter__(self) -> "PageAnalysisStage":
+        # Spawn rather than fork: the main process may hold a loaded model with live torch threads
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers,
+                                                            mp_context=multiprocessing.get_context("spawn"))
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._relevance_lock = asyncio.Lock()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._pool.shutdown()
+    
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            kind, url, html, base_url, future = await self._queue.get()
+            try:
+                page = await loop.run_in_executor(self._pool, analyze_page, kind, url, html, base_url)
+                relevance = None
+                if page["relevance_text"] is not None:
+                    # One model call at a time, off the event loop so fetching continues
+                    async with self._relevance_lock:
+                        relevance = await loop.run_in_executor(None, self.relevance_fn, page["relevance_text"])
+                if not future.done():
+                    future.set_result((page, relevance))
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+    
+    async def analyze(self, kind: str, url: str, html: str,
+                      base_url: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[float]]:
+        """Analyze a page and score its relevance.
+        
+        Returns:
+            The analysis from analyze_page and the relevance score
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((kind, url, html, base_url, future))
+        return await future
+
+
 class EnhancedKnowledgeBaseBuilder:
     """Enhanced builder for the Domain-SC knowledge base with advanced features."""
     
     def __init__(self, resources_dir: str = RESOURCES_DIR, config_dir: str = CONFIG_DIR, 
                  temp_dir: str = TEMP_DIR, relationship_dir: str = RELATIONSHIP_DIR,
-                 code_examples_dir: str = CODE_EXAMPLES_DIR):
+                 code_examples_dir: str = CODE_EXAMPLES_DIR, http_cache_dir: str = HTTP_CACHE_DIR,
+                 refresh_age_days: Optional[float] = REFRESH_AGE_DAYS):
         """Initialize the enhanced knowledge base builder.
         
         Args:
@@ -330,6 +709,9 @@ class EnhancedKnowledgeBaseBuilder:
             temp_dir: Directory for temporary downloads
             relationship_dir: Directory to store relationship data
             code_examples_dir: Directory to store extracted code examples
+            http_cache_dir: Directory of the HTTP response cache
+            refresh_age_days: Revisit processed sources older than this many days;
+                None never revisits them
         """
         self.resources_dir = resources_dir
         self.config_dir = config_dir
@@ -341,19 +723,39 @@ class EnhancedKnowledgeBaseBuilder:
         for directory in [resources_dir, config_dir, temp_dir, relationship_dir, code_examples_dir]:
             os.makedirs(directory, exist_ok=True)
         
+        # Cached responses let refreshes skip pages that did not change
+        self.http_cache = HTTPCache(http_cache_dir)
+        self.refresh_age_days = refresh_age_days
+        self.force_refresh = False
+        self.unchanged_files = set()
+        
+        # Process-pool page analysis, running while remote sources are fetched
+        self._analysis_stage: Optional[PageAnalysisStage] = None
+        
         # Initialize semantic model if available
         self.semantic_model = None
         if HAVE_SENTENCE_TRANSFORMERS:
             try:
-                self.semantic_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+                self.semantic_model = SentenceTransformer(SEMANTIC_MODEL)
                 logger.info("Loaded sentence transformer model for semantic filtering")
             except Exception as e:
                 logger.warning(f"Failed to load sentence transformer: {str(e)}")
         
-        # Compute reference embedding for architecture knowledge
+        self.embedding_cache = None
+        if self.semantic_model and HAVE_EMBEDDING_CACHE and RAG_SETTINGS.get("embedding_cache_dir"):
+            self.embedding_cache = get_embedding_cache(RAG_SETTINGS["embedding_cache_dir"])
+        
+        # Compute reference embedding for architecture knowledge, normalized once.
+        # It is kept in the embedding cache, so new builders read it from disk;
+        # page chunks are scored once and not cached.
         self.reference_embedding = None
         if self.semantic_model:
-            self.reference_embedding = self.semantic_model.encode(ARCHITECTURE_REFERENCE)
+            if self.embedding_cache is not None:
+                reference = self.embedding_cache.embed(cache_model_key(SEMANTIC_MODEL), [ARCHITECTURE_REFERENCE],
+                                                       self._encode_many)[0]
+            else:
+                reference = self._encode_many([ARCHITECTURE_REFERENCE])[0]
+            self.reference_embedding = reference / np.linalg.norm(reference)
         
         # Initialize relationship graph
         self.relationship_graph = nx.DiGraph()
@@ -441,11 +843,20 @@ class EnhancedKnowledgeBaseBuilder:
             logger.error(f"Error saving code examples: {str(e)}")
     
     def _source_already_processed(self, url: str) -> bool:
-        """Check if a source has already been processed."""
-        return url in [s.get("url") for s in self.sources.get("sources", [])]
+        """Check if a source has already been processed and is not due for a refresh."""
+        for source in self.sources.get("sources", []):
+            if source.get("url") == url:
+                if self.refresh_age_days is None:
+                    return True
+                try:
+                    age = datetime.now() - datetime.fromisoformat(source.get("timestamp", ""))
+                except ValueError:
+                    return False
+                return age.total_seconds() < self.refresh_age_days * 86400
+        return False
     
     def _add_processed_source(self, url: str, title: str, doc_type: str, relevance_score: float = 0.0, status: str = "success"):
-        """Add a source to the processed list."""
+        """Add a source to the processed list, replacing an earlier record of it."""
         source_info = {
             "url": url,
             "title": title,
@@ -454,27 +865,106 @@ class EnhancedKnowledgeBaseBuilder:
             "status": status,
             "timestamp": datetime.now().isoformat()
         }
-        self.sources.setdefault("sources", []).append(source_info)
+        sources = self.sources.setdefault("sources", [])
+        for i, source in enumerate(sources):
+            if source.get("url") == url:
+                sources[i] = source_info
+                return
+        sources.append(source_info)
+    
+    def _remember_page_result(self, url: str, doc_type: str, title: str, relevance: float,
+                              output_path: Optional[str], links: Optional[List[str]] = None):
+        """Record the outcome of processing a page, for reuse while its content is unchanged."""
+        try:
+            self.http_cache.set_result(url, {
+                "type": doc_type,
+                "title": title,
+                "relevance": relevance,
+                "output_path": output_path,
+                "links": links or []
+            })
+        except Exception as e:
+            logger.debug(f"Error caching result for {url}: {str(e)}")
+    
+    def _reuse_page_result(self, response: CachedResponse) -> Optional[Dict[str, Any]]:
+        """Get the recorded outcome of a page whose content did not change.
+        
+        Returns None when the page has to be processed: its content changed,
+        nothing was recorded, a refresh is forced, or its output file is gone.
+        """
+        result = response.entry.get("result")
+        if response.changed or not result or self.force_refresh:
+            return None
+        output_path = result.get("output_path")
+        if output_path and not os.path.exists(output_path):
+            return None
+        
+        if output_path:
+            self.relevance_scores[output_path] = result["relevance"]
+            self.unchanged_files.add(output_path)
+        status = "success" if output_path else "skipped_irrelevant"
+        self._add_processed_source(response.url, result["title"], result["type"], result["relevance"], status=status)
+        logger.info(f"Unchanged since last fetch ({response.state}): {response.url}")
+        return result
+    
+    def _encode_many(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in batched model calls, normalized like the indexing pipeline."""
+        return np.asarray(
+            self.semantic_model.encode(texts, batch_size=RELEVANCE_BATCH_SIZE, normalize_embeddings=True),
+            dtype=np.float32
+        )
     
     def _calculate_relevance(self, text: str) -> float:
         """Calculate the relevance of text to multi-agent systems architecture."""
+        return self._calculate_relevance_many([text])[0]
+    
+    def _calculate_relevance_many(self, texts: List[str], pooling: str = RELEVANCE_POOLING) -> List[float]:
+        """Calculate the relevance of many texts to multi-agent systems architecture.
+        
+        Each text is split into chunks. The chunks of all texts are encoded
+        together and scored against the reference with one matrix-vector product.
+        
+        Args:
+            texts: Texts to score
+            pooling: "mean" averages the scores of a text's chunks, "max" takes
+                the score of its most relevant chunk
+            
+        Returns:
+            Relevance score per text
+        """
+        if pooling not in ("mean", "max"):
+            raise ValueError(f"Unknown relevance pooling: {pooling}")
+        
         if not self.semantic_model or self.reference_embedding is None:
             # If semantic model not available, use keyword-based scoring
-            return self._keyword_relevance(text)
+            return [self._keyword_relevance(text) for text in texts]
+        
+        if not texts:
+            return []
         
         try:
-            # Get embedding for the text
-            text_embedding = self.semantic_model.encode(text[:10000])  # Limit to first 10k chars
+            # Start of each text's chunks; every text has at least one chunk
+            chunks, offsets = [], []
+            for text in texts:
+                offsets.append(len(chunks))
+                chunks.extend(relevance_chunks(text))
             
-            # Calculate cosine similarity with reference
-            similarity = np.dot(text_embedding, self.reference_embedding) / (
-                np.linalg.norm(text_embedding) * np.linalg.norm(self.reference_embedding)
-            )
+            embeddings = self._encode_many(chunks)
+            embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
             
-            return float(similarity)
+            chunk_scores = embeddings @ self.reference_embedding
+            if pooling == "max":
+                scores = np.maximum.reduceat(chunk_scores, offsets)
+            else:
+                # Each chunk score is a cosine similarity like the single-embedding
+                # score used before chunking, so their average keeps that scale
+                counts = np.diff(offsets + [len(chunks)])
+                scores = np.add.reduceat(chunk_scores, offsets) / counts
+            
+            return [float(score) for score in scores]
         except Exception as e:
             logger.warning(f"Error calculating semantic relevance: {str(e)}")
-            return self._keyword_relevance(text)
+            return [self._keyword_relevance(text) for text in texts]
     
     def _keyword_relevance(self, text: str) -> float:
         """Calculate relevance based on keyword presence when semantic model not available."""
@@ -499,88 +989,11 @@ class EnhancedKnowledgeBaseBuilder:
     
     def _identify_architecture_patterns(self, text: str) -> Dict[str, List[str]]:
         """Identify architecture patterns in the text across multiple categories."""
-        results = {}
-        text_lower = text.lower()
-        
-        for pattern_type, pattern_keywords in ARCHITECTURE_PATTERNS.items():
-            matches = []
-            
-            # Search for each keyword in the pattern type
-            for keyword in pattern_keywords:
-                if keyword.lower() in text_lower:
-                    # Find the context around the keyword (sentence or paragraph)
-                    try:
-                        # Try to find a sentence containing the keyword
-                        sentences = re.split(r'(?<=[.!?])\s+', text)
-                        for sentence in sentences:
-                            if keyword.lower() in sentence.lower():
-                                matches.append(sentence.strip())
-                    except Exception:
-                        # If regex fails, just take the surrounding text
-                        keyword_pos = text_lower.find(keyword.lower())
-                        if keyword_pos >= 0:
-                            start_pos = max(0, keyword_pos - 100)
-                            end_pos = min(len(text), keyword_pos + len(keyword) + 100)
-                            context = text[start_pos:end_pos].strip()
-                            matches.append(context)
-            
-            if matches:
-                # Deduplicate matches while preserving order
-                unique_matches = []
-                seen = set()
-                for match in matches:
-                    match_hash = hashlib.md5(match.encode()).hexdigest()
-                    if match_hash not in seen:
-                        seen.add(match_hash)
-                        unique_matches.append(match)
-                
-                # Only keep the first 5 matches to avoid overwhelming
-                results[pattern_type] = unique_matches[:5]
-        
-        return results
+        return identify_architecture_patterns(text)
     
     def _extract_code_blocks(self, content: str, source: str) -> List[Dict[str, Any]]:
         """Extract code blocks from markdown or HTML content."""
-        code_blocks = []
-        
-        # Extract markdown-style code blocks
-        markdown_pattern = r'```(?P<language>\w*)\n(?P<code>.*?)\n```'
-        for match in re.finditer(markdown_pattern, content, re.DOTALL):
-            language = match.group('language') or 'unknown'
-            code = match.group('code')
-            
-            # Analyze the code to determine what it demonstrates
-            patterns = self._identify_architecture_patterns(code)
-            
-            code_blocks.append({
-                'language': language,
-                'code': code,
-                'source': source,
-                'patterns': patterns
-            })
-        
-        # Extract HTML code blocks if BeautifulSoup is available
-        try:
-            soup = BeautifulSoup(content, 'html.parser')
-            for pre in soup.find_all('pre'):
-                code_tag = pre.find('code')
-                if code_tag:
-                    language = code_tag.get('class', ['unknown'])[0].replace('language-', '')
-                    code = code_tag.text
-                    
-                    # Analyze the code
-                    patterns = self._identify_architecture_patterns(code)
-                    
-                    code_blocks.append({
-                        'language': language,
-                        'code': code,
-                        'source': source,
-                        'patterns': patterns
-                    })
-        except Exception as e:
-            logger.debug(f"Error parsing HTML code blocks: {str(e)}")
-        
-        return code_blocks
+        return extract_code_blocks(content, source)
     
     def _add_to_relationship_graph(self, url: str, title: str, links: List[str], relevance: float):
         """Add a document and its relationships to the graph."""
@@ -601,16 +1014,39 @@ class EnhancedKnowledgeBaseBuilder:
                 # Add the edge from document to link
                 self.relationship_graph.add_edge(url, link)
     
+    async def _analyze_page(self, kind: str, url: str, html: str,
+                            base_url: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[float]]:
+        """Analyze a fetched page in the analysis stage, or inline when no stage is running."""
+        if self._analysis_stage is not None:
+            return await self._analysis_stage.analyze(kind, url, html, base_url)
+        page = analyze_page(kind, url, html, base_url)
+        relevance = self._calculate_relevance(page["relevance_text"]) if page["relevance_text"] is not None else None
+        return page, relevance
+    
+    def _create_crawler(self) -> AsyncCrawler:
+        """Create a crawler with the configured concurrency and politeness settings."""
+        return AsyncCrawler(USER_AGENT, max_concurrency=MAX_CONCURRENCY, rate_limit=RATE_LIMIT,
+                            respect_robots=RESPECT_ROBOTS_TXT)
+    
+    def _run_with_crawler(self, method, *args):
+        """Run an async fetch method from synchronous code with its own crawler."""
+        async def run():
+            async with self._create_crawler() as crawler:
+                return await method(crawler, *args)
+        return asyncio.run(run())
+    
     def download_file(self, url: str, output_path: str) -> bool:
         """Download a file from a URL."""
+        return self._run_with_crawler(self._download_file, url, output_path)
+    
+    async def _download_file(self, crawler: AsyncCrawler, url: str, output_path: str) -> bool:
         try:
-            headers = {"User-Agent": USER_AGENT}
-            response = requests.get(url, headers=headers, stream=True, timeout=30)
-            response.raise_for_status()
-            
+            response = await self.http_cache.fetch(crawler, url, check_robots=False)
+            if not response.changed and not self.force_refresh and os.path.exists(output_path):
+                self.unchanged_files.add(output_path)
+                return True
             with open(output_path, 'wb') as out_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    out_file.write(chunk)
+                out_file.write(response.content)
             return True
         except Exception as e:
             logger.error(f"Error downloading {url}: {str(e)}")
@@ -619,6 +1055,10 @@ class EnhancedKnowledgeBaseBuilder:
     def fetch_github_repo(self, repo_url: str, branch: str = "main", 
                          subdirectory: str = None, patterns: List[str] = None) -> List[str]:
         """Fetch documentation files from a GitHub repository."""
+        return self._run_with_crawler(self._fetch_github_repo, repo_url, branch, subdirectory, patterns)
+    
+    async def _fetch_github_repo(self, crawler: AsyncCrawler, repo_url: str, branch: str = "main",
+                                 subdirectory: str = None, patterns: List[str] = None) -> List[str]:
         if not repo_url.endswith("/"):
             repo_url += "/"
         
@@ -635,12 +1075,11 @@ class EnhancedKnowledgeBaseBuilder:
         if subdirectory:
             api_base += f"/{subdirectory}"
         
-        # Set up parameters
-        params = {"ref": branch}
+        # Branch in the URL, so each branch is cached separately
+        api_url = f"{api_base}?{urllib.parse.urlencode({'ref': branch})}"
         
         # Make the request
         headers = {
-            "User-Agent": USER_AGENT,
             "Accept": "application/vnd.github.v3+json"
         }
         
@@ -650,11 +1089,10 @@ class EnhancedKnowledgeBaseBuilder:
             headers["Authorization"] = f"token {github_token}"
         
         try:
-            response = requests.get(api_base, headers=headers, params=params)
-            response.raise_for_status()
-            contents = response.json()
-            
-            downloaded_files = []
+            # Explicitly configured repositories are fetched regardless of robots.txt;
+            # conditional requests answered with 304 do not count against GitHub's rate limit
+            response = await self.http_cache.fetch(crawler, api_url, headers=headers, check_robots=False)
+            contents = json.loads(response.text)
             
             # Create a directory for this repo
             repo_dir = os.path.join(self.temp_dir, f"{owner}_{repo}")
@@ -665,7 +1103,8 @@ class EnhancedKnowledgeBaseBuilder:
                 items = contents
             else:
                 items = [contents]
-                
+            
+            selected = []
             for item in items:
                 # Only process files, not directories
                 if item["type"] != "file":
@@ -681,11 +1120,17 @@ class EnhancedKnowledgeBaseBuilder:
                 if patterns and not any(re.search(pattern, name, re.IGNORECASE) for pattern in patterns):
                     continue
                 
-                # Download the file
-                download_url = item["download_url"]
-                output_path = os.path.join(repo_dir, name)
-                
-                if self.download_file(download_url, output_path):
+                selected.append((name, item["download_url"], os.path.join(repo_dir, name)))
+            
+            # Download the files concurrently; the crawler applies the rate limit
+            results = await asyncio.gather(*(
+                self._download_file(crawler, download_url, output_path)
+                for _, download_url, output_path in selected
+            ))
+            
+            downloaded_files = []
+            for (name, download_url, output_path), downloaded in zip(selected, results):
+                if downloaded:
                     downloaded_files.append(output_path)
                     
                     # Add to relationship graph - all files in repo are related
@@ -698,9 +1143,6 @@ class EnhancedKnowledgeBaseBuilder:
                     )
                     
                     logger.info(f"Downloaded {name} from {repo_url}")
-                
-                # Respect rate limiting
-                time.sleep(1/RATE_LIMIT)
             
             return downloaded_files
             
@@ -711,260 +1153,183 @@ class EnhancedKnowledgeBaseBuilder:
     
     def fetch_web_article(self, url: str) -> Optional[str]:
         """Fetch an article from a website and convert to markdown."""
+        return self._run_with_crawler(self._fetch_web_article, url)
+    
+    async def _fetch_web_article(self, crawler: AsyncCrawler, url: str) -> Optional[str]:
         try:
-            headers = {"User-Agent": USER_AGENT}
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract all links before removing elements
-            links = []
-            for a_tag in soup.find_all('a', href=True):
-                href = a_tag['href']
-                if href.startswith('#'):
-                    continue
-                
-                # Convert to absolute URL
-                abs_link = urljoin(url, href)
-                links.append(abs_link)
-            
-            # Remove unwanted elements
-            for element in soup.select('nav, header, footer, aside, script, style, [role="navigation"]'):
-                element.decompose()
-            
-            # Extract the title
-            title_tag = soup.find('title')
-            title = title_tag.text if title_tag else "Untitled"
-            
-            # Find the main content
-            main_content = None
-            for selector in ['main', 'article', '.post-content', '.article-content', '.content']:
-                main_content = soup.select_one(selector)
-                if main_content:
-                    break
-            
-            if not main_content:
-                main_content = soup.find('body')
-            
-            # Convert HTML to markdown
-            markdown_content = markdownify(str(main_content))
-            
-            # Create a clean title for the filename
-            clean_title = re.sub(r'[^\w\s-]', '', title).strip().lower()
-            clean_title = re.sub(r'[-\s]+', '-', clean_title)
+            # Explicitly requested articles are fetched regardless of robots.txt
+            response = await self.http_cache.fetch(crawler, url, check_robots=False)
+            result = self._reuse_page_result(response)
+            if result is not None:
+                return result.get("output_path")
+            page, relevance = await self._analyze_page("article", url, response.text)
+            return self._save_article_page(url, page, relevance)
+        except Exception as e:
+            logger.error(f"Error fetching article {url}: {str(e)}")
+            self.failed_sources.append({"url": url, "error": str(e)})
+            return None
+    
+    def _save_article_page(self, url: str, page: Dict[str, Any], relevance: float) -> Optional[str]:
+        """Save an analyzed article if it is relevant."""
+        title, links, filename = page["title"], page["links"], page["filename"]
+        markdown_content, final_content = page["markdown_content"], page["final_content"]
+        logger.info(f"Article relevance score: {relevance:.4f} for {url}")
+        
+        # Only process if it meets the relevance threshold
+        if relevance >= RELEVANCE_THRESHOLD:
+            # Extract code examples
+            code_blocks = page["code_blocks"]
+            if code_blocks:
+                for block in code_blocks:
+                    block_id = hashlib.md5(block['code'].encode()).hexdigest()[:16]
+                    self.code_examples[block_id] = block
+                logger.info(f"Extracted {len(code_blocks)} code blocks from {url}")
             
-            # Create a unique filename
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-            filename = f"{clean_title}-{url_hash}.md"
+            # Add to relationship graph
+            self._add_to_relationship_graph(
+                url=url,
+                title=title,
+                links=links,
+                relevance=relevance
+            )
             
-            # Add title and source to the markdown content
-            final_content = f"# {title}\n\nSource: {url}\n\n{markdown_content}"
+            # Identify architecture patterns
+            patterns = page["patterns"]
             
-            # Calculate relevance to multi-agent systems
-            relevance = self._calculate_relevance(final_content)
-            logger.info(f"Article relevance score: {relevance:.4f} for {url}")
+            # Save the content
+            output_path = os.path.join(self.temp_dir, filename)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                # Add pattern metadata to the top of the file
+                if patterns:
+                    f.write(f"# {title}\n\nSource: {url}\n\n")
+                    f.write("## Identified Architecture Patterns\n\n")
+                    for pattern_type, examples in patterns.items():
+                        f.write(f"### {pattern_type.replace('_', ' ').title()}\n\n")
+                        for example in examples[:3]:  # Limit to 3 examples per pattern
+                            f.write(f"- {example}\n")
+                        f.write("\n")
+                    f.write("\n---\n\n")
+                    f.write(markdown_content)
+                else:
+                    f.write(final_content)
             
-            # Only process if it meets the relevance threshold
-            if relevance >= RELEVANCE_THRESHOLD:
-                # Extract code examples
-                code_blocks = self._extract_code_blocks(final_content, url)
-                if code_blocks:
-                    for block in code_blocks:
-                        block_id = hashlib.md5(block['code'].encode()).hexdigest()[:16]
-                        self.code_examples[block_id] = block
-                    logger.info(f"Extracted {len(code_blocks)} code blocks from {url}")
-                
-                # Add to relationship graph
-                self._add_to_relationship_graph(
-                    url=url,
-                    title=title,
-                    links=links,
-                    relevance=relevance
-                )
-                
-                # Identify architecture patterns
-                patterns = self._identify_architecture_patterns(final_content)
-                
-                # Save the content
-                output_path = os.path.join(self.temp_dir, filename)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    # Add pattern metadata to the top of the file
-                    if patterns:
-                        f.write(f"# {title}\n\nSource: {url}\n\n")
-                        f.write("## Identified Architecture Patterns\n\n")
-                        for pattern_type, examples in patterns.items():
-                            f.write(f"### {pattern_type.replace('_', ' ').title()}\n\n")
-                            for example in examples[:3]:  # Limit to 3 examples per pattern
-                                f.write(f"- {example}\n")
-                            f.write("\n")
-                        f.write("\n---\n\n")
-                        f.write(markdown_content)
-                    else:
-                        f.write(final_content)
-                
-                self._add_processed_source(url, title, "article", relevance)
-                self.relevance_scores[output_path] = relevance
-                return output_path
-            else:
-                logger.info(f"Skipping irrelevant article: {url} (score: {relevance:.4f})")
-                self._add_processed_source(url, title, "article", relevance, status="skipped_irrelevant")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error fetching article {url}: {str(e)}")
-            self.failed_sources.append({"url": url, "error": str(e)})
+            self._add_processed_source(url, title, "article", relevance)
+            self._remember_page_result(url, "article", title, relevance, output_path)
+            self.relevance_scores[output_path] = relevance
+            return output_path
+        else:
+            logger.info(f"Skipping irrelevant article: {url} (score: {relevance:.4f})")
+            self._add_processed_source(url, title, "article", relevance, status="skipped_irrelevant")
+            self._remember_page_result(url, "article", title, relevance, None)
             return None
     
     def process_documentation_site(self, base_url: str, include_paths: List[str] = None, 
                                   exclude_patterns: List[str] = None, depth: int = 2) -> List[str]:
         """Process a documentation website by crawling it with semantic filtering."""
-        processed_urls = set()
-        queue = [(base_url, 0)]  # (url, depth)
+        return self._run_with_crawler(self._process_documentation_site, base_url, include_paths,
+                                      exclude_patterns, depth)
+    
+    async def _process_documentation_site(self, crawler: AsyncCrawler, base_url: str,
+                                          include_paths: List[str] = None, exclude_patterns: List[str] = None,
+                                          depth: int = 2) -> List[str]:
         downloaded_files = []
-        link_structure = {}  # Keep track of page relationships
         
-        while queue:
-            url, current_depth = queue.pop(0)
-            
-            # Skip if already processed
-            if url in processed_urls:
-                continue
-                
-            processed_urls.add(url)
-            
-            # Skip if exceeds depth
-            if current_depth > depth:
-                continue
-                
+        def accept(url: str) -> bool:
             # Skip if URL matches exclude patterns
             if exclude_patterns and any(re.search(pattern, url) for pattern in exclude_patterns):
-                continue
-                
+                return False
             # Skip if include_paths specified and URL doesn't match any of them
             if include_paths and not any(path in url for path in include_paths):
-                continue
-            
-            try:
-                logger.info(f"Processing {url}")
-                headers = {"User-Agent": USER_AGENT}
-                response = requests.get(url, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                # Extract links first
-                soup = BeautifulSoup(response.text, 'html.parser')
-                links = []
-                
-                for a_tag in soup.find_all('a', href=True):
-                    link = a_tag['href']
-                    
-                    # Skip fragment links
-                    if link.startswith('#'):
-                        continue
-                        
-                    # Create absolute URL
-                    absolute_url = urljoin(url, link)
-                    
-                    # Only consider links on the same domain
-                    if urlparse(absolute_url).netloc == urlparse(base_url).netloc:
-                        links.append(absolute_url)
-                        
-                        # Add to queue if not yet processed and within depth
-                        if absolute_url not in processed_urls and current_depth < depth:
-                            queue.append((absolute_url, current_depth + 1))
-                
-                # Store link structure
-                link_structure[url] = links
-                
-                # Extract title
-                title_tag = soup.find('title')
-                title = title_tag.text if title_tag else "Untitled"
-                
-                # Create a filename
-                parsed_url = urlparse(url)
-                path_parts = parsed_url.path.strip('/').split('/')
-                filename = '-'.join(path_parts) if path_parts and path_parts[0] else parsed_url.netloc
-                url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-                filename = f"{filename}-{url_hash}.md"
-                
-                # Find the main content
-                main_content = None
-                for selector in ['main', 'article', '.documentation', '.docs-content', '.content']:
-                    main_content = soup.select_one(selector)
-                    if main_content:
-                        break
-                
-                if not main_content:
-                    main_content = soup.find('body')
-                
-                # Convert to markdown
-                markdown_content = markdownify(str(main_content))
-                
-                # Calculate relevance
-                relevance = self._calculate_relevance(markdown_content)
-                logger.info(f"Doc site page relevance score: {relevance:.4f} for {url}")
-                
-                # Only process if it meets the relevance threshold
-                if relevance >= RELEVANCE_THRESHOLD:
-                    # Extract code examples
-                    code_blocks = self._extract_code_blocks(markdown_content, url)
-                    if code_blocks:
-                        for block in code_blocks:
-                            block_id = hashlib.md5(block['code'].encode()).hexdigest()[:16]
-                            self.code_examples[block_id] = block
-                        logger.info(f"Extracted {len(code_blocks)} code blocks from {url}")
-                    
-                    # Identify architecture patterns
-                    patterns = self._identify_architecture_patterns(markdown_content)
-                    
-                    # Add to relationship graph
-                    self._add_to_relationship_graph(
-                        url=url,
-                        title=title,
-                        links=links,
-                        relevance=relevance
-                    )
-                    
-                    # Add title and source
-                    final_content = f"# {title}\n\nSource: {url}\n\n"
-                    
-                    # Add pattern metadata if found
-                    if patterns:
-                        final_content += "## Identified Architecture Patterns\n\n"
-                        for pattern_type, examples in patterns.items():
-                            final_content += f"### {pattern_type.replace('_', ' ').title()}\n\n"
-                            for example in examples[:3]:  # Limit to 3 examples per pattern
-                                final_content += f"- {example}\n"
-                            final_content += "\n"
-                        final_content += "\n---\n\n"
-                    
-                    final_content += markdown_content
-                    
-                    # Save the content
-                    output_path = os.path.join(self.temp_dir, filename)
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(final_content)
-                    
-                    downloaded_files.append(output_path)
-                    self.relevance_scores[output_path] = relevance
-                    self._add_processed_source(url, title, "documentation", relevance)
-                else:
-                    logger.info(f"Skipping irrelevant documentation page: {url} (score: {relevance:.4f})")
-                    self._add_processed_source(url, title, "documentation", relevance, status="skipped_irrelevant")
-                
-                # Respect rate limiting
-                time.sleep(1/RATE_LIMIT)
-                
-            except Exception as e:
-                logger.error(f"Error processing {url}: {str(e)}")
-                self.failed_sources.append({"url": url, "error": str(e)})
+                return False
+            return True
+        
+        async def handle(url: str, response: CachedResponse, current_depth: int) -> List[str]:
+            logger.info(f"Processing {url}")
+            result = self._reuse_page_result(response)
+            if result is not None:
+                links, output_path = result["links"], result.get("output_path")
+            else:
+                page, relevance = await self._analyze_page("documentation", url, response.text, base_url)
+                links, output_path = self._save_doc_page(url, page, relevance)
+            if output_path:
+                downloaded_files.append(output_path)
+            return links
+        
+        def on_error(url: str, error: Exception):
+            logger.error(f"Error processing {url}: {str(error)}")
+            self.failed_sources.append({"url": url, "error": str(error)})
         
+        # Breadth-first by depth; pages of other sites crawled at the same time are not held up
+        await crawler.crawl([base_url], handle, max_depth=depth, accept=accept, on_error=on_error,
+                            fetch=lambda url: self.http_cache.fetch(crawler, url, check_robots=False))
         return downloaded_files
     
+    def _save_doc_page(self, url: str, page: Dict[str, Any], relevance: float) -> Tuple[List[str], Optional[str]]:
+        """Save an analyzed documentation page if it is relevant.
+        
+        Returns:
+            The page's same-site links, and the saved file path or None
+        """
+        title, links, filename, markdown_content = page["title"], page["links"], page["filename"], page["markdown_content"]
+        logger.info(f"Doc site page relevance score: {relevance:.4f} for {url}")
+        
+        # Only process if it meets the relevance threshold
+        if relevance >= RELEVANCE_THRESHOLD:
+            # Extract code examples
+            code_blocks = page["code_blocks"]
+            if code_blocks:
+                for block in code_blocks:
+                    block_id = hashlib.md5(block['code'].encode()).hexdigest()[:16]
+                    self.code_examples[block_id] = block
+                logger.info(f"Extracted {len(code_blocks)} code blocks from {url}")
+            
+            # Identify architecture patterns
+            patterns = page["patterns"]
+            
+            # Add to relationship graph
+            self._add_to_relationship_graph(
+                url=url,
+                title=title,
+                links=links,
+                relevance=relevance
+            )
+            
+            # Add title and source
+            final_content = f"# {title}\n\nSource: {url}\n\n"
+            
+            # Add pattern metadata if found
+            if patterns:
+                final_content += "## Identified Architecture Patterns\n\n"
+                for pattern_type, examples in patterns.items():
+                    final_content += f"### {pattern_type.replace('_', ' ').title()}\n\n"
+                    for example in examples[:3]:  # Limit to 3 examples per pattern
+                        final_content += f"- {example}\n"
+                    final_content += "\n"
+                final_content += "\n---\n\n"
+            
+            final_content += markdown_content
+            
+            # Save the content
+            output_path = os.path.join(self.temp_dir, filename)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(final_content)
+            
+            self.relevance_scores[output_path] = relevance
+            self._add_processed_source(url, title, "documentation", relevance)
+        else:
+            output_path = None
+            logger.info(f"Skipping irrelevant documentation page: {url} (score: {relevance:.4f})")
+            self._add_processed_source(url, title, "documentation", relevance, status="skipped_irrelevant")
+        self._remember_page_result(url, "documentation", title, relevance, output_path, links)
+        
+        return links, output_path
+    
     def process_files(self, files: List[str]) -> int:
         """Process downloaded files into knowledge base format with semantic filtering."""
         processed_count = 0
         
+        # Read and convert every file first, so relevance is scored in one batch
+        loaded = []
         for file_path in files:
             try:
                 # Skip if file doesn't exist
@@ -978,6 +1343,13 @@ class EnhancedKnowledgeBaseBuilder:
                 # Get output filename
                 filename = os.path.basename(file_path)
                 
+                # Unchanged downloads whose processed output exists need no work
+                if file_path in self.unchanged_files and any(
+                        os.path.exists(os.path.join(self.resources_dir, name))
+                        for name in (filename, os.path.splitext(filename)[0] + '.md')):
+                    logger.info(f"Skipping unchanged file: {file_path}")
+                    continue
+                
                 # If not markdown, convert to markdown
                 if ext.lower() != '.md':
                     # Handle different formats
@@ -997,14 +1369,23 @@ class EnhancedKnowledgeBaseBuilder:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         content = f.read()
                 
-                # Check relevance if we have content
-                if content and file_path not in self.relevance_scores:
-                    relevance = self._calculate_relevance(content)
-                    self.relevance_scores[file_path] = relevance
-                    logger.info(f"File relevance score: {relevance:.4f} for {file_path}")
-                else:
-                    # Use pre-calculated relevance if available
-                    relevance = self.relevance_scores.get(file_path, 0.0)
+                loaded.append((file_path, filename, content))
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {str(e)}")
+        
+        # Check relevance of files with content that were not scored before
+        to_score = [(file_path, content) for file_path, _, content in loaded
+                    if content and file_path not in self.relevance_scores]
+        if to_score:
+            scores = self._calculate_relevance_many([content for _, content in to_score])
+            for (file_path, _), relevance in zip(to_score, scores):
+                self.relevance_scores[file_path] = relevance
+                logger.info(f"File relevance score: {relevance:.4f} for {file_path}")
+        
+        for file_path, filename, content in loaded:
+            try:
+                # Use the calculated relevance, or a pre-calculated one
+                relevance = self.relevance_scores.get(file_path, 0.0)
                 
                 # Only process files that meet the relevance threshold
                 if relevance >= RELEVANCE_THRESHOLD:
@@ -1068,6 +1449,10 @@ class EnhancedKnowledgeBaseBuilder:
         """Discover additional resources related to multi-agent systems.
         This is an advanced feature that tries to find new resources not in the initial configuration.
         """
+        return self._run_with_crawler(self._discover_related_resources, seed_urls, max_discoveries)
+    
+    async def _discover_related_resources(self, crawler: AsyncCrawler, seed_urls: List[str],
+                                          max_discoveries: int = 10) -> List[Dict[str, Any]]:
         discovered = []
         
         # Implementation uses a simple approach:
@@ -1075,19 +1460,23 @@ class EnhancedKnowledgeBaseBuilder:
         # 2. Extract outgoing links that seem relevant (based on text around the link)
         # 3. Visit those links and assess their relevance
         
-        for seed_url in seed_urls[:5]:  # Limit to first 5 seeds to avoid too much crawling
+        seeds = seed_urls[:5]  # Limit to first 5 seeds to avoid too much crawling
+        # Seeds are configured sources, fetched like _fetch_web_article fetches them
+        responses = await asyncio.gather(*(crawler.fetch(seed_url, check_robots=False) for seed_url in seeds),
+                                         return_exceptions=True)
+        
+        candidates = []  # (link, seed), in the order the seeds list them
+        seen = set()
+        for seed_url, response in zip(seeds, responses):
             try:
-                headers = {"User-Agent": USER_AGENT}
-                response = requests.get(seed_url, headers=headers, timeout=30)
+                if isinstance(response, Exception):
+                    raise response
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(response.text, HTML_PARSER)
                 
                 # Find links with promising anchor text
                 for a_tag in soup.find_all('a', href=True):
-                    if len(discovered) >= max_discoveries:
-                        break
-                        
                     link_text = a_tag.get_text().strip().lower()
                     href = a_tag['href']
                     
@@ -1098,49 +1487,42 @@ class EnhancedKnowledgeBaseBuilder:
                     # Check if the link text suggests relevance to multi-agent systems
                     if any(term in link_text for term in ['agent', 'multi-agent', 'architecture', 'pattern']):
                         # Only process each URL once
-                        if href not in [d['url'] for d in discovered] and not self._source_already_processed(href):
-                            # Visit the link to check its relevance
-                            try:
-                                link_response = requests.get(href, headers=headers, timeout=10)
-                                if link_response.status_code == 200:
-                                    link_soup = BeautifulSoup(link_response.text, 'html.parser')
-                                    link_title = link_soup.find('title')
-                                    title_text = link_title.get_text() if link_title else href
-                                    
-                                    # Get main content
-                                    main_content = None
-                                    for selector in ['main', 'article', '.content']:
-                                        main_content = link_soup.select_one(selector)
-                                        if main_content:
-                                            break
-                                    
-                                    if not main_content:
-                                        main_content = link_soup.find('body')
-                                    
-                                    # Convert to text and calculate relevance
-                                    if main_content:
-                                        main_text = main_content.get_text()
-                                        relevance = self._calculate_relevance(main_text)
-                                        
-                                        if relevance >= RELEVANCE_THRESHOLD:
-                                            discovered.append({
-                                                'url': href,
-                                                'title': title_text,
-                                                'relevance': relevance,
-                                                'source': seed_url
-                                            })
-                                            logger.info(f"Discovered relevant resource: {href} (score: {relevance:.4f})")
-                            except Exception as e:
-                                logger.debug(f"Error checking discovered link {href}: {str(e)}")
-                            
-                            # Respect rate limiting
-                            time.sleep(1/RATE_LIMIT)
+                        if href not in seen and not self._source_already_processed(href):
+                            seen.add(href)
+                            candidates.append((href, seed_url))
                 
             except Exception as e:
                 logger.error(f"Error during resource discovery from {seed_url}: {str(e)}")
         
+        # Check candidates concurrently, a wave at a time, until enough are found
+        while candidates and len(discovered) < max_discoveries:
+            wave, candidates = candidates[:max_discoveries - len(discovered)], candidates[max_discoveries - len(discovered):]
+            results = await asyncio.gather(*(self._check_discovered_link(crawler, href) for href, _ in wave))
+            for (href, seed_url), result in zip(wave, results):
+                if result is not None:
+                    title_text, relevance = result
+                    discovered.append({
+                        'url': href,
+                        'title': title_text,
+                        'relevance': relevance,
+                        'source': seed_url
+                    })
+                    logger.info(f"Discovered relevant resource: {href} (score: {relevance:.4f})")
+        
         return discovered
     
+    async def _check_discovered_link(self, crawler: AsyncCrawler, href: str) -> Optional[Tuple[str, float]]:
+        """Visit a discovered link and return its title and relevance if it is relevant."""
+        try:
+            link_response = await crawler.fetch(href, timeout=10)
+            if link_response.status_code == 200:
+                page, relevance = await self._analyze_page("link", href, link_response.text)
+                if relevance is not None and relevance >= RELEVANCE_THRESHOLD:
+                    return page["title"], relevance
+        except Exception as e:
+            logger.debug(f"Error checking discovered link {href}: {str(e)}")
+        return None
+    
     def generate_knowledge_report(self) -> Dict[str, Any]:
         """Generate a report about the knowledge base."""
         total_docs = len([f for f in os.listdir(self.resources_dir) if os.path.isfile(os.path.join(self.resources_dir, f))])
@@ -1210,6 +1592,100 @@ class EnhancedKnowledgeBaseBuilder:
         
         return report
     
+    async def _fetch_remote_sources(self, github_repos: List[Dict], articles: List[str], docs_sites: List[Dict],
+                                    discover_resources: bool, max_discoveries: int,
+                                    results: Dict[str, Any]) -> List[str]:
+        """Fetch GitHub repositories, articles and documentation sites at the same time.
+        
+        Returns:
+            Fetched files, grouped by source type in the order the sources are listed
+        """
+        async with self._create_crawler() as crawler, PageAnalysisStage(self._calculate_relevance) as stage:
+            self._analysis_stage = stage
+            
+            async def fetch_repos() -> List[str]:
+                tasks = []
+                logger.info(f"Processing {len(github_repos)} GitHub repositories...")
+                for repo_config in github_repos:
+                    repo_url = repo_config.get("url")
+                    
+                    if self._source_already_processed(repo_url):
+                        logger.info(f"Skipping already processed repo: {repo_url}")
+                        continue
+                    
+                    tasks.append(self._fetch_github_repo(
+                        crawler, repo_url, repo_config.get("branch", "main"),
+                        repo_config.get("subdirectory"), repo_config.get("patterns")
+                    ))
+                    results["github_repos"] += 1
+                return [path for files in await asyncio.gather(*tasks) for path in files]
+            
+            async def fetch_articles() -> List[str]:
+                logger.info(f"Processing {len(articles)} web articles...")
+                article_urls = []
+                for article_url in articles:
+                    if self._source_already_processed(article_url):
+                        logger.info(f"Skipping already processed article: {article_url}")
+                        continue
+                    article_urls.append(article_url)
+                
+                paths = await asyncio.gather(*(self._fetch_web_article(crawler, url) for url in article_urls))
+                files = [path for path in paths if path]
+                results["articles"] += len(files)
+                # Collect URLs for resource discovery
+                seed_urls = [url for url, path in zip(article_urls, paths) if path]
+                
+                # If resource discovery is enabled, find more relevant resources
+                if discover_resources and seed_urls:
+                    logger.info(f"Discovering additional resources from {len(seed_urls)} seed URLs...")
+                    discovered_resources = await self._discover_related_resources(crawler, seed_urls, max_discoveries)
+                    
+                    # Process discovered resources
+                    paths = await asyncio.gather(*(
+                        self._fetch_web_article(crawler, resource['url']) for resource in discovered_resources
+                    ))
+                    discovered_files = [path for path in paths if path]
+                    files.extend(discovered_files)
+                    results["discovered_resources"] += len(discovered_files)
+                return files
+            
+            async def fetch_docs_sites() -> List[str]:
+                tasks = []
+                logger.info(f"Processing {len(docs_sites)} documentation sites...")
+                for site_config in docs_sites:
+                    base_url = site_config.get("url")
+                    
+                    if self._source_already_processed(base_url):
+                        logger.info(f"Skipping already processed documentation site: {base_url}")
+                        continue
+                    
+                    tasks.append(self._process_documentation_site(
+                        crawler, base_url, site_config.get("include_paths"),
+                        site_config.get("exclude_patterns"), site_config.get("depth", 2)
+                    ))
+                    results["docs_sites"] += 1
+                return [path for files in await asyncio.gather(*tasks) for path in files]
+            
+            stages = []
+            if github_repos:
+                stages.append(fetch_repos())
+            if articles:
+                stages.append(fetch_articles())
+            if docs_sites:
+                stages.append(fetch_docs_sites())
+            
+            start_time = time.perf_counter()
+            try:
+                fetched = [path for files in await asyncio.gather(*stages) for path in files]
+            finally:
+                self._analysis_stage = None
+            stats = crawler.get_stats()
+            cache_stats = self.http_cache.get_stats()
+            logger.info(f"Fetched {len(fetched)} files with {stats['requests']} requests to {stats['hosts']} hosts "
+                        f"in {time.perf_counter() - start_time:.1f}s ({cache_stats['not_modified']} not modified, "
+                        f"{cache_stats['unchanged']} unchanged, {cache_stats['fresh']} served from cache)")
+            return fetched
+    
     def build_knowledge_base(self, github_repos: List[Dict] = None, articles: List[str] = None, 
                            docs_sites: List[Dict] = None, local_docs: List[str] = None,
                            discover_resources: bool = False, max_discoveries: int = 10) -> Dict[str, Any]:
@@ -1223,73 +1699,14 @@ class EnhancedKnowledgeBaseBuilder:
             "discovered_resources": 0,
             "processed_files": 0,
             "failed_sources": 0,
+            "unchanged_files": 0,
             "code_examples": 0
         }
         
-        # Discovered resources
-        discovered_resources = []
-        
-        # Process GitHub repositories
-        if github_repos:
-            logger.info(f"Processing {len(github_repos)} GitHub repositories...")
-            for repo_config in github_repos:
-                repo_url = repo_config.get("url")
-                branch = repo_config.get("branch", "main")
-                subdirectory = repo_config.get("subdirectory")
-                patterns = repo_config.get("patterns")
-                
-                if self._source_already_processed(repo_url):
-                    logger.info(f"Skipping already processed repo: {repo_url}")
-                    continue
-                
-                files = self.fetch_github_repo(repo_url, branch, subdirectory, patterns)
-                all_files.extend(files)
-                results["github_repos"] += 1
-        
-        # Process web articles
-        if articles:
-            logger.info(f"Processing {len(articles)} web articles...")
-            seed_urls = []  # Collect URLs for resource discovery
-            
-            for article_url in articles:
-                if self._source_already_processed(article_url):
-                    logger.info(f"Skipping already processed article: {article_url}")
-                    continue
-                    
-                file_path = self.fetch_web_article(article_url)
-                if file_path:
-                    all_files.append(file_path)
-                    seed_urls.append(article_url)
-                    results["articles"] += 1
-            
-            # If resource discovery is enabled, find more relevant resources
-            if discover_resources and seed_urls:
-                logger.info(f"Discovering additional resources from {len(seed_urls)} seed URLs...")
-                discovered_resources = self.discover_related_resources(seed_urls, max_discoveries)
-                
-                # Process discovered resources
-                for resource in discovered_resources:
-                    file_path = self.fetch_web_article(resource['url'])
-                    if file_path:
-                        all_files.append(file_path)
-                        results["discovered_resources"] += 1
-        
-        # Process documentation sites
-        if docs_sites:
-            logger.info(f"Processing {len(docs_sites)} documentation sites...")
-            for site_config in docs_sites:
-                base_url = site_config.get("url")
-                include_paths = site_config.get("include_paths")
-                exclude_patterns = site_config.get("exclude_patterns")
-                depth = site_config.get("depth", 2)
-                
-                if self._source_already_processed(base_url):
-                    logger.info(f"Skipping already processed documentation site: {base_url}")
-                    continue
-                
-                files = self.process_documentation_site(base_url, include_paths, exclude_patterns, depth)
-                all_files.extend(files)
-                results["docs_sites"] += 1
+        # Fetch all remote sources concurrently over one pooled crawler
+        all_files.extend(asyncio.run(self._fetch_remote_sources(
+            github_repos, articles, docs_sites, discover_resources, max_discoveries, results
+        )))
         
         # Process local document directories
         if local_docs:
@@ -1312,6 +1729,7 @@ class EnhancedKnowledgeBaseBuilder:
         # Process all the collected files
         results["processed_files"] = self.process_files(all_files)
         results["failed_sources"] = len(self.failed_sources)
+        results["unchanged_files"] = len(self.unchanged_files)
         results["code_examples"] = len(self.code_examples)
         
         # Save relationships
@@ -1455,6 +1873,12 @@ def main():
         action="store_true",
         help="Force refresh of all sources, even if already processed"
     )
+    parser.add_argument(
+        "--refresh-age",
+        type=float,
+        default=REFRESH_AGE_DAYS,
+        help="Revisit processed sources older than this many days; unchanged pages are not reprocessed"
+    )
     parser.add_argument(
         "--relevance-threshold",
         type=float,
@@ -1490,12 +1914,14 @@ def main():
         config_dir=os.path.dirname(args.config),
         temp_dir=args.temp_dir,
         relationship_dir=args.relationship_dir,
-        code_examples_dir=args.code_examples_dir
+        code_examples_dir=args.code_examples_dir,
+        refresh_age_days=args.refresh_age
     )
     
-    # If force refresh, clear the sources tracking
+    # If force refresh, clear the sources tracking and reprocess even unchanged pages
     if args.force_refresh:
         builder.sources = {"sources": [], "last_update": ""}
+        builder.force_refresh = True
         logger.info("Forcing refresh of all sources")
     
     # Filter sources based on arguments
@@ -1523,6 +1949,7 @@ def main():
     print(f"Discovered Resources: {results['discovered_resources']}")
     print(f"Total Files Processed: {results['processed_files']}")
     print(f"Code Examples Extracted: {results['code_examples']}")
+    print(f"Unchanged Files Skipped: {results['unchanged_files']}")
     print(f"Failed Sources: {results['failed_sources']}")
     print(f"\nResources saved to: {args.resources_dir}")
     print(f"Relationship data saved to: {args.relationship_dir}")
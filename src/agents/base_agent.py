@@ -236,6 +236,28 @@ class BaseAgent:
         
         return response
     
+    def retrieve_many(self, queries: List[str]) -> List[List[Any]]:
+        """Retrieve knowledge for a whole set of queries at once.
+        
+        Uses the batched retrieve_many of the agent's RAG service when it has
+        one, so the queries are embedded and searched together; otherwise the
+        queries are sent one by one.
+        
+        Args:
+            queries: Queries to retrieve knowledge for
+            
+        Returns:
+            One list of retrieved documents per query, in query order
+        """
+        rag_service = getattr(self, "rag_service", None)
+        if rag_service is None:
+            logger.warning(f"Agent {self.agent_id} has no RAG service")
+            return [[] for _ in queries]
+        
+        if hasattr(rag_service, "retrieve_many"):
+            return rag_service.retrieve_many(queries)
+        return [rag_service.query(query, agent_type=self.agent_id).retrieved_documents for query in queries]
+    
     def process_query(self, query: AgentQuery) -> AgentResponse:
         """Process a query from another agent. Should be implemented by subclasses.
         
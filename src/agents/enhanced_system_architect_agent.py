@@ -9,13 +9,18 @@ import os
 import logging
 import json
 import hashlib
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from datetime import datetime
 
 from src.agents.base_agent import BaseAgent
+from src.agents.subtask_stats import SubtaskDeviationStats
+from src.config.config import AGENT_SETTINGS
 from src.utils.logger import setup_logger
 from src.services.optimized_llm_service import OptimizedLLMService
 from src.services.enhanced_rag_service import EnhancedRAGService
+from src.services.design_store import create_design_store
 from src.prompts.adaptive_prompt_system import AdaptivePromptSystem
 
 logger = setup_logger(__name__, "system_architect_agent.log")
@@ -32,8 +37,21 @@ class EnhancedSystemArchitectAgent(BaseAgent):
         self.rag_service = EnhancedRAGService(llm_service=self.llm_service)
         self.prompt_system = AdaptivePromptSystem()
         
-        # Design cache to avoid regenerating similar designs
-        self.design_cache = {}
+        # Persistent design store, reused for identical and similar requirements
+        self.design_store = create_design_store(AGENT_SETTINGS)
+        self.design_reuse_threshold = AGENT_SETTINGS.get("design_reuse_threshold", 0.97)
+        self.design_warm_start_threshold = AGENT_SETTINGS.get("design_warm_start_threshold", 0.85)
+        
+        # Maximum number of subtask stages (LLM round-trips) run concurrently
+        self.max_parallel_subtasks = max(1, AGENT_SETTINGS.get("max_parallel_subtasks", 4))
+        
+        # Historical simulation deviation rates, used to skip simulations that rarely matter
+        self.deviation_stats = SubtaskDeviationStats(
+            AGENT_SETTINGS.get("subtask_stats_path", "data/cache/subtask_deviation_stats.json"),
+            skip_threshold=AGENT_SETTINGS.get("simulation_skip_threshold", 0.1),
+            min_samples=AGENT_SETTINGS.get("simulation_min_samples", 5),
+            probe_interval=AGENT_SETTINGS.get("simulation_probe_interval", 10)
+        )
         
         logger.info(f"Enhanced System Architect Agent {agent_id} initialized")
     
@@ -46,27 +64,37 @@ class EnhancedSystemArchitectAgent(BaseAgent):
             requirements = task.get("requirements", {})
             constraints = task.get("constraints", {})
             
+            # The four design aspects are independent until synthesis, so
+            # none of them declares dependencies
             subtasks = [
                 {
+                    "id": "pattern_selection",
                     "type": "pattern_selection",
+                    "depends_on": [],
                     "description": "Select appropriate architecture patterns",
                     "requirements": requirements,
                     "constraints": constraints
                 },
                 {
+                    "id": "component_identification",
                     "type": "component_identification",
+                    "depends_on": [],
                     "description": "Identify key system components",
                     "requirements": requirements,
                     "constraints": constraints
                 },
                 {
+                    "id": "interface_design",
                     "type": "interface_design",
+                    "depends_on": [],
                     "description": "Design component interfaces",
                     "requirements": requirements,
                     "constraints": constraints
                 },
                 {
+                    "id": "data_flow_mapping",
                     "type": "data_flow_mapping",
+                    "depends_on": [],
                     "description": "Map data flows between components",
                     "requirements": requirements,
                     "constraints": constraints
@@ -524,17 +552,146 @@ Output ONLY the JSON and nothing else.
             logger.warning(f"Error parsing gap-filled design: {str(e)}")
             return design
     
+    def _timed(self, fn: Callable[..., Dict[str, Any]], *args) -> Tuple[Dict[str, Any], float]:
+        """Run a stage and return its result with the elapsed time in seconds."""
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - start
+    
+    def _run_subtask_dag(self, subtasks: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, float]], List[str]]:
+        """Run subtasks as a dependency DAG with bounded parallelism.
+        
+        A subtask starts once every subtask in its depends_on list has a final
+        result. Its simulation and execution run concurrently; a guided re-run is
+        scheduled only if the execution deviates significantly from the simulation.
+        Simulations are skipped for subtask types that historically rarely deviate,
+        unless the execution fails and a guided re-run is needed.
+        
+        Args:
+            subtasks: Subtasks with id and depends_on fields
+            
+        Returns:
+            Tuple of final results in subtask order, per-subtask stage timings and
+            the ids of subtasks whose simulation was skipped
+        """
+        subtask_ids = [subtask.get("id", subtask.get("type")) for subtask in subtasks]
+        by_id = dict(zip(subtask_ids, subtasks))
+        for subtask_id, subtask in by_id.items():
+            unknown = [dep for dep in subtask.get("depends_on", []) if dep not in by_id]
+            if unknown:
+                raise ValueError(f"Subtask {subtask_id} depends on unknown subtasks: {unknown}")
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        outputs: Dict[str, Dict[str, Dict[str, Any]]] = {subtask_id: {} for subtask_id in subtask_ids}
+        timings: Dict[str, Dict[str, float]] = {subtask_id: {} for subtask_id in subtask_ids}
+        started = set()
+        skipped = set()
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_parallel_subtasks) as executor:
+            def submit(subtask_id: str, stage: str, fn, *args):
+                running[executor.submit(self._timed, fn, *args)] = (subtask_id, stage)
+            
+            def start_ready():
+                for subtask_id in subtask_ids:
+                    subtask = by_id[subtask_id]
+                    if subtask_id in started or any(dep not in results for dep in subtask.get("depends_on", [])):
+                        continue
+                    started.add(subtask_id)
+                    if self.deviation_stats.should_simulate(subtask.get("type")):
+                        submit(subtask_id, "simulation", self._simulate_subtask, subtask)
+                    else:
+                        skipped.add(subtask_id)
+                    submit(subtask_id, "execution", self._execute_subtask, subtask)
+            
+            start_ready()
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    subtask_id, stage = running.pop(future)
+                    output, elapsed = future.result()
+                    timings[subtask_id][stage] = elapsed
+                    outputs[subtask_id][stage] = output
+                    
+                    if stage == "guided":
+                        results[subtask_id] = output
+                    elif subtask_id in skipped:
+                        if output.get("status") == "error":
+                            # A guided re-run needs the simulation after all
+                            logger.warning(f"Execution of {by_id[subtask_id]['type']} failed without simulation - simulating now")
+                            skipped.discard(subtask_id)
+                            submit(subtask_id, "simulation", self._simulate_subtask, by_id[subtask_id])
+                        else:
+                            results[subtask_id] = output
+                    elif "simulation" in outputs[subtask_id] and "execution" in outputs[subtask_id]:
+                        expected = outputs[subtask_id]["simulation"]
+                        actual = outputs[subtask_id]["execution"]
+                        deviated = self._significant_deviation(actual, expected)
+                        self.deviation_stats.record(by_id[subtask_id].get("type"), deviated)
+                        if deviated:
+                            logger.warning(f"Significant deviation in {by_id[subtask_id]['type']} - re-running with guidance")
+                            submit(subtask_id, "guided", self._execute_with_guidance, by_id[subtask_id], expected)
+                        else:
+                            results[subtask_id] = actual
+                
+                start_ready()
+        
+        if len(results) < len(subtask_ids):
+            raise ValueError(f"Subtask dependencies contain a cycle: {[i for i in subtask_ids if i not in results]}")
+        
+        return [results[subtask_id] for subtask_id in subtask_ids], timings, sorted(skipped)
+    
+    def _get_index_version(self) -> str:
+        """Get the knowledge-base index version designs are tagged with."""
+        try:
+            return str(self.rag_service.get_index_version())
+        except Exception as e:
+            logger.warning(f"Error getting knowledge-base index version: {str(e)}")
+            return "unknown"
+    
     def design_architecture(self, requirements: Dict[str, Any], constraints: Dict[str, Any] = None) -> Dict[str, Any]:
         """Design architecture with simulation and validation."""
+        start_time = time.perf_counter()
+        
         # Create cache key for this design request
         requirements_str = json.dumps(requirements, sort_keys=True)
         constraints_str = json.dumps(constraints or {}, sort_keys=True)
         cache_key = hashlib.md5((requirements_str + constraints_str).encode()).hexdigest()
+        requirements_text = f"requirements: {requirements_str}\nconstraints: {constraints_str}"
+        index_version = self._get_index_version()
         
-        # Check cache
-        if cache_key in self.design_cache:
+        # Check the design store: exact match first, then the nearest prior design
+        cached_design = self.design_store.get(cache_key, index_version)
+        if cached_design is not None:
             logger.info("Using cached architecture design")
-            return self.design_cache[cache_key]
+            return cached_design
+        
+        similar = self.design_store.find_similar(requirements_text, index_version, self.design_warm_start_threshold)
+        if similar is not None:
+            prior_design, similarity = similar
+            prior_hash = prior_design.get("metadata", {}).get("requirements_hash")
+            
+            if similarity >= self.design_reuse_threshold:
+                logger.info(f"Reusing prior design {prior_hash} (similarity {similarity:.3f})")
+                final_design = {
+                    "architecture": prior_design.get("architecture", {}),
+                    "metadata": dict(prior_design.get("metadata", {}),
+                                     timestamp=datetime.now().isoformat(),
+                                     requirements_hash=cache_key[:8],
+                                     reused_from=prior_hash,
+                                     similarity=similarity)
+                }
+                self.design_store.put(cache_key, requirements_text, final_design, index_version)
+                return final_design
+            
+            # Close enough to refine: validate the prior design against the new
+            # requirements and fill the gaps instead of redesigning from scratch
+            logger.info(f"Warm-starting from prior design {prior_hash} (similarity {similarity:.3f})")
+            return self._finalize_design(
+                prior_design.get("architecture", {}), requirements, cache_key, requirements_text, index_version,
+                timings={}, start_time=start_time,
+                extra_metadata={"warm_started_from": prior_hash, "similarity": similarity}
+            )
             
         # Create task for architecture design
         task = {
@@ -546,43 +703,59 @@ Output ONLY the JSON and nothing else.
         # Break down into subtasks
         subtasks = self._decompose_task(task)
         
-        # Plan execution with simulation
-        execution_plan = []
-        for subtask in subtasks:
-            # Simulate expected output
-            expected_output = self._simulate_subtask(subtask)
-            execution_plan.append((subtask, expected_output))
-            
-        # Execute subtasks with validation against simulations
-        results = []
-        for subtask, expected in execution_plan:
-            # Execute the subtask
-            actual = self._execute_subtask(subtask)
-            
-            # Check if result matches expectation
-            if self._significant_deviation(actual, expected):
-                logger.warning(f"Significant deviation in {subtask['type']} - re-running with guidance")
-                # Re-run with guidance
-                actual = self._execute_with_guidance(subtask, expected)
-                
-            results.append(actual)
+        # Run the subtask DAG: simulations overlap executions and independent
+        # subtasks run concurrently
+        subtasks_start = time.perf_counter()
+        results, subtask_timings, skipped_simulations = self._run_subtask_dag(subtasks)
+        timings = {
+            "subtasks": subtask_timings,
+            "subtasks_total": time.perf_counter() - subtasks_start
+        }
             
         # Synthesize subtask results
+        stage_start = time.perf_counter()
         design = self._synthesize_results(results)
+        timings["synthesis"] = time.perf_counter() - stage_start
         
         # Get the architecture from synthesis result
         architecture = (design.get("architecture", {}) 
                       if isinstance(design.get("architecture"), dict) 
                       else {"raw_design": design.get("architecture", "")})
         
+        return self._finalize_design(
+            architecture, requirements, cache_key, requirements_text, index_version,
+            timings=timings, start_time=start_time,
+            extra_metadata={
+                "parallelism": self.max_parallel_subtasks,
+                "simulation_calls_saved": len(skipped_simulations),
+                "skipped_simulations": skipped_simulations
+            }
+        )
+    
+    def _finalize_design(self,
+                         architecture: Dict[str, Any],
+                         requirements: Dict[str, Any],
+                         cache_key: str,
+                         requirements_text: str,
+                         index_version: str,
+                         timings: Dict[str, Any],
+                         start_time: float,
+                         extra_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a design, address its gaps, add metadata and store it."""
         # Validate design completeness
+        stage_start = time.perf_counter()
         validation_results = self._validate_design(architecture, requirements)
+        timings["validation"] = time.perf_counter() - stage_start
         
         # Address gaps if found
         if not validation_results.get("complete", True):
             gaps = validation_results.get("gaps", [])
             logger.info(f"Addressing {len(gaps)} gaps in design")
+            stage_start = time.perf_counter()
             architecture = self._address_gaps(architecture, gaps)
+            timings["gap_filling"] = time.perf_counter() - stage_start
+        
+        timings["total"] = time.perf_counter() - start_time
             
         # Add metadata
         final_design = {
@@ -590,12 +763,14 @@ Output ONLY the JSON and nothing else.
             "metadata": {
                 "timestamp": datetime.now().isoformat(),
                 "agent_id": self.agent_id,
-                "requirements_hash": cache_key[:8]
+                "requirements_hash": cache_key[:8],
+                **extra_metadata,
+                "timings": timings
             }
         }
         
-        # Cache the result
-        self.design_cache[cache_key] = final_design
+        # Store the result for exact and similarity lookups
+        self.design_store.put(cache_key, requirements_text, final_design, index_version)
         
         return final_design
     
@@ -121,11 +121,13 @@ class RequirementsAnalysisAgent(BaseAgent):
         non_functional_reqs = []
         data_model_entities = []
         
-        for doc_name, doc_content in documents.items():
+        # Submit the whole query set up front: one per document plus the report structure
+        queries = [f"Extract key requirements from this document: {doc_name}" for doc_name in documents]
+        queries.append("How to structure a requirements analysis report")
+        *document_knowledge, report_knowledge = self.retrieve_many(queries)
+        
+        for (doc_name, doc_content), retrieved_documents in zip(documents.items(), document_knowledge):
             # Use RAG to identify requirements in each document
-            query = f"Extract key requirements from this document: {doc_name}"
-            rag_result = self.rag_service.query(query, agent_type="RAA")
-            
             # In a real implementation, this would use an LLM with the RAG context
             # to actually extract and categorize requirements
             
@@ -153,8 +155,6 @@ class RequirementsAnalysisAgent(BaseAgent):
                 })
         
         # Create final report using RAG-enhanced knowledge
-        query = "How to structure a requirements analysis report"
-        rag_result = self.rag_service.query(query, agent_type="RAA")
         
         # Placeholder report
         report = {
@@ -168,7 +168,7 @@ class RequirementsAnalysisAgent(BaseAgent):
             },
             "api_requirements": [],
             "user_roles": [],
-            "rag_context": f"Used {len(rag_result.retrieved_documents)} relevant knowledge sources"
+            "rag_context": f"Used {len(report_knowledge)} relevant knowledge sources"
         }
         
         return {
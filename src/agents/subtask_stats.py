@@ -0,0 +1,111 @@
+"""
+Persistent per-subtask-type deviation statistics for simulation-guided agents.
+Used to decide when a simulation call is worth paying for: subtask types whose
+executions rarely deviate from their simulations skip the simulation.
+"""
+
+import os
+import json
+import threading
+import logging
+from typing import Dict, Any
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "system_architect_agent.log")
+
+
+class SubtaskDeviationStats:
+    """Tracks how often executions deviate from simulations, per subtask type."""
+
+    def __init__(self,
+                 path: str,
+                 skip_threshold: float = 0.1,
+                 min_samples: int = 5,
+                 probe_interval: int = 10):
+        """Initialize the statistics store.
+
+        Args:
+            path: JSON file the statistics are persisted to
+            skip_threshold: Simulations are skipped while the deviation rate is below this
+            min_samples: Compared runs needed before a type may be skipped
+            probe_interval: Every Nth run of a skipped type is still simulated so the
+                rate keeps reflecting current behaviour
+        """
+        self.path = path
+        self.skip_threshold = skip_threshold
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, int]]:
+        """Load persisted statistics, starting empty if unavailable."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error loading subtask deviation stats, starting fresh: {str(e)}")
+            return {}
+
+    def _save(self):
+        """Persist statistics atomically. Caller must hold the lock."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.stats, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Error saving subtask deviation stats: {str(e)}")
+
+    def _entry(self, subtask_type: str) -> Dict[str, int]:
+        return self.stats.setdefault(subtask_type, {"runs": 0, "deviations": 0, "skipped": 0, "eligible": 0})
+
+    def deviation_rate(self, subtask_type: str) -> float:
+        """Get the observed deviation rate of a subtask type, 1.0 if never observed."""
+        entry = self.stats.get(subtask_type)
+        if not entry or not entry["runs"]:
+            return 1.0
+        return entry["deviations"] / entry["runs"]
+
+    def should_simulate(self, subtask_type: str) -> bool:
+        """Decide whether a subtask needs a simulation call, recording skips.
+
+        Args:
+            subtask_type: Subtask type
+
+        Returns:
+            False if the simulation can be skipped
+        """
+        with self._lock:
+            entry = self._entry(subtask_type)
+            if entry["runs"] < self.min_samples or self.deviation_rate(subtask_type) >= self.skip_threshold:
+                return True
+            entry["eligible"] = entry.get("eligible", 0) + 1
+            if self.probe_interval and entry["eligible"] % self.probe_interval == 0:
+                # Periodic probe: simulate anyway to keep the rate current
+                self._save()
+                return True
+
+            entry["skipped"] += 1
+            self._save()
+            return False
+
+    def record(self, subtask_type: str, deviated: bool):
+        """Record the outcome of comparing an execution with its simulation."""
+        with self._lock:
+            entry = self._entry(subtask_type)
+            entry["runs"] += 1
+            entry["deviations"] += int(deviated)
+            self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics with deviation rates per subtask type."""
+        with self._lock:
+            return {
+                subtask_type: dict(entry, deviation_rate=self.deviation_rate(subtask_type))
+                for subtask_type, entry in self.stats.items()
+            }
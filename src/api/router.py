@@ -4,13 +4,16 @@ This module provides the API endpoints for interacting with the system.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Body, Query, Path
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
 
 from src.models.base_models import AgentMessage, AgentTask, Document
 from src.services.rag_service import RagService
 from src.services.workflow_service import WorkflowService
 from src.services.llm_service import LLMService
+from src.services.optimized_llm_service import OptimizedLLMService
 from src.prompts.prompt_manager import PromptManager
+from src.api.sse import sse_text_stream
 
 # Create API router
 router = APIRouter(prefix="/api/v1", tags=["Domain-SC API"])
@@ -19,6 +22,7 @@ router = APIRouter(prefix="/api/v1", tags=["Domain-SC API"])
 rag_service = RagService()
 workflow_service = WorkflowService()
 llm_service = LLMService()
+optimized_llm_service = OptimizedLLMService()
 prompt_manager = PromptManager()
 
 # RAG endpoints
@@ -133,7 +137,7 @@ async def generate_text(prompt: str = Body(...),
                      temperature: Optional[float] = Body(None),
                      max_tokens: Optional[int] = Body(None)):
     """Generate text using the LLM service."""
-    response = llm_service.generate_text(
+    response = await optimized_llm_service.agenerate_text(
         prompt=prompt,
         model=model,
         temperature=temperature,
@@ -141,6 +145,25 @@ async def generate_text(prompt: str = Body(...),
     )
     return {"response": response}
 
+@router.post("/llm/generate/stream")
+async def generate_text_stream(prompt: str = Body(...),
+                            model: Optional[str] = Body(None),
+                            temperature: Optional[float] = Body(None),
+                            max_tokens: Optional[int] = Body(None)):
+    """Stream generated text as server-sent events."""
+    chunks = optimized_llm_service.agenerate_text_stream(
+        prompt=prompt,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    
+    return StreamingResponse(
+        sse_text_stream(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/llm/agent-prompt")
 async def generate_with_agent_prompt(agent_id: str = Body(...),
                                  prompt_type: str = Body(...),
@@ -0,0 +1,34 @@
+"""
+Server-sent event formatting for Domain-SC streaming endpoints.
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional, AsyncIterator
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "api.log")
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format a server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def sse_text_stream(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Relay text chunks as "delta" events.
+
+    The stream ends with a "done" event only if the chunks were produced
+    completely; a failure ends it with an "error" event instead, so clients can
+    tell a truncated response from a finished one.
+    """
+    try:
+        async for chunk in chunks:
+            yield sse_event({"delta": chunk})
+    except Exception as e:
+        logger.error(f"Text stream failed: {str(e)}")
+        yield sse_event({"error": str(e)}, event="error")
+        return
+    yield sse_event({}, event="done")
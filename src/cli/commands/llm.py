@@ -114,18 +114,22 @@ async def handle_commands(args: argparse.Namespace, config: Any) -> int:
         # Generate text
         print(f"Generating response using model: {model}...")
         if args.streaming:
-            # Stream response
-            async for chunk in llm_service.generate_text_stream(
-                prompt=prompt,
-                model=model,
-                temperature=temperature,
-                max_tokens=max_tokens
-            ):
-                print(chunk, end="", flush=True)
+            # Stream response, printing chunks as they arrive
+            try:
+                async for chunk in llm_service.agenerate_text_stream(
+                    prompt=prompt,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                ):
+                    print(chunk, end="", flush=True)
+            except Exception as e:
+                print(f"\nError: Response interrupted: {str(e)}")
+                return 1
             print()  # Add newline at the end
         else:
             # Generate complete response
-            response = await llm_service.generate_text(
+            response = await llm_service.agenerate_text(
                 prompt=prompt,
                 model=model,
                 temperature=temperature,
@@ -9,6 +9,7 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 VECTOR_DB_PATH = DATA_DIR / "vectordb"
+CACHE_DIR = DATA_DIR / "cache"
 LOGS_DIR = BASE_DIR / "logs"
 
 # RAG settings
@@ -17,7 +18,32 @@ RAG_SETTINGS = {
     "chunk_size": 1000,
     "chunk_overlap": 200,
     "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
-    "similarity_top_k": 5
+    "embedding_batch_size": 64,
+    "embedding_workers": 0,  # Embedding processes; 0 uses every CPU core
+    "embedding_backend": "torch",  # "torch", "onnx" or "quantized"
+    "embedding_parallel_min_chunks": 256,
+    "embedding_cache_dir": str(CACHE_DIR / "embeddings"),  # None disables the embedding cache
+    "similarity_top_k": 5,
+    "vector_store_backend": "chroma",  # "chroma", "hnsw" (hnswlib), "faiss" or "flat" (exact search)
+    "ann_m": 16,  # HNSW graph degree
+    "ann_ef_construction": 200,
+    "ann_ef_search": 64,
+    "retrieval_mode": "hybrid",  # "hybrid" (BM25 + dense) or "dense"
+    "hybrid_fusion": "rrf",  # "rrf" (reciprocal rank) or "weighted" (normalized scores)
+    "rrf_k": 60,
+    "hybrid_dense_weight": 1.0,
+    "hybrid_sparse_weight": 1.0,
+    "hybrid_max_candidates": 8,  # Fused candidates passed on to relevance evaluation
+    "bm25_k1": 1.5,
+    "bm25_b": 0.75,
+    "retrieval_cache_size": 512,  # Cached query results; 0 disables the retrieval cache
+    "reranker": "embedding",  # "embedding", "cross_encoder" or "llm"
+    "cross_encoder_model": "cross-encoder/ms-marco-MiniLM-L-6-v2",
+    # Raw reranker scores mapped to relevance 0 and 1, the scale of LLM scores
+    "embedding_score_range": (0.05, 0.55),  # Cosine similarity
+    "cross_encoder_score_range": (-5.0, 5.0),  # Cross-encoder logit
+    "relevance_scoring_mode": "batch",  # LLM scoring: "batch", "concurrent" or "serial"
+    "relevance_max_workers": 4
 }
 
 # System agent settings
@@ -48,7 +74,31 @@ LLM_CONFIG = {
     "request_timeout": 120,
     "max_retries": 3,
     "max_tokens": 4000,
-    "cache_ttl": 3600  # 1 hour
+    "cache_ttl": 3600,  # 1 hour
+    "cache_backend": "tiered",  # "memory", "sqlite" or "tiered" (memory LRU in front of sqlite)
+    "cache_max_entries": 1000,  # In-memory LRU entry budget
+    "cache_max_bytes": 50 * 1024 * 1024,  # In-memory LRU byte budget
+    "cache_max_persistent_entries": 10000,
+    "cache_path": str(CACHE_DIR / "llm_cache.sqlite3"),
+    "semantic_cache_enabled": True,  # Embedding-based lookup after exact-key misses
+    "semantic_cache_threshold": 0.97,  # Min cosine similarity for a semantic hit
+    "semantic_cache_max_entries": 1000,
+    "semantic_cache_model": "sentence-transformers/all-MiniLM-L6-v2",
+    "max_concurrent_requests": {"openai": 8, "anthropic": 4, "mock": 16},  # Async requests in flight per provider
+    "http_pool": {  # Shared HTTP transport per provider and API key
+        "max_connections": 50,
+        "max_keepalive_connections": 20,
+        "keepalive_expiry": 30.0,  # seconds an idle connection is kept open
+        "connect_timeout": 10.0,
+        "http2": True  # Used only when the h2 package is installed
+    },
+    "token_count_cache_size": 10000,  # Memoized token counts, keyed by content hash
+    "claude_token_calibration": 1.1,  # Claude tokens per cl100k_base token
+    "batch_backend": "auto",  # "auto" (provider batch API, local without a client), "openai", "anthropic" or "local"
+    "batch_dir": str(CACHE_DIR / "llm_batches"),
+    "batch_poll_interval": 30,  # seconds
+    "batch_completion_window": "24h",
+    "batch_cost_factor": 0.5  # Batch pricing relative to synchronous requests
 }
 
 # API configuration
@@ -62,10 +112,23 @@ API_CONFIG = {
 AGENT_SETTINGS = {
     "default_timeout": 120,  # seconds
     "max_retries": 3,
-    "debug_mode": False
+    "debug_mode": False,
+    "max_parallel_subtasks": 4,  # Concurrent LLM stages when running a subtask DAG
+    "subtask_stats_path": str(CACHE_DIR / "subtask_deviation_stats.json"),
+    "simulation_skip_threshold": 0.1,  # Skip simulations for subtask types deviating less often than this
+    "simulation_min_samples": 5,  # Compared runs before a subtask type may skip simulation
+    "simulation_probe_interval": 10,  # Still simulate every Nth skippable run to keep stats current
+    "design_store_path": str(CACHE_DIR / "design_store.sqlite3"),
+    "design_store_ttl": 7 * 24 * 3600,  # 7 days
+    "design_store_max_entries": 500,
+    "design_embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
+    "design_embedding_window_chars": 800,  # Requirements are embedded per window; JSON stays under the model's token limit
+    "design_reuse_threshold": 0.97,  # Requirement similarity to return a prior design as-is
+    "design_warm_start_threshold": 0.85  # Requirement similarity to refine a prior design instead of redesigning
 }
 
 # Create necessary directories
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(VECTOR_DB_PATH, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
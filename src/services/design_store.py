@@ -0,0 +1,252 @@
+"""
+Persistent architecture design store for Domain-SC.
+Past designs are kept in SQLite together with an embedding of their
+requirements, so requests with slightly edited requirements can reuse or
+warm-start from the nearest prior design instead of running the full pipeline.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Tuple
+
+import numpy as np
+
+from src.services.llm_cache import window_embedder, window_similarities
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "system_architect_agent.log")
+
+# Versions reported when the knowledge-base index cannot be inspected (empty or
+# unreachable); they say nothing about which stored designs are stale
+UNKNOWN_INDEX_VERSIONS = {"0:0", "unknown"}
+
+
+class DesignStore:
+    """SQLite-backed store of designs indexed by requirement embeddings.
+
+    Requirements are embedded as one vector per window, so a change anywhere
+    in long requirements lowers the similarity instead of being cut off by
+    the model's input limit.
+
+    Entries are tagged with the knowledge-base index version they were built
+    against. Entries from another index version are dropped on lookup, since
+    their retrieval context is stale.
+    """
+
+    def __init__(self,
+                 path: str,
+                 embed_fn: Optional[Callable[[str], np.ndarray]] = None,
+                 ttl: float = 7 * 24 * 3600,
+                 max_entries: int = 500):
+        """Initialize the design store.
+
+        Args:
+            path: Path to the SQLite database file
+            embed_fn: Function embedding requirement text as a (windows, dimension)
+                array or a single vector; None disables similarity lookup
+            ttl: Time to live for designs in seconds
+            max_entries: Maximum number of designs kept, least recently used evicted first
+        """
+        self.path = path
+        self.embed_fn = embed_fn
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS designs ("
+                "key TEXT PRIMARY KEY, requirements TEXT NOT NULL, embedding BLOB, "
+                "design TEXT NOT NULL, index_version TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+
+        # Window embeddings of stored designs and each design's first row, rebuilt lazily after writes
+        self._matrix: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._matrix_keys: list = []
+
+    def _purge(self, index_version: str) -> None:
+        """Drop expired designs and designs built against another index. Caller holds the lock."""
+        cutoff = datetime.now().timestamp() - self.ttl
+        if index_version in UNKNOWN_INDEX_VERSIONS:
+            # Without a real version, keep designs from other versions rather than wiping the store
+            removed = self._conn.execute("DELETE FROM designs WHERE created_at < ?", (cutoff,)).rowcount
+        else:
+            removed = self._conn.execute(
+                "DELETE FROM designs WHERE created_at < ? OR index_version != ?", (cutoff, index_version)
+            ).rowcount
+        if removed:
+            self._matrix = None
+            logger.info(f"Removed {removed} expired or stale designs from the design store")
+
+    def _touch(self, key: str) -> None:
+        self._conn.execute("UPDATE designs SET last_access = ? WHERE key = ?", (datetime.now().timestamp(), key))
+
+    def _load_matrix(self, dimension: int) -> None:
+        """Load normalized window embeddings of all stored designs. Caller holds the lock."""
+        rows = self._conn.execute("SELECT key, embedding FROM designs WHERE embedding IS NOT NULL").fetchall()
+        self._matrix_keys = [row[0] for row in rows]
+        if rows:
+            windows = [np.frombuffer(row[1], dtype=np.float32).reshape(-1, dimension) for row in rows]
+            self._matrix = np.vstack(windows)
+            self._offsets = np.cumsum([0] + [len(w) for w in windows[:-1]])
+        else:
+            self._matrix = np.zeros((0, dimension), dtype=np.float32)
+            self._offsets = np.zeros(0, dtype=np.int64)
+
+    def _embed(self, requirements_text: str) -> Optional[np.ndarray]:
+        """Embed requirements as normalized window vectors, one row per window."""
+        if self.embed_fn is None:
+            return None
+        try:
+            embedding = np.atleast_2d(np.asarray(self.embed_fn(requirements_text), dtype=np.float32))
+            return embedding / np.maximum(np.linalg.norm(embedding, axis=1, keepdims=True), 1e-12)
+        except Exception as e:
+            logger.warning(f"Error embedding design requirements: {str(e)}")
+            return None
+
+    def get(self, key: str, index_version: str) -> Optional[Dict[str, Any]]:
+        """Get the design stored under an exact key.
+
+        Args:
+            key: Design key
+            index_version: Current knowledge-base index version
+
+        Returns:
+            The stored design, or None
+        """
+        with self._lock, self._conn:
+            self._purge(index_version)
+            row = self._conn.execute("SELECT design FROM designs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._touch(key)
+            self.exact_hits += 1
+            return json.loads(row[0])
+
+    def find_similar(self, requirements_text: str, index_version: str,
+                     threshold: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Find the most similar stored design above a threshold.
+
+        Args:
+            requirements_text: Canonical requirements and constraints text
+            index_version: Current knowledge-base index version
+            threshold: Minimum similarity, i.e. cosine similarity of the worst-matching window
+
+        Returns:
+            Tuple of (design, similarity), or None if nothing is similar enough
+        """
+        query = self._embed(requirements_text)
+
+        with self._lock, self._conn:
+            self._purge(index_version)
+            if query is None:
+                self.misses += 1
+                return None
+            if self._matrix is None or self._matrix.shape[1] != query.shape[1]:
+                self._load_matrix(query.shape[1])
+            if not self._matrix_keys:
+                self.misses += 1
+                return None
+
+            similarities = window_similarities(self._matrix, self._offsets, query)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < threshold:
+                self.misses += 1
+                return None
+
+            key = self._matrix_keys[best]
+            row = self._conn.execute("SELECT design FROM designs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._matrix = None
+                self.misses += 1
+                return None
+            self._touch(key)
+            self.similar_hits += 1
+            return json.loads(row[0]), similarity
+
+    def put(self, key: str, requirements_text: str, design: Dict[str, Any], index_version: str) -> None:
+        """Store a design.
+
+        Args:
+            key: Design key
+            requirements_text: Canonical requirements and constraints text
+            design: Design to store
+            index_version: Knowledge-base index version the design was built against
+        """
+        embedding = self._embed(requirements_text)
+        now = datetime.now().timestamp()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO designs "
+                "(key, requirements, embedding, design, index_version, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, requirements_text, embedding.tobytes() if embedding is not None else None,
+                 json.dumps(design), index_version, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM designs").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM designs WHERE key IN "
+                    "(SELECT key FROM designs ORDER BY last_access ASC LIMIT ?)",
+                    (excess,)
+                )
+            self._matrix = None
+
+    def clear(self) -> None:
+        """Remove all stored designs."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM designs")
+            self._matrix = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM designs").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get design store statistics."""
+        return {
+            "entries": len(self),
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "similarity_enabled": self.embed_fn is not None
+        }
+
+
+def create_design_store(settings: Dict[str, Any]) -> DesignStore:
+    """Create the design store configured in AGENT_SETTINGS.
+
+    Similarity lookup uses a local sentence-transformers model when available;
+    without it the store still serves exact matches.
+    """
+    from src.utils.sentence_models import HAVE_SENTENCE_TRANSFORMERS
+
+    embed_fn = None
+    if HAVE_SENTENCE_TRANSFORMERS:
+        # Model is loaded on first use, not when the agent is created
+        embed_fn = window_embedder(settings.get("design_embedding_model", "sentence-transformers/all-MiniLM-L6-v2"),
+                                   settings.get("design_embedding_window_chars", 800))
+    else:
+        logger.info("sentence-transformers not installed, design store serves exact matches only")
+
+    return DesignStore(
+        path=settings.get("design_store_path", "data/cache/design_store.sqlite3"),
+        embed_fn=embed_fn,
+        ttl=settings.get("design_store_ttl", 7 * 24 * 3600),
+        max_entries=settings.get("design_store_max_entries", 500)
+    )
@@ -4,9 +4,13 @@ This service improves the RAG capabilities with semantic pre-evaluation to reduc
 """
 
 import os
+import re
 import logging
 import json
 import hashlib
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 import numpy as np
 from datetime import datetime
@@ -14,6 +18,12 @@ from datetime import datetime
 from src.config.config import RAG_SETTINGS
 from src.utils.logger import setup_logger
 from src.services.optimized_llm_service import OptimizedLLMService
+from src.services.rerankers import create_reranker
+from src.services.incremental_indexer import IndexManifest, IncrementalIndexer
+from src.services.sparse_index import get_bm25_index, reciprocal_rank_fusion, weighted_score_fusion
+from src.services.retrieval_cache import RetrievalCache
+from src.services.vector_stores import open_collection, copy_collection, compare_collections, ANNCollection, ExactSearchView
+from src.utils.embedding_pipeline import create_embedding_pipeline
 
 logger = setup_logger(__name__, "rag_service.log")
 
@@ -27,18 +37,44 @@ class EnhancedRAGService:
         self.chunk_overlap = RAG_SETTINGS.get("chunk_overlap", 200)
         self.embedding_model = RAG_SETTINGS.get("embedding_model")
         self.similarity_top_k = RAG_SETTINGS.get("similarity_top_k", 5)
+        self.relevance_scoring_mode = RAG_SETTINGS.get("relevance_scoring_mode", "batch")
+        self.relevance_max_workers = RAG_SETTINGS.get("relevance_max_workers", 4)
+        self.vector_store_backend = RAG_SETTINGS.get("vector_store_backend", "chroma")
+        self.retrieval_mode = RAG_SETTINGS.get("retrieval_mode", "hybrid")
+        self.hybrid_fusion = RAG_SETTINGS.get("hybrid_fusion", "rrf")
+        self.hybrid_max_candidates = RAG_SETTINGS.get("hybrid_max_candidates", 8)
+        self.collection_name = "domain_sc_kb"
         
         # Use provided LLM service or create a lightweight one for pre-evaluation
         self.llm_service = llm_service or OptimizedLLMService()
         self.lightweight_llm = self._setup_lightweight_llm()
         
+        # Local reranker for token-free relevance scoring (None means LLM scoring)
+        self.reranker = create_reranker(RAG_SETTINGS.get("reranker", "embedding"), RAG_SETTINGS)
+        
+        # Batched multi-process embedding for indexing (None means Chroma embeds)
+        self.embedding_pipeline = create_embedding_pipeline(RAG_SETTINGS)
+        
         # Initialize vector store
         self.vector_store = self._initialize_vector_store()
         
+        # BM25 index over the same chunks for hybrid retrieval (None means dense only)
+        self.sparse_index = None
+        if self.retrieval_mode == "hybrid":
+            self.sparse_index = self._get_sparse_index(self.collection_name, self.vector_store)
+        
+        # Per-stage retrieval timings for tuning
+        self.last_retrieval_timings: Dict[str, float] = {}
+        self._timing_totals: Dict[str, List[float]] = {}
+        self._timing_lock = threading.Lock()
+        
         # Relevance cache to avoid repeated evaluations
         self.relevance_cache = {}
         self.cache_ttl = 3600 * 24  # 24 hours
         
+        # Results of recent retrievals, keyed on query, parameters and index version
+        self.retrieval_cache = RetrievalCache(RAG_SETTINGS.get("retrieval_cache_size", 512))
+        
         logger.info("Enhanced RAG Service initialized")
     
     def _setup_lightweight_llm(self):
@@ -60,51 +96,124 @@ class EnhancedRAGService:
     def _initialize_vector_store(self):
         """Initialize the vector store."""
         try:
-            import chromadb
-            from chromadb.config import Settings
-            
-            # Create client
-            client = chromadb.PersistentClient(
-                path=self.vector_db_path,
-                settings=Settings(anonymized_telemetry=False)
-            )
-            
-            # Get or create collection
-            collections = client.list_collections()
-            collection_names = [c.name for c in collections]
-            
-            if "domain_sc_kb" in collection_names:
-                vector_store = client.get_collection("domain_sc_kb")
-                logger.info(f"Using existing vector store with {vector_store.count()} documents")
-            else:
-                vector_store = client.create_collection(
-                    name="domain_sc_kb",
-                    metadata={"description": "Domain-SC knowledge base"}
-                )
-                logger.info("Created new vector store")
-            
+            vector_store = self._open_collection(self.collection_name)
+            logger.info(f"Using {self.vector_store_backend} vector store with {vector_store.count()} documents")
             return vector_store
         except Exception as e:
             logger.error(f"Error initializing vector store: {str(e)}")
             return None
     
+    def _open_collection(self, collection_name: str, backend: Optional[str] = None, create: bool = True):
+        """Open a collection with the configured (or given) vector store backend."""
+        settings = dict(RAG_SETTINGS, vector_store_backend=backend or self.vector_store_backend)
+        embed_fn = self.embedding_pipeline.embed if self.embedding_pipeline else None
+        return open_collection(collection_name, self.vector_db_path, settings, embed_fn=embed_fn, create=create)
+    
+    def _collection_prefix(self, collection_name: str) -> str:
+        """Prefix of the manifest and BM25 files of a collection, per backend."""
+        if self.vector_store_backend == "chroma":
+            return collection_name
+        return f"{collection_name}_{self.vector_store_backend}"
+    
+    def _get_sparse_index(self, collection_name: str, collection=None):
+        """Get the BM25 index of a collection, rebuilding it if it is out of step."""
+        sparse_index = get_bm25_index(
+            os.path.join(self.vector_db_path, f"{self._collection_prefix(collection_name)}_bm25.json"),
+            k1=RAG_SETTINGS.get("bm25_k1", 1.5),
+            b=RAG_SETTINGS.get("bm25_b", 0.75)
+        )
+        if collection is not None:
+            try:
+                if len(sparse_index) != collection.count():
+                    sparse_index.rebuild_from(collection)
+            except Exception as e:
+                logger.warning(f"Error rebuilding BM25 index for {collection_name}: {str(e)}")
+        return sparse_index
+    
+    def _record_timings(self, timings: Dict[str, float]):
+        """Keep the timings of the last retrieval and running totals per stage."""
+        with self._timing_lock:
+            self.last_retrieval_timings = timings
+            for stage, seconds in timings.items():
+                totals = self._timing_totals.setdefault(stage, [0, 0.0])
+                totals[0] += 1
+                totals[1] += seconds
+    
+    def get_retrieval_timings(self) -> Dict[str, Any]:
+        """Get per-stage retrieval timings: the last retrieval and averages in seconds."""
+        with self._timing_lock:
+            return {
+                "last": dict(self.last_retrieval_timings),
+                "average": {stage: total / count for stage, (count, total) in self._timing_totals.items()},
+                "retrievals": self._timing_totals.get("total", [0])[0]
+            }
+    
+    def _index_generation_path(self) -> str:
+        return os.path.join(self.vector_db_path, "index_generation.json")
+    
+    def _bump_index_generation(self):
+        """Record that the indexed documents changed."""
+        generation = {"generation": 0}
+        try:
+            if os.path.exists(self._index_generation_path()):
+                with open(self._index_generation_path(), "r") as f:
+                    generation = json.load(f)
+            generation["generation"] = generation.get("generation", 0) + 1
+            generation["updated_at"] = datetime.now().isoformat()
+            with open(self._index_generation_path(), "w") as f:
+                json.dump(generation, f)
+        except Exception as e:
+            logger.warning(f"Error updating index generation: {str(e)}")
+    
+    def get_index_version(self) -> str:
+        """Get a version string that changes whenever the knowledge-base index changes.
+        
+        Combines the generation counter bumped by index_documents with the
+        collection size, so writes by other components are noticed too.
+        """
+        generation = 0
+        try:
+            if os.path.exists(self._index_generation_path()):
+                with open(self._index_generation_path(), "r") as f:
+                    generation = json.load(f).get("generation", 0)
+        except Exception as e:
+            logger.warning(f"Error reading index generation: {str(e)}")
+        
+        count = self.vector_store.count() if self.vector_store is not None else 0
+        return f"{generation}:{count}"
+    
+    def _relevance_cache_key(self, query: str, document: Dict[str, Any]) -> str:
+        """Build the relevance cache key for a query/document pair."""
+        return f"{query[:100]}_{document.get('id', '')}"
+    
+    def _get_cached_relevance(self, cache_key: str) -> Optional[float]:
+        """Return a cached relevance score if it is still valid."""
+        cached = self.relevance_cache.get(cache_key)
+        if cached:
+            timestamp, score = cached
+            # Check if cache entry is still valid
+            if (datetime.now().timestamp() - timestamp) < self.cache_ttl:
+                return score
+        return None
+    
+    def _content_preview(self, document: Dict[str, Any]) -> str:
+        """Get the short content preview used for relevance evaluation."""
+        content = document.get("document", document.get("text", ""))
+        # Only use the first 300 characters for quick assessment
+        return content[:300] + ("..." if len(content) > 300 else "")
+    
     def pre_evaluate_relevance(self, query: str, document: Dict[str, Any]) -> float:
         """Evaluate document relevance using lightweight LLM."""
         # Create cache key from query and document ID
-        doc_id = document.get("id", "")
-        cache_key = f"{query[:100]}_{doc_id}"
+        cache_key = self._relevance_cache_key(query, document)
         
         # Check cache
-        if cache_key in self.relevance_cache:
-            timestamp, score = self.relevance_cache[cache_key]
-            # Check if cache entry is still valid
-            if (datetime.now().timestamp() - timestamp) < self.cache_ttl:
-                return score
+        cached_score = self._get_cached_relevance(cache_key)
+        if cached_score is not None:
+            return cached_score
         
         # Create concise relevance evaluation prompt
-        content = document.get("document", document.get("text", ""))
-        # Only use the first 300 characters for quick assessment
-        content_preview = content[:300] + ("..." if len(content) > 300 else "")
+        content_preview = self._content_preview(document)
         
         prompt = f"""Rate the relevance of this document to the query on a scale of 0-10.
 Query: {query}
@@ -137,24 +246,161 @@ Focus only on direct relevance. Return only a number from 0 to 10."""
             logger.warning(f"Error evaluating relevance: {str(e)}")
             return 0.5  # Default to middle score on error
     
+    def batch_evaluate_relevance(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Evaluate relevance of several documents with a single lightweight LLM call.
+        
+        Documents already in the relevance cache are not sent to the model. If the
+        batched response cannot be parsed for some documents, those fall back to
+        per-document evaluation.
+        """
+        scores: List[Optional[float]] = [None] * len(documents)
+        pending = []
+        
+        for i, document in enumerate(documents):
+            cached_score = self._get_cached_relevance(self._relevance_cache_key(query, document))
+            if cached_score is not None:
+                scores[i] = cached_score
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return scores
+        
+        previews = "\n\n".join(
+            f"[{n}] {self._content_preview(documents[i])}" for n, i in enumerate(pending, 1)
+        )
+        prompt = f"""Rate the relevance of each document to the query on a scale of 0-10.
+Query: {query}
+
+Documents:
+{previews}
+
+Focus only on direct relevance. Return one line per document in the form "<number>: <score>" and nothing else."""
+        
+        parsed: Dict[int, float] = {}
+        try:
+            response = self.lightweight_llm.generate_text(
+                prompt=prompt,
+                use_cache=True,
+                max_tokens=max(50, 10 * len(pending))
+            )
+            
+            for match in re.finditer(r'\[?(\d+)\]?\s*[:=\-]\s*(\d+(?:\.\d+)?)', response):
+                index, score = int(match.group(1)), float(match.group(2))
+                if 1 <= index <= len(pending) and 0 <= score <= 10:
+                    parsed.setdefault(index, score / 10.0)  # Normalize to 0-1
+        except Exception as e:
+            logger.warning(f"Error in batched relevance evaluation: {str(e)}")
+        
+        now = datetime.now().timestamp()
+        missing = []
+        for n, i in enumerate(pending, 1):
+            if n in parsed:
+                scores[i] = parsed[n]
+                self.relevance_cache[self._relevance_cache_key(query, documents[i])] = (now, parsed[n])
+            else:
+                missing.append(i)
+        
+        if missing:
+            logger.warning(f"Batched relevance response missing {len(missing)} scores, evaluating individually")
+            fallback_scores = self.concurrent_evaluate_relevance(query, [documents[i] for i in missing])
+            for i, score in zip(missing, fallback_scores):
+                scores[i] = score
+        
+        return scores
+    
+    def concurrent_evaluate_relevance(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Evaluate relevance of documents individually on a bounded worker pool."""
+        if not documents:
+            return []
+        
+        max_workers = max(1, min(self.relevance_max_workers, len(documents)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda doc: self.pre_evaluate_relevance(query, doc), documents))
+    
+    def evaluate_relevance(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Score candidate documents using the local reranker or the configured LLM scoring mode."""
+        if self.reranker:
+            try:
+                return self.reranker.score(query, documents)
+            except Exception as e:
+                logger.warning(f"Error in {self.reranker.name} reranker, falling back to LLM scoring: {str(e)}")
+        
+        if self.relevance_scoring_mode == "batch":
+            return self.batch_evaluate_relevance(query, documents)
+        if self.relevance_scoring_mode == "concurrent":
+            return self.concurrent_evaluate_relevance(query, documents)
+        return [self.pre_evaluate_relevance(query, doc) for doc in documents]
+    
     def semantic_retrieval(self, query: str, min_relevance: float = 0.45, max_candidates: int = 15) -> List[Dict[str, Any]]:
-        """Retrieve documents with semantic pre-evaluation."""
+        """Retrieve documents with semantic pre-evaluation.
+        
+        In hybrid mode, dense results are fused with BM25 results and only the
+        best fused candidates go on to relevance evaluation.
+        """
+        return self.semantic_retrieval_many([query], min_relevance=min_relevance, max_candidates=max_candidates)[0]
+    
+    def semantic_retrieval_many(self, queries: List[str], min_relevance: float = 0.45,
+                                max_candidates: int = 15) -> List[List[Dict[str, Any]]]:
+        """Retrieve documents for several queries with one vector store search.
+        
+        All queries are embedded in one batch and searched with a single
+        multi-query call; repeated queries are retrieved once.
+        
+        Args:
+            queries: Queries to retrieve documents for
+            min_relevance: Minimum relevance score of returned documents
+            max_candidates: Dense candidates per query before fusion and evaluation
+            
+        Returns:
+            One list of relevant documents per query, in query order
+        """
         if not self.vector_store:
             logger.error("Vector store not initialized")
+            return [[] for _ in queries]
+        if not queries:
             return []
         
         try:
-            # Initial broader retrieval
-            results = self.vector_store.query(
-                query_texts=[query],
-                n_results=max_candidates
-            )
-            
-            documents = []
-            ids = results.get("ids", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
-            documents_content = results.get("documents", [[]])[0]
-            distances = results.get("distances", [[]])[0]
+            return self._semantic_retrieval_many(queries, min_relevance, max_candidates)
+        except Exception as e:
+            logger.error(f"Error retrieving documents: {str(e)}")
+            return [[] for _ in queries]
+    
+    def _semantic_retrieval_many(self, queries: List[str], min_relevance: float,
+                                 max_candidates: int = 15) -> List[List[Dict[str, Any]]]:
+        """Retrieve documents for several queries, raising embedding and vector store errors."""
+        unique_queries = list(dict.fromkeys(queries))
+        
+        timings = {}
+        start_time = time.perf_counter()
+        
+        # Initial broader retrieval
+        include = ["metadatas", "documents", "distances"]
+        if self.reranker and self.reranker.name == "embedding":
+            # Reuse stored chunk embeddings so only the query needs encoding
+            include.append("embeddings")
+        
+        if self.embedding_pipeline:
+            # Chunks were embedded by the pipeline, so the queries must be too
+            query_kwargs = {"query_embeddings": self.embedding_pipeline.embed_queries(unique_queries).tolist()}
+        else:
+            query_kwargs = {"query_texts": unique_queries}
+        
+        results = self.vector_store.query(
+            n_results=max_candidates,
+            include=include,
+            **query_kwargs
+        )
+        
+        all_candidates = []
+        for q in range(len(unique_queries)):
+            ids = results.get("ids", [[]])[q]
+            metadatas = results.get("metadatas", [[]])[q]
+            documents_content = results.get("documents", [[]])[q]
+            distances = results.get("distances", [[]])[q] if results.get("distances") else None
+            embeddings = results.get("embeddings")
+            embeddings = embeddings[q] if embeddings is not None and len(embeddings) else None
             
             # Combine into documents
             candidates = []
@@ -165,40 +411,169 @@ Focus only on direct relevance. Return only a number from 0 to 10."""
                     "document": documents_content[i],
                     "distance": distances[i] if distances else 0.0
                 }
+                if embeddings is not None:
+                    doc["embedding"] = embeddings[i]
                 candidates.append(doc)
+            all_candidates.append(candidates)
+        timings["dense"] = time.perf_counter() - start_time
+        
+        if self.sparse_index is not None and len(self.sparse_index):
+            stage_start = time.perf_counter()
+            sparse_results = [self.sparse_index.search(query, top_k=max_candidates) for query in unique_queries]
+            timings["sparse"] = time.perf_counter() - stage_start
             
-            # Pre-evaluate for relevance
+            stage_start = time.perf_counter()
+            fetched = self._fetch_sparse_only(all_candidates, sparse_results, include)
+            all_candidates = [
+                self._fuse_candidates(candidates, sparse, fetched)[:self.hybrid_max_candidates]
+                for candidates, sparse in zip(all_candidates, sparse_results)
+            ]
+            timings["fusion"] = time.perf_counter() - stage_start
+        
+        # Pre-evaluate for relevance
+        stage_start = time.perf_counter()
+        retrieved = {}
+        for query, candidates in zip(unique_queries, all_candidates):
             relevant_docs = []
-            for doc in candidates:
-                relevance = self.pre_evaluate_relevance(query, doc)
+            relevance_scores = self.evaluate_relevance(query, candidates)
+            for doc, relevance in zip(candidates, relevance_scores):
                 if relevance >= min_relevance:
                     doc["relevance"] = relevance
                     relevant_docs.append(doc)
             
-            # Sort by relevance score
+            # Sort by relevance score and take top k most relevant docs
             relevant_docs.sort(key=lambda x: x.get("relevance", 0.0), reverse=True)
-            
-            # Take top k most relevant docs
-            top_k = min(len(relevant_docs), self.similarity_top_k)
-            return relevant_docs[:top_k]
-            
-        except Exception as e:
-            logger.error(f"Error retrieving documents: {str(e)}")
-            return []
+            retrieved[query] = relevant_docs[:self.similarity_top_k]
+        timings["rerank"] = time.perf_counter() - stage_start
+        
+        timings["total"] = time.perf_counter() - start_time
+        self._record_timings(timings)
+        
+        # Repeated queries get their own copies of the shared results
+        return [[dict(doc) for doc in retrieved[query]] for query in queries]
+    
+    def _fetch_sparse_only(self, dense_candidates: List[List[Dict[str, Any]]], sparse_results: List[List[tuple]],
+                           include: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch chunks found only by BM25, for all queries in one vector store call."""
+        dense_ids = {doc["id"] for candidates in dense_candidates for doc in candidates}
+        missing = list(dict.fromkeys(
+            doc_id for results in sparse_results for doc_id, _ in results if doc_id not in dense_ids
+        ))
+        if not missing:
+            return {}
+        
+        stored = self.vector_store.get(ids=missing, include=[field for field in include if field != "distances"])
+        stored_embeddings = stored.get("embeddings")
+        fetched = {}
+        for i, doc_id in enumerate(stored["ids"]):
+            doc = {
+                "id": doc_id,
+                "metadata": stored["metadatas"][i],
+                "document": stored["documents"][i],
+                "distance": None
+            }
+            if stored_embeddings is not None and len(stored_embeddings):
+                doc["embedding"] = stored_embeddings[i]
+            fetched[doc_id] = doc
+        return fetched
+    
+    def _fuse_candidates(self, dense_candidates: List[Dict[str, Any]], sparse_results: List[tuple],
+                         fetched: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge dense candidates with BM25 results into one fused ranking."""
+        weights = [RAG_SETTINGS.get("hybrid_dense_weight", 1.0), RAG_SETTINGS.get("hybrid_sparse_weight", 1.0)]
+        if self.hybrid_fusion == "weighted":
+            # Negated distances, so higher is better whatever the distance metric
+            fused = weighted_score_fusion(
+                [[(doc["id"], -doc["distance"]) for doc in dense_candidates], sparse_results], weights
+            )
+        else:
+            fused = reciprocal_rank_fusion(
+                [[doc["id"] for doc in dense_candidates], [doc_id for doc_id, _ in sparse_results]],
+                k=RAG_SETTINGS.get("rrf_k", 60), weights=weights
+            )
+        
+        by_id = {doc["id"]: doc for doc in dense_candidates}
+        bm25_scores = dict(sparse_results)
+        candidates = []
+        for doc_id, score in fused:
+            doc = by_id.get(doc_id)
+            if doc is None and doc_id in fetched:
+                # Copy, since the same chunk may be a candidate for several queries
+                doc = dict(fetched[doc_id])
+            if doc is None:
+                # In the BM25 index but no longer in the vector store
+                continue
+            doc["fused_score"] = score
+            if doc_id in bm25_scores:
+                doc["bm25_score"] = bm25_scores[doc_id]
+            candidates.append(doc)
+        return candidates
     
     def retrieve_for_query(self, query: str, min_relevance: float = 0.45) -> List[Dict[str, Any]]:
-        """Retrieve documents relevant to a query with optimized processing."""
-        # Enhanced query to focus on architecture patterns
-        enhanced_query = self._enhance_query(query)
+        """Retrieve documents relevant to a query with optimized processing.
         
-        # Retrieve relevant documents
-        relevant_docs = self.semantic_retrieval(enhanced_query, min_relevance=min_relevance)
+        Results are cached, so repeating a query against an unchanged index
+        costs no embedding, search or relevance scoring.
+        """
+        relevant_docs = self._retrieve_cached([query], min_relevance)[0]
         
         # Log retrieval metrics
         logger.info(f"Retrieved {len(relevant_docs)} relevant documents for query")
         
         return relevant_docs
     
+    def retrieve_many(self, queries: List[str], min_relevance: float = 0.45) -> List[List[Dict[str, Any]]]:
+        """Retrieve documents for a whole set of queries in one round-trip.
+        
+        Lets agents submit all the queries of a task up front instead of
+        retrieving them one after another. Cached queries are served from the
+        retrieval cache and the rest are retrieved in one batch.
+        
+        Args:
+            queries: Queries to retrieve documents for
+            min_relevance: Minimum relevance score of returned documents
+            
+        Returns:
+            One list of relevant documents per query, in query order
+        """
+        results = self._retrieve_cached(queries, min_relevance)
+        logger.info(f"Retrieved {sum(len(docs) for docs in results)} relevant documents for {len(queries)} queries")
+        return results
+    
+    def _retrieve_cached(self, queries: List[str], min_relevance: float) -> List[List[Dict[str, Any]]]:
+        """Retrieve documents for queries through the retrieval cache."""
+        if self.vector_store is None:
+            return self.semantic_retrieval_many([self._enhance_query(query) for query in queries],
+                                                min_relevance=min_relevance)
+        
+        index_version = self.get_index_version()
+        keys = [RetrievalCache.make_key(query, min_relevance, self.similarity_top_k,
+                                        f"{self.vector_store_backend}:{self.collection_name}", index_version)
+                for query in queries]
+        results = [self.retrieval_cache.get(key) for key in keys]
+        
+        missing = [i for i, docs in enumerate(results) if docs is None]
+        if missing:
+            try:
+                # Enhanced query to focus on architecture patterns
+                retrieved = self._semantic_retrieval_many([self._enhance_query(queries[i]) for i in missing],
+                                                          min_relevance=min_relevance)
+            except Exception as e:
+                # A failed retrieval is not cached, so the next request tries again
+                logger.error(f"Error retrieving documents: {str(e)}")
+                retrieved = [None] * len(missing)
+            for i, docs in zip(missing, retrieved):
+                if docs is None:
+                    results[i] = []
+                    continue
+                self.retrieval_cache.put(keys[i], docs)
+                results[i] = docs
+        return results
+    
+    def get_retrieval_cache_stats(self) -> Dict[str, Any]:
+        """Get hit-rate statistics of the retrieval cache."""
+        return self.retrieval_cache.get_stats()
+    
     def _enhance_query(self, query: str) -> str:
         """Enhance the query to improve retrieval quality."""
         if "architecture" not in query.lower() and "design" not in query.lower():
@@ -211,58 +586,97 @@ Focus only on direct relevance. Return only a number from 0 to 10."""
         logger.info(f"Indexing {len(file_paths)} documents")
         
         try:
-            # Create or get collection
-            import chromadb
-            from chromadb.config import Settings
+            collection = self._open_collection(collection_name)
             
-            client = chromadb.PersistentClient(
-                path=self.vector_db_path,
-                settings=Settings(anonymized_telemetry=False)
+            # Index incrementally: only new or changed chunks are embedded
+            manifest = IndexManifest(
+                os.path.join(self.vector_db_path, f"{self._collection_prefix(collection_name)}_manifest.json")
             )
+            embed_fn = self.embedding_pipeline.embed if self.embedding_pipeline else None
+            sparse_index = self._get_sparse_index(collection_name, collection) if self.retrieval_mode == "hybrid" else None
+            indexer = IncrementalIndexer(collection, manifest, self.chunk_size, self.chunk_overlap,
+                                         embed_fn=embed_fn, sparse_index=sparse_index)
             
-            # Check if collection exists
-            collections = client.list_collections()
-            collection_names = [c.name for c in collections]
-            
-            if collection_name in collection_names:
-                collection = client.get_collection(collection_name)
-                logger.info(f"Using existing collection: {collection_name}")
-            else:
-                collection = client.create_collection(
-                    name=collection_name,
-                    metadata={"description": "Domain-SC knowledge base"}
-                )
-                logger.info(f"Created new collection: {collection_name}")
+            start_time = time.perf_counter()
+            counts = indexer.index(file_paths)
+            if isinstance(collection, ANNCollection):
+                collection.save()
+            if sparse_index is not None:
+                sparse_index.save()
+            duration = time.perf_counter() - start_time
             
-            # Process and index documents
-            from src.utils.document_processor import process_files
+            changed = counts["added"] + counts["updated"] + counts["removed"]
+            if changed:
+                self._bump_index_generation()
+                # Cached results may no longer match the index
+                self.retrieval_cache.clear()
+            logger.info(f"Indexed documents in {duration:.2f}s: {counts['added']} added, {counts['updated']} updated, "
+                        f"{counts['removed']} removed, {counts['skipped']} skipped")
             
-            documents, metadatas, ids = process_files(file_paths, self.chunk_size, self.chunk_overlap)
-            
-            if documents:
-                # Add documents to the collection
-                collection.add(
-                    documents=documents,
-                    metadatas=metadatas,
-                    ids=ids
-                )
-                logger.info(f"Indexed {len(documents)} document chunks")
-                return {
-                    "status": "success",
-                    "indexed_count": len(documents),
-                    "collection": collection_name
-                }
-            else:
+            if not counts["files_processed"] and not counts["files_skipped"] and not counts["removed"]:
                 logger.warning("No documents were processed for indexing")
                 return {
                     "status": "warning",
                     "indexed_count": 0,
                     "message": "No documents were processed"
                 }
+            
+            result = {
+                "status": "success",
+                "indexed_count": counts["added"] + counts["updated"],
+                "collection": collection_name,
+                "duration": duration,
+                **counts
+            }
+            if self.embedding_pipeline:
+                result["embedding"] = self.embedding_pipeline.get_stats()
+            return result
                 
         except Exception as e:
             logger.error(f"Error indexing documents: {str(e)}")
             return {
                 "status": "error",
                 "message": str(e)
-            }
\ No newline at end of file
+            }
+    
+    def compare_vector_stores(self, queries: List[str], backend: str = "hnsw",
+                              collection_name: str = "domain_sc_kb", k: int = 10) -> Dict[str, Any]:
+        """Compare recall and query latency of an ANN backend against Chroma.
+        
+        An empty ANN collection is first populated from the Chroma collection's
+        stored embeddings. Without Chroma, exact search over the same vectors is
+        used as the reference.
+        
+        Args:
+            queries: Sample queries
+            backend: ANN backend to evaluate: "hnsw", "faiss" or "flat"
+            collection_name: Collection to compare
+            k: Results per query
+            
+        Returns:
+            recall@k and latency percentiles of both backends
+        """
+        if not self.embedding_pipeline:
+            return {"status": "error", "message": "Comparing backends requires sentence-transformers"}
+        
+        try:
+            candidate = self._open_collection(collection_name, backend=backend)
+            try:
+                reference = self._open_collection(collection_name, backend="chroma", create=False)
+            except ImportError:
+                reference = None
+            
+            if reference is not None and candidate.count() == 0:
+                copy_collection(reference, candidate)
+            if reference is None:
+                reference = ExactSearchView(candidate)
+            
+            query_embeddings = self.embedding_pipeline.embed_queries(queries)
+            comparison = compare_collections(reference, candidate, query_embeddings, k=k)
+            logger.info(f"{backend} vs {reference.name}: recall@{k}={comparison['recall_at_k']}, "
+                        f"p50 {comparison['candidate_latency']['p50_ms']}ms vs "
+                        f"{comparison['reference_latency']['p50_ms']}ms")
+            return {"status": "success", "backend": backend, "reference": reference.name, **comparison}
+        except Exception as e:
+            logger.error(f"Error comparing vector stores: {str(e)}")
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,202 @@
+"""
+Incremental document indexing for Domain-SC.
+A manifest of file and chunk content hashes is kept next to the vector store so
+re-indexing only embeds new or changed chunks and removes chunks that no
+longer exist.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Any, List, Optional, Callable
+
+from src.utils.logger import setup_logger
+from src.utils.document_processor import load_file_chunks, chunk_id, chunk_metadata, content_hash
+
+logger = setup_logger(__name__, "rag_service.log")
+
+# Chunks sent to the vector store per upsert call
+UPSERT_BATCH_SIZE = 500
+
+
+class IndexManifest:
+    """Per-collection record of indexed files and their chunk hashes."""
+
+    def __init__(self, path: str):
+        """Initialize the manifest, loading it from disk if present."""
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.files = json.load(f).get("files", {})
+            except Exception as e:
+                logger.warning(f"Error loading index manifest, rebuilding it: {str(e)}")
+
+    def save(self):
+        """Write the manifest atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+
+class IncrementalIndexer:
+    """Brings a vector store collection in line with a set of files."""
+
+    def __init__(self, collection, manifest: IndexManifest, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 embed_fn: Optional[Callable[[List[str]], Any]] = None, sparse_index=None):
+        """Initialize the indexer.
+
+        Args:
+            collection: Chroma collection to update
+            manifest: Manifest of what the collection currently holds
+            chunk_size: Size of text chunks
+            chunk_overlap: Overlap between chunks
+            embed_fn: Function embedding a list of chunks; None lets the
+                collection embed them with its own embedding function
+            sparse_index: Optional BM25Index kept in step with the collection
+        """
+        self.collection = collection
+        self.manifest = manifest
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embed_fn = embed_fn
+        self.sparse_index = sparse_index
+
+        self._upserts: Dict[str, List[Any]] = {"ids": [], "documents": [], "metadatas": []}
+
+    def index(self, file_paths: List[str]) -> Dict[str, int]:
+        """Index files, embedding only new or changed chunks.
+
+        Files recorded in the manifest that no longer exist on disk have their
+        chunks removed.
+
+        Args:
+            file_paths: Files to index
+
+        Returns:
+            Counts of added, updated, removed and skipped chunks, plus the number
+            of files processed and skipped as unchanged
+        """
+        counts = {"added": 0, "updated": 0, "removed": 0, "skipped": 0, "files_processed": 0, "files_skipped": 0}
+
+        if self.manifest.files and self.collection.count() == 0:
+            logger.warning("Collection is empty but the index manifest is not, re-indexing from scratch")
+            self.manifest.files = {}
+
+        missing = [path for path in self.manifest.files if path not in file_paths and not os.path.exists(path)]
+        for file_path in list(dict.fromkeys(file_paths)) + missing:
+            self._index_file(file_path, counts)
+
+        self._flush_upserts()
+        self.manifest.save()
+        return counts
+
+    def _index_file(self, file_path: str, counts: Dict[str, int]):
+        """Update the chunks of a single file."""
+        entry = self.manifest.files.get(file_path)
+
+        if not os.path.exists(file_path):
+            if entry:
+                self._delete([chunk_id(file_path, i) for i in range(len(entry["chunk_hashes"]))], counts)
+                del self.manifest.files[file_path]
+                logger.info(f"Removed chunks of deleted file {file_path}")
+            return
+
+        # Cheap check first: unchanged size and mtime means unchanged content
+        stat = os.stat(file_path)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            counts["files_skipped"] += 1
+            counts["skipped"] += len(entry["chunk_hashes"])
+            return
+
+        loaded = load_file_chunks(file_path, self.chunk_size, self.chunk_overlap)
+        if loaded is None:
+            return
+        file_hash, chunks = loaded
+
+        if entry and entry["file_hash"] == file_hash:
+            # Touched but not modified
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            counts["files_skipped"] += 1
+            counts["skipped"] += len(chunks)
+            return
+
+        old_hashes = entry["chunk_hashes"] if entry else self._stored_chunk_hashes(file_path)
+        new_hashes = [content_hash(chunk) for chunk in chunks]
+        metadata_updates = {"ids": [], "metadatas": []}
+
+        for i, (chunk, chunk_hash) in enumerate(zip(chunks, new_hashes)):
+            metadata = chunk_metadata(file_path, i, len(chunks))
+            if i < len(old_hashes) and old_hashes[i] == chunk_hash:
+                counts["skipped"] += 1
+                if len(old_hashes) != len(chunks):
+                    # Same content, only total_chunks changed: no re-embedding needed
+                    metadata_updates["ids"].append(chunk_id(file_path, i))
+                    metadata_updates["metadatas"].append(metadata)
+                continue
+
+            counts["updated" if i < len(old_hashes) else "added"] += 1
+            self._upserts["ids"].append(chunk_id(file_path, i))
+            self._upserts["documents"].append(chunk)
+            self._upserts["metadatas"].append(metadata)
+            if len(self._upserts["ids"]) >= UPSERT_BATCH_SIZE:
+                self._flush_upserts()
+
+        if metadata_updates["ids"]:
+            self.collection.update(ids=metadata_updates["ids"], metadatas=metadata_updates["metadatas"])
+
+        # Trailing chunks of a file that got shorter
+        self._delete([chunk_id(file_path, i) for i in range(len(chunks), len(old_hashes))], counts)
+
+        self.manifest.files[file_path] = {
+            "file_hash": file_hash,
+            "chunk_hashes": new_hashes,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns
+        }
+        counts["files_processed"] += 1
+
+    def _stored_chunk_hashes(self, file_path: str) -> List[Optional[str]]:
+        """Hash the chunks already stored for a file that is not in the manifest.
+
+        Lets the first incremental run over an index built without a manifest
+        skip chunks whose content is already stored.
+        """
+        try:
+            stored = self.collection.get(where={"source": file_path}, include=["documents", "metadatas"])
+        except Exception as e:
+            logger.warning(f"Error reading stored chunks for {file_path}: {str(e)}")
+            return []
+
+        by_index = {}
+        for document, metadata in zip(stored.get("documents") or [], stored.get("metadatas") or []):
+            if metadata and document is not None and isinstance(metadata.get("chunk"), int):
+                by_index[metadata["chunk"]] = content_hash(document)
+
+        if not by_index:
+            return []
+        return [by_index.get(i) for i in range(max(by_index) + 1)]
+
+    def _flush_upserts(self):
+        """Send pending chunks to the vector store; only these are embedded."""
+        if self._upserts["ids"]:
+            if self.embed_fn is not None:
+                # Precomputed vectors, so the collection does not embed again
+                embeddings = self.embed_fn(self._upserts["documents"])
+                self.collection.upsert(embeddings=[list(map(float, e)) for e in embeddings], **self._upserts)
+            else:
+                self.collection.upsert(**self._upserts)
+            if self.sparse_index is not None:
+                self.sparse_index.add(self._upserts["ids"], self._upserts["documents"])
+            self._upserts = {"ids": [], "documents": [], "metadatas": []}
+
+    def _delete(self, ids: List[str], counts: Dict[str, int]):
+        """Delete orphaned chunks."""
+        if ids:
+            self.collection.delete(ids=ids)
+            if self.sparse_index is not None:
+                self.sparse_index.remove(ids)
+            counts["removed"] += len(ids)
@@ -0,0 +1,268 @@
+"""
+Batch job support for the Domain-SC LLM service.
+Bulk, non-interactive prompts are written to a JSONL file and submitted through
+the provider batch endpoints. Job state is kept on disk so a job can be resumed
+by id from another process.
+"""
+
+import os
+import json
+import uuid
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "llm_service.log")
+
+# Job states
+STATUS_SUBMITTED = "submitted"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class BatchBackend:
+    """Base class for provider batch endpoints."""
+
+    name = "base"
+
+    def submit(self, input_path: Path, requests: List[Dict[str, Any]]) -> str:
+        """Submit a batch and return the provider job id.
+
+        Args:
+            input_path: JSONL file with one request per line
+            requests: The same requests as dictionaries with custom_id, prompt,
+                model, temperature and max_tokens
+
+        Returns:
+            Provider job id
+        """
+        raise NotImplementedError
+
+    def status(self, provider_job_id: str) -> str:
+        """Get the job status as one of submitted, completed or failed."""
+        raise NotImplementedError
+
+    def results(self, provider_job_id: str) -> List[Dict[str, Any]]:
+        """Get results as dictionaries with custom_id, response or error, and usage."""
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Submits jobs through the OpenAI Batch API."""
+
+    name = "openai"
+
+    def __init__(self, client, completion_window: str = "24h"):
+        """Initialize the backend with an OpenAI client."""
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path: Path, requests: List[Dict[str, Any]]) -> str:
+        with open(input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, provider_job_id: str) -> str:
+        batch = self.client.batches.retrieve(provider_job_id)
+        if batch.status == "completed":
+            return STATUS_COMPLETED
+        if batch.status in ("failed", "expired", "cancelled"):
+            return STATUS_FAILED
+        return STATUS_SUBMITTED
+
+    def results(self, provider_job_id: str) -> List[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(provider_job_id)
+
+        results = []
+        # Requests that failed at the provider are written to a separate error file
+        for file_id in (batch.output_file_id, getattr(batch, "error_file_id", None)):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    results.append(self._parse_result(json.loads(line)))
+        return results
+
+    @staticmethod
+    def _parse_result(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Map an output or error file line to a response or an error."""
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if response.get("status_code") == 200 and body.get("choices"):
+            usage = body.get("usage") or {}
+            return {
+                "custom_id": record["custom_id"],
+                "response": body["choices"][0]["message"]["content"],
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0)
+            }
+        return {"custom_id": record["custom_id"], "error": str(record.get("error") or body.get("error") or body)}
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Submits jobs through the Anthropic Message Batches API."""
+
+    name = "anthropic"
+
+    def __init__(self, client):
+        """Initialize the backend with an Anthropic client."""
+        self.client = client
+
+    def submit(self, input_path: Path, requests: List[Dict[str, Any]]) -> str:
+        batch = self.client.messages.batches.create(requests=[
+            {
+                "custom_id": request["custom_id"],
+                "params": {
+                    "model": request["model"],
+                    "max_tokens": request["max_tokens"],
+                    "temperature": request["temperature"],
+                    "messages": [{"role": "user", "content": request["prompt"]}]
+                }
+            }
+            for request in requests
+        ])
+        return batch.id
+
+    def status(self, provider_job_id: str) -> str:
+        batch = self.client.messages.batches.retrieve(provider_job_id)
+        return STATUS_COMPLETED if batch.processing_status == "ended" else STATUS_SUBMITTED
+
+    def results(self, provider_job_id: str) -> List[Dict[str, Any]]:
+        results = []
+        for entry in self.client.messages.batches.results(provider_job_id):
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                results.append({
+                    "custom_id": entry.custom_id,
+                    "response": message.content[0].text,
+                    "prompt_tokens": message.usage.input_tokens,
+                    "completion_tokens": message.usage.output_tokens
+                })
+            else:
+                results.append({"custom_id": entry.custom_id, "error": entry.result.type})
+        return results
+
+
+class LocalBatchBackend(BatchBackend):
+    """Stand-in backend that runs a batch locally through a generate function.
+
+    Used for testing and when no provider client is configured. The job is
+    processed on the first status poll and its output written next to the input.
+    """
+
+    name = "local"
+
+    def __init__(self, generate_fn: Callable[[str, str, float, int], str]):
+        """Initialize the backend.
+
+        Args:
+            generate_fn: Function taking prompt, model, temperature and max_tokens;
+                it raises when generation fails, which records an error
+        """
+        self.generate_fn = generate_fn
+
+    def submit(self, input_path: Path, requests: List[Dict[str, Any]]) -> str:
+        return str(input_path)
+
+    def status(self, provider_job_id: str) -> str:
+        output_path = self._output_path(provider_job_id)
+        if not output_path.exists():
+            self._run(Path(provider_job_id), output_path)
+        return STATUS_COMPLETED
+
+    def results(self, provider_job_id: str) -> List[Dict[str, Any]]:
+        output_path = self._output_path(provider_job_id)
+        with open(output_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _output_path(self, provider_job_id: str) -> Path:
+        return Path(provider_job_id).with_name("local_output.jsonl")
+
+    def _run(self, input_path: Path, output_path: Path):
+        """Process every request in the input file."""
+        results = []
+        with open(input_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                body = record["body"]
+                try:
+                    response = self.generate_fn(
+                        body["messages"][0]["content"], body["model"], body["temperature"], body["max_tokens"]
+                    )
+                    results.append({"custom_id": record["custom_id"], "response": response})
+                except Exception as e:
+                    results.append({"custom_id": record["custom_id"], "error": str(e)})
+
+        tmp_path = output_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+        os.replace(tmp_path, output_path)
+
+
+class BatchJobStore:
+    """Keeps batch job files and state on disk, one directory per job."""
+
+    def __init__(self, base_dir: str):
+        """Initialize the job store."""
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+    def new_job_id(self) -> str:
+        """Create a unique job id."""
+        return f"batch_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    def job_dir(self, job_id: str) -> Path:
+        """Get the directory of a job."""
+        path = self.base_dir / job_id
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def write_input(self, job_id: str, requests: List[Dict[str, Any]]) -> Path:
+        """Write requests as a chat-completions batch JSONL file."""
+        input_path = self.job_dir(job_id) / "input.jsonl"
+        with open(input_path, "w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps({
+                    "custom_id": request["custom_id"],
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": request["model"],
+                        "messages": [{"role": "user", "content": request["prompt"]}],
+                        "temperature": request["temperature"],
+                        "max_tokens": request["max_tokens"]
+                    }
+                }) + "\n")
+        return input_path
+
+    def save(self, job: Dict[str, Any]):
+        """Save job state atomically."""
+        job_path = self.job_dir(job["job_id"]) / "job.json"
+        tmp_path = job_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp_path, job_path)
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Load job state, or None if the job does not exist."""
+        job_path = self.base_dir / job_id / "job.json"
+        if not job_path.exists():
+            return None
+        with open(job_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_jobs(self) -> List[str]:
+        """List the ids of all stored jobs."""
+        return sorted(p.name for p in self.base_dir.iterdir() if (p / "job.json").exists())
@@ -0,0 +1,539 @@
+"""
+Response cache backends for the Domain-SC LLM service.
+Provides a bounded in-memory LRU tier and a SQLite tier that survives restarts
+and is shared between processes.
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple, List, Callable
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "llm_service.log")
+
+
+class CacheBackend:
+    """Base class for LLM response cache backends."""
+
+    name = "base"
+
+    def __init__(self, ttl: float = 3600):
+        """Initialize counters shared by all backends."""
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for a key, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value under a key."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove a key from the cache."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        """Remove expired entries and return how many were removed."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def _is_expired(self, timestamp: float) -> bool:
+        return (datetime.now().timestamp() - timestamp) >= self.ttl
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-memory LRU cache bounded by entry count and total value size."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 50 * 1024 * 1024, ttl: float = 3600):
+        """Initialize the LRU cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses in bytes
+            ttl: Time to live for entries in seconds
+        """
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            timestamp, value, size = entry
+            if self._is_expired(timestamp):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str, timestamp: Optional[float] = None) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.debug(f"Response of {size} bytes exceeds cache byte budget, not caching")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (timestamp if timestamp is not None else datetime.now().timestamp(), value, size)
+            self.total_bytes += size
+
+            # Evict least recently used entries until within budget
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            expired = [k for k, (timestamp, _, _) in self._entries.items() if self._is_expired(timestamp)]
+            for key in expired:
+                self._remove(key)
+            return len(expired)
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes
+        })
+        return stats
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Persistent cache stored in a local SQLite file, safe to share between processes."""
+
+    name = "sqlite"
+
+    # Run size-based eviction every this many writes instead of on every insert
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 3600):
+        """Initialize the SQLite cache.
+
+        Args:
+            path: Path to the SQLite database file
+            max_entries: Maximum number of cached responses kept on disk
+            ttl: Time to live for entries in seconds
+        """
+        super().__init__(ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)")
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_with_timestamp(key)[1]
+
+    def get_with_timestamp(self, key: str) -> Tuple[Optional[float], Optional[str]]:
+        """Return (created_at, value) for a key, or (None, None) if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, value FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None, None
+
+            created_at, value = row
+            with self._conn:
+                if self._is_expired(created_at):
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self.misses += 1
+                    return None, None
+
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                    (datetime.now().timestamp(), key)
+                )
+            self.hits += 1
+            return created_at, value
+
+    def set(self, key: str, value: str) -> None:
+        now = datetime.now().timestamp()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._writes += 1
+            if self._writes % self.EVICTION_INTERVAL == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries and the least recently used entries beyond max_entries."""
+        cutoff = datetime.now().timestamp() - self.ttl
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,))
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def purge_expired(self) -> int:
+        cutoff = datetime.now().timestamp() - self.ttl
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({"path": self.path, "max_entries": self.max_entries})
+        return stats
+
+
+class TieredCacheBackend(CacheBackend):
+    """In-memory LRU tier in front of a persistent SQLite tier."""
+
+    name = "tiered"
+
+    def __init__(self, memory: LRUCacheBackend, persistent: SQLiteCacheBackend):
+        """Initialize the tiered cache from its two tiers."""
+        super().__init__(memory.ttl)
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        created_at, value = self.persistent.get_with_timestamp(key)
+        if value is not None:
+            # Promote to the memory tier, keeping the original expiry time
+            self.memory.set(key, value, timestamp=created_at)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.persistent.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        self.persistent.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.persistent.clear()
+
+    def purge_expired(self) -> int:
+        return self.memory.purge_expired() + self.persistent.purge_expired()
+
+    def __len__(self) -> int:
+        return len(self.persistent)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["evictions"] = self.memory.evictions + self.persistent.evictions
+        stats["memory"] = self.memory.get_stats()
+        stats["persistent"] = self.persistent.get_stats()
+        return stats
+
+
+def window_similarities(matrix: np.ndarray, offsets: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Score indexed texts against a query, both embedded as normalized windows.
+
+    A text's score is the lowest similarity of any window to its best
+    counterpart in the other text, in either direction, so one differing
+    window caps the score.
+
+    Args:
+        matrix: Window embeddings of all indexed texts, stacked row-wise
+        offsets: First matrix row of each indexed text
+        query: Window embeddings of the query text, one row per window
+
+    Returns:
+        One similarity per indexed text
+    """
+    # Window-to-window similarities: (indexed windows, query windows)
+    similarities = matrix @ query.T
+    # Each query window's best counterpart in each indexed text, and vice versa
+    query_coverage = np.maximum.reduceat(similarities, offsets, axis=0).min(axis=1)
+    indexed_coverage = np.minimum.reduceat(similarities.max(axis=1), offsets)
+    return np.minimum(query_coverage, indexed_coverage)
+
+
+def window_embedder(model_name: str, window: int) -> Callable[[str], np.ndarray]:
+    """Build a function embedding a text as one sentence-transformers vector per window.
+
+    The model truncates long inputs, so the whole text is split into windows of
+    at most `window` characters that are embedded separately.
+    """
+    from src.utils.sentence_models import get_sentence_transformer
+
+    def embed(text: str) -> np.ndarray:
+        windows = [text[i:i + window] for i in range(0, max(len(text), 1), window)]
+        return np.asarray(get_sentence_transformer(model_name).encode(windows), dtype=np.float32)
+
+    return embed
+
+
+class SemanticCacheIndex:
+    """In-process vector index mapping prompt embeddings to response cache keys.
+
+    Used as a second tier after exact-key lookup: a prompt close enough to a
+    cached prompt for the same model and temperature reuses that prompt's cache
+    entry. Responses themselves stay in the cache backend, so TTL and eviction
+    still apply.
+
+    Prompts are embedded as one vector per window. Two prompts match only if
+    every window of each has a close counterpart in the other, so a single
+    changed section of a long prompt, e.g. its requirements, prevents a hit
+    instead of being averaged away.
+    """
+
+    def __init__(self,
+                 embed_fn: Callable[[str], np.ndarray],
+                 threshold: float = 0.97,
+                 max_entries: int = 1000,
+                 max_length_ratio: float = 1.2):
+        """Initialize the semantic index.
+
+        Args:
+            embed_fn: Function returning the window embeddings of a prompt, as a
+                (windows, dimension) array or a single vector
+            threshold: Minimum cosine similarity of every window for a semantic hit
+            max_entries: Maximum number of prompts indexed per model/temperature
+            max_length_ratio: Maximum length ratio between matching prompts
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_length_ratio = max_length_ratio
+        self.lookups = 0
+        self.hits = 0
+        # partition -> {"keys": [...], "lengths": [...], "vectors": [...], "matrix": ndarray or None,
+        #               "offsets": first matrix row of each prompt}
+        self._partitions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _partition_key(model: str, temperature: float) -> str:
+        return f"{model}_{temperature:.2f}"
+
+    def _embed(self, prompt: str) -> np.ndarray:
+        """Embed a prompt as normalized window vectors, one row per window."""
+        vectors = np.atleast_2d(np.asarray(self.embed_fn(prompt), dtype=np.float32))
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def lookup(self, prompt: str, model: str, temperature: float) -> Optional[str]:
+        """Find the cache key of the most similar indexed prompt above the threshold."""
+        with self._lock:
+            self.lookups += 1
+            partition = self._partitions.get(self._partition_key(model, temperature))
+            if not partition or not partition["keys"]:
+                return None
+            if partition["matrix"] is None:
+                partition["matrix"] = np.vstack(partition["vectors"])
+                partition["offsets"] = np.cumsum([0] + [len(v) for v in partition["vectors"][:-1]])
+            matrix, offsets = partition["matrix"], partition["offsets"]
+            keys = list(partition["keys"])
+            lengths = np.asarray(partition["lengths"], dtype=np.float32)
+
+        similarities = window_similarities(matrix, offsets, self._embed(prompt))
+
+        # Ignore prompts of very different length, they are unlikely to be equivalent
+        length = max(len(prompt), 1)
+        ratio = np.maximum(lengths, 1) / length
+        similarities[(ratio > self.max_length_ratio) | (ratio < 1 / self.max_length_ratio)] = -1.0
+
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            with self._lock:
+                self.hits += 1
+            logger.info(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+            return keys[best]
+        return None
+
+    def add(self, prompt: str, model: str, temperature: float, cache_key: str) -> None:
+        """Index a prompt under its response cache key."""
+        vectors = self._embed(prompt)
+        with self._lock:
+            partition = self._partitions.setdefault(
+                self._partition_key(model, temperature),
+                {"keys": [], "lengths": [], "vectors": [], "matrix": None, "offsets": None}
+            )
+            if cache_key in partition["keys"]:
+                return
+
+            partition["keys"].append(cache_key)
+            partition["lengths"].append(len(prompt))
+            partition["vectors"].append(vectors)
+            # Drop the oldest prompts beyond the size limit
+            overflow = len(partition["keys"]) - self.max_entries
+            if overflow > 0:
+                for field in ("keys", "lengths", "vectors"):
+                    del partition[field][:overflow]
+            partition["matrix"] = None
+
+    def remove(self, cache_key: str) -> None:
+        """Remove a cache key, e.g. after its response expired from the cache."""
+        with self._lock:
+            for partition in self._partitions.values():
+                if cache_key in partition["keys"]:
+                    index = partition["keys"].index(cache_key)
+                    for field in ("keys", "lengths", "vectors"):
+                        del partition[field][index]
+                    partition["matrix"] = None
+
+    def __len__(self) -> int:
+        return sum(len(p["keys"]) for p in self._partitions.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup and hit counters for the semantic index."""
+        with self._lock:
+            lookups, hits = self.lookups, self.hits
+        return {
+            "entries": len(self),
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "threshold": self.threshold
+        }
+
+
+def create_semantic_index(config: Dict[str, Any]) -> Optional[SemanticCacheIndex]:
+    """Create the semantic cache index configured in LLM_CONFIG, if enabled and available."""
+    if not config.get("semantic_cache_enabled", True):
+        return None
+
+    from src.utils.sentence_models import HAVE_SENTENCE_TRANSFORMERS
+
+    if not HAVE_SENTENCE_TRANSFORMERS:
+        logger.info("sentence-transformers not installed, semantic LLM cache disabled")
+        return None
+
+    return SemanticCacheIndex(
+        embed_fn=window_embedder(config.get("semantic_cache_model", "sentence-transformers/all-MiniLM-L6-v2"),
+                                 config.get("semantic_cache_window_chars", 1000)),
+        threshold=config.get("semantic_cache_threshold", 0.97),
+        max_entries=config.get("semantic_cache_max_entries", 1000)
+    )
+
+
+def create_llm_cache(config: Dict[str, Any]) -> CacheBackend:
+    """Create the LLM response cache configured in LLM_CONFIG.
+
+    Args:
+        config: LLM configuration with cache_* settings
+
+    Returns:
+        The configured cache backend, falling back to memory-only if the
+        persistent tier cannot be opened
+    """
+    backend = config.get("cache_backend", "tiered")
+    ttl = config.get("cache_ttl", 3600)
+    memory = LRUCacheBackend(
+        max_entries=config.get("cache_max_entries", 1000),
+        max_bytes=config.get("cache_max_bytes", 50 * 1024 * 1024),
+        ttl=ttl
+    )
+
+    if backend == "memory":
+        return memory
+
+    try:
+        persistent = SQLiteCacheBackend(
+            path=config.get("cache_path"),
+            max_entries=config.get("cache_max_persistent_entries", 10000),
+            ttl=ttl
+        )
+    except Exception as e:
+        logger.warning(f"Error opening persistent LLM cache, using memory cache only: {str(e)}")
+        return memory
+
+    if backend == "sqlite":
+        return persistent
+    return TieredCacheBackend(memory, persistent)
@@ -0,0 +1,156 @@
+"""
+Process-wide registry of LLM provider clients.
+Every OptimizedLLMService instance for the same provider and API key shares one
+client and therefore one pooled HTTP transport, instead of opening its own
+connection pool per instance.
+"""
+
+import asyncio
+import hashlib
+import threading
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HAVE_H2 = True
+except ImportError:
+    HAVE_H2 = False
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "llm_service.log")
+
+DEFAULT_POOL_SETTINGS = {
+    "max_connections": 50,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "connect_timeout": 10.0,
+    "http2": True
+}
+
+_LOCK = threading.Lock()
+# (provider, api key hash) -> client
+_CLIENTS: Dict[Tuple[str, str], Any] = {}
+# (provider, api key hash, event loop id) -> (event loop, async client)
+_ASYNC_CLIENTS: Dict[Tuple[str, str, int], Tuple[asyncio.AbstractEventLoop, Any]] = {}
+
+
+def _key_hash(api_key: str) -> str:
+    """Hash an API key so raw keys are not kept in registry keys."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _transport_options(sdk, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Build pool limits and timeouts from LLM_CONFIG.
+
+    The SDK's own limit and timeout types are used, since each SDK pins the
+    HTTP library its clients are built on. HTTP/2 is only requested when the
+    h2 package is installed, as httpx refuses to build the client without it.
+    """
+    pool = dict(DEFAULT_POOL_SETTINGS, **config.get("http_pool", {}))
+    limits_class = type(sdk.DEFAULT_CONNECTION_LIMITS)
+    timeout_class = type(sdk.DEFAULT_TIMEOUT)
+    options = {
+        "limits": limits_class(
+            max_connections=pool["max_connections"],
+            max_keepalive_connections=pool["max_keepalive_connections"],
+            keepalive_expiry=pool["keepalive_expiry"]
+        ),
+        "timeout": timeout_class(config.get("request_timeout", 120), connect=pool["connect_timeout"])
+    }
+    if pool["http2"] and HAVE_H2:
+        # Multiplexes concurrent requests over one keep-alive connection
+        options["http2"] = True
+    return options
+
+
+def _create_client(provider: str, api_key: str, config: Dict[str, Any], use_async: bool):
+    """Create a provider client with a pooled HTTP transport."""
+    if provider == "openai":
+        import openai as sdk
+        client_class = sdk.AsyncOpenAI if use_async else sdk.OpenAI
+    elif provider == "anthropic":
+        import anthropic as sdk
+        client_class = sdk.AsyncAnthropic if use_async else sdk.Anthropic
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    http_client_class = getattr(sdk, "DefaultAsyncHttpxClient" if use_async else "DefaultHttpxClient", None)
+    if http_client_class is None:
+        # Older SDKs without configurable transports still benefit from sharing
+        return client_class(api_key=api_key)
+    return client_class(api_key=api_key, http_client=http_client_class(**_transport_options(sdk, config)))
+
+
+def get_client(provider: str, api_key: str, config: Optional[Dict[str, Any]] = None):
+    """Get the shared synchronous client for a provider and API key.
+
+    Args:
+        provider: "openai" or "anthropic"
+        api_key: Provider API key
+        config: LLM configuration with request_timeout and http_pool settings
+
+    Returns:
+        Provider client
+    """
+    key = (provider, _key_hash(api_key))
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _create_client(provider, api_key, config or {}, use_async=False)
+            _CLIENTS[key] = client
+            logger.info(f"Created pooled {provider} client")
+        return client
+
+
+def get_async_client(provider: str, api_key: str, config: Optional[Dict[str, Any]] = None):
+    """Get the shared async client for a provider and API key.
+
+    Async transports are bound to the event loop they were first used on, so
+    one client is kept per running loop.
+
+    Args:
+        provider: "openai" or "anthropic"
+        api_key: Provider API key
+        config: LLM configuration with request_timeout and http_pool settings
+
+    Returns:
+        Async provider client
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, _key_hash(api_key), id(loop))
+    with _LOCK:
+        # Drop clients of loops that have finished, e.g. after asyncio.run returned
+        for stale_key in [k for k, (l, _) in _ASYNC_CLIENTS.items() if l.is_closed()]:
+            del _ASYNC_CLIENTS[stale_key]
+
+        entry = _ASYNC_CLIENTS.get(key)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, _create_client(provider, api_key, config or {}, use_async=True))
+            _ASYNC_CLIENTS[key] = entry
+            logger.info(f"Created pooled async {provider} client")
+        return entry[1]
+
+
+def close_clients():
+    """Close and forget all shared synchronous clients."""
+    with _LOCK:
+        for client in _CLIENTS.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing LLM client: {str(e)}")
+        _CLIENTS.clear()
+        _ASYNC_CLIENTS.clear()
+
+
+def get_registry_stats() -> Dict[str, Any]:
+    """Get the number of shared clients per provider."""
+    with _LOCK:
+        stats: Dict[str, Any] = {"clients": {}, "async_clients": {}}
+        for provider, _ in _CLIENTS:
+            stats["clients"][provider] = stats["clients"].get(provider, 0) + 1
+        for provider, _, _ in _ASYNC_CLIENTS:
+            stats["async_clients"][provider] = stats["async_clients"].get(provider, 0) + 1
+        return stats
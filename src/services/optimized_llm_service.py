@@ -8,13 +8,24 @@ import os
 import json
 import logging
 import time
+import asyncio
+import threading
 import re
 import hashlib
-from typing import Dict, Any, Optional, List, Union
+import weakref
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterator, AsyncIterator
 from datetime import datetime
 
 from src.config.config import LLM_CONFIG
 from src.utils.logger import setup_logger
+from src.services.llm_cache import create_llm_cache, create_semantic_index
+from src.services.single_flight import SingleFlight
+from src.services.llm_clients import get_client, get_async_client, get_registry_stats
+from src.services.llm_batch import (
+    BatchJobStore, OpenAIBatchBackend, AnthropicBatchBackend, LocalBatchBackend,
+    STATUS_SUBMITTED, STATUS_COMPLETED, STATUS_FAILED
+)
+from src.utils.token_counter import TokenCounter
 from dotenv import load_dotenv
 
 logger = setup_logger(__name__, "llm_service.log")
@@ -22,6 +33,14 @@ logger = setup_logger(__name__, "llm_service.log")
 class OptimizedLLMService:
     """Optimized service for managing LLM interactions."""
     
+    # Per-provider concurrency limits for async requests, shared by all instances.
+    # Semaphores are bound to an event loop, so each loop gets its own set.
+    _async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+    _async_semaphores_lock = threading.Lock()
+    
+    # Concurrent identical requests share one provider call, across all instances
+    _inflight = SingleFlight()
+    
     def __init__(self):
         """Initialize the optimized LLM service."""
         self.config = LLM_CONFIG
@@ -39,11 +58,14 @@ class OptimizedLLMService:
         # Initialize API client based on available keys
         self._initialize_client()
         
-        # Semantic request cache with advanced caching
-        self.cache = {}
-        self.cache_ttl = 3600  # 1 hour
+        # Semantic request cache: bounded in-memory LRU, optionally backed by a persistent tier
+        self.cache_ttl = self.config.get("cache_ttl", 3600)
+        self.cache = create_llm_cache(self.config)
+        # Embedding index for near-duplicate prompts, consulted after exact-key misses
+        self.semantic_cache = create_semantic_index(self.config)
         
-        # Cost tracking
+        # Cost tracking, updated from concurrent requests
+        self._usage_lock = threading.Lock()
         self.cost_tracker = {
             "total_tokens": 0,
             "prompt_tokens": 0,
@@ -55,6 +77,15 @@ class OptimizedLLMService:
         # Model parameters cache for cost optimization
         self.model_params = self._initialize_model_params()
         
+        # Tokenizer-based counts drive model routing, risk checks and cost tracking
+        self.token_counter = TokenCounter(
+            max_entries=self.config.get("token_count_cache_size", 10000),
+            claude_calibration=self.config.get("claude_token_calibration", 1.1)
+        )
+        
+        # On-disk state of bulk batch jobs, resumable by job id
+        self.batch_store = BatchJobStore(self.config.get("batch_dir", "data/cache/llm_batches"))
+        
         logger.info(f"Optimized LLM Service initialized with model: {self.model}")
     
     def _initialize_client(self):
@@ -62,8 +93,8 @@ class OptimizedLLMService:
         # Check if OpenAI model and key is available
         if "gpt" in self.model and self.openai_api_key:
             try:
-                import openai
-                self.client = openai.OpenAI(api_key=self.openai_api_key)
+                # Shared per API key, so instances reuse one connection pool
+                self.client = get_client("openai", self.openai_api_key, self.config)
                 self.api_type = "openai"
                 logger.info("Initialized OpenAI client")
                 return
@@ -75,8 +106,7 @@ class OptimizedLLMService:
         # Check if Anthropic model and key is available
         if "claude" in self.model and self.anthropic_api_key:
             try:
-                import anthropic
-                self.client = anthropic.Anthropic(api_key=self.anthropic_api_key)
+                self.client = get_client("anthropic", self.anthropic_api_key, self.config)
                 self.api_type = "anthropic"
                 logger.info("Initialized Anthropic client")
                 return
@@ -97,53 +127,42 @@ class OptimizedLLMService:
             "gpt-4-turbo": {
                 "max_tokens": 128000,
                 "input_cost_per_1k": 0.01,
-                "output_cost_per_1k": 0.03,
-                "tokens_per_word": 1.3
+                "output_cost_per_1k": 0.03
             },
             "gpt-4": {
                 "max_tokens": 8192,
                 "input_cost_per_1k": 0.03,
-                "output_cost_per_1k": 0.06,
-                "tokens_per_word": 1.3
+                "output_cost_per_1k": 0.06
             },
             "gpt-3.5-turbo": {
                 "max_tokens": 16384,
                 "input_cost_per_1k": 0.0015,
-                "output_cost_per_1k": 0.002,
-                "tokens_per_word": 1.3
+                "output_cost_per_1k": 0.002
             },
             # Anthropic models
             "claude-3-opus": {
                 "max_tokens": 200000,
                 "input_cost_per_1k": 0.015,
-                "output_cost_per_1k": 0.075,
-                "tokens_per_word": 1.3
+                "output_cost_per_1k": 0.075
             },
             "claude-3-sonnet": {
                 "max_tokens": 200000,
                 "input_cost_per_1k": 0.003,
-                "output_cost_per_1k": 0.015,
-                "tokens_per_word": 1.3
+                "output_cost_per_1k": 0.015
             },
             "claude-3-haiku": {
                 "max_tokens": 200000,
                 "input_cost_per_1k": 0.00025,
-                "output_cost_per_1k": 0.00125,
-                "tokens_per_word": 1.3
+                "output_cost_per_1k": 0.00125
             }
         }
     
     def _estimate_tokens(self, text: str, model: str = None) -> int:
-        """Estimate token count for a text string."""
+        """Count the tokens of a text string for a model."""
         if model is None:
             model = self.model
         
-        model_params = self.model_params.get(model, {})
-        tokens_per_word = model_params.get("tokens_per_word", 1.3)
-        
-        # Simple estimation based on whitespace
-        words = len(text.split())
-        return int(words * tokens_per_word)
+        return self.token_counter.count(text, model)
     
     def _select_optimal_model(self, prompt: str, task_complexity: str = "medium") -> str:
         """Select the optimal model based on prompt and task complexity."""
@@ -187,56 +206,78 @@ class OptimizedLLMService:
         # Default to original model if no other selection made
         return self.model
     
-    def _generate_semantic_cache_key(self, prompt: str, model: str, temperature: float) -> str:
-        """Generate a semantic cache key for a request."""
-        # Normalize whitespace and remove leading/trailing whitespace
+    def _generate_cache_key(self, prompt: str, model: str, temperature: float) -> str:
+        """Generate the exact cache key for a request."""
+        # Normalize whitespace so formatting-only differences still hit
         normalized_prompt = re.sub(r'\s+', ' ', prompt).strip()
-        
-        # Extract key sections for semantic fingerprinting
-        # This focuses on the core query while ignoring formatting instructions
-        query_pattern = r'(?:query|question|task|prompt):\s*(.*?)(?:\n|$)'
-        core_query = re.search(query_pattern, normalized_prompt, re.IGNORECASE)
-        if core_query:
-            query_fingerprint = core_query.group(1)
-        else:
-            # Take the last 50% of the prompt as fingerprint if no query found
-            query_fingerprint = normalized_prompt[len(normalized_prompt)//2:]
-        
-        # Create hash from model parameters and query fingerprint
-        hash_input = f"{model}_{temperature:.2f}_{query_fingerprint}"
+        hash_input = f"{self.api_type}_{model}_{temperature:.2f}_{normalized_prompt}"
         return hashlib.md5(hash_input.encode('utf-8')).hexdigest()
     
+    def _provider(self) -> str:
+        """Get the provider requests are sent to: "openai", "anthropic", or "mock" without a client."""
+        return self.api_type if self.client and self.api_type in ("openai", "anthropic") else "mock"
+    
+    def _provider_method(self, prefix: str):
+        """Get the method implementing prefix (e.g. "_agenerate") for the current provider."""
+        provider = self._provider()
+        if provider == "mock" and self.api_type != "mock":
+            logger.warning("No API client available, falling back to mock implementation")
+        return getattr(self, f"{prefix}_{provider}")
+    
+    def _should_cache(self, use_cache: bool, response: str) -> bool:
+        """Whether a response may be cached: only real provider responses are, never mock output."""
+        return use_cache and bool(response) and self._provider() != "mock"
+    
     def _check_cache(self, prompt: str, model: str, temperature: float) -> Optional[str]:
-        """Check if a response is cached."""
-        cache_key = self._generate_semantic_cache_key(prompt, model, temperature)
-        cached_data = self.cache.get(cache_key)
-        
-        if cached_data:
-            entry_time, response = cached_data
-            # Check if the cache entry is still valid
-            if (datetime.now().timestamp() - entry_time) < self.cache_ttl:
-                logger.info("Cache hit for prompt")
-                return response
-            else:
-                # Remove expired cache entry
-                del self.cache[cache_key]
+        """Check if a response is cached, by exact key first and then by prompt similarity."""
+        cache_key = self._generate_cache_key(prompt, model, temperature)
+        response = self.cache.get(cache_key)
         
-        return None
+        if response is not None:
+            logger.info("Cache hit for prompt")
+            return response
+        
+        if self.semantic_cache:
+            try:
+                similar_key = self.semantic_cache.lookup(prompt, model, temperature)
+            except Exception as e:
+                logger.warning(f"Error in semantic cache lookup: {str(e)}")
+                similar_key = None
+            
+            if similar_key:
+                response = self.cache.get(similar_key)
+                if response is None:
+                    # Response expired or was evicted, drop the stale index entry
+                    self.semantic_cache.remove(similar_key)
+        
+        return response
     
     def _update_cache(self, prompt: str, model: str, temperature: float, response: str):
         """Update the cache with a new response."""
-        cache_key = self._generate_semantic_cache_key(prompt, model, temperature)
-        self.cache[cache_key] = (datetime.now().timestamp(), response)
+        cache_key = self._generate_cache_key(prompt, model, temperature)
+        # Backends evict by LRU and size budget on insert, no full scan needed here
+        self.cache.set(cache_key, response)
         
-        # Clean up old cache entries
-        self._clean_cache()
+        if self.semantic_cache:
+            try:
+                self.semantic_cache.add(prompt, model, temperature, cache_key)
+            except Exception as e:
+                logger.warning(f"Error indexing prompt in semantic cache: {str(e)}")
+    
+    async def _acheck_cache(self, prompt: str, model: str, temperature: float) -> Optional[str]:
+        """Async variant of _check_cache; the lookup runs in a thread so prompt embedding does not block the loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._check_cache, prompt, model, temperature)
+    
+    async def _aupdate_cache(self, prompt: str, model: str, temperature: float, response: str):
+        """Async variant of _update_cache, run in a thread for the same reason."""
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._update_cache, prompt, model, temperature, response
+        )
     
     def _clean_cache(self):
-        """Clean up old cache entries."""
-        now = datetime.now().timestamp()
-        expired_keys = [k for k, v in self.cache.items() if (now - v[0]) > self.cache_ttl]
-        for key in expired_keys:
-            del self.cache[key]
+        """Clean up expired cache entries."""
+        removed = self.cache.purge_expired()
+        logger.info(f"Removed {removed} expired cache entries")
     
     def _simulate_failure_modes(self, prompt: str) -> Dict[str, float]:
         """Simulate potential failure modes for the prompt."""
@@ -285,8 +326,8 @@ IMPORTANT: Only provide information that you're confident is correct. If you're
         # Check if all expected sections are present
         return all(section in response for section in expected_structure)
     
-    def _regenerate_with_formatting(self, prompt: str, model: str, temperature: float = None) -> str:
-        """Regenerate with explicit formatting instructions."""
+    def _formatting_prompt(self, prompt: str) -> str:
+        """Build a prompt with explicit formatting instructions."""
         formatting_instruction = """
 IMPORTANT: Format your response with clear section headings and structure. Include all of the following sections:
 """
@@ -304,10 +345,70 @@ IMPORTANT: Format your response with clear section headings and structure. Inclu
             formatting_instruction += "- Summary\n- Details\n- Conclusion\n"
         
         # Add formatting instruction to beginning of prompt
-        enhanced_prompt = formatting_instruction + "\n\n" + prompt
+        return formatting_instruction + "\n\n" + prompt
+    
+    def _regenerate_with_formatting(self, prompt: str, model: str, temperature: float = None) -> str:
+        """Regenerate with explicit formatting instructions, raising if all retries fail."""
+        return self._generate_with_retries(self._formatting_prompt(prompt), model, temperature)
+    
+    async def _aregenerate_with_formatting(self, prompt: str, model: str, temperature: float = None) -> str:
+        """Async variant of _regenerate_with_formatting."""
+        return await self._agenerate_with_retries(self._formatting_prompt(prompt), model, temperature)
+    
+    def _prepare_request(self,
+                         prompt: str,
+                         model: Optional[str],
+                         temperature: Optional[float],
+                         max_tokens: Optional[int],
+                         task_complexity: str) -> Tuple[str, float, int]:
+        """Resolve model, temperature and max_tokens for a generation request."""
+        # 1. Estimate token usage
+        estimated_tokens = self._estimate_tokens(prompt)
+        logger.info(f"Estimated prompt tokens: {estimated_tokens}")
+        
+        # 2. Choose appropriate model based on complexity and token count
+        if model is None:
+            model = self._select_optimal_model(prompt, task_complexity)
+            logger.info(f"Selected model: {model}")
         
-        # Generate with explicit formatting
-        return self._generate_with_backoff(enhanced_prompt, model, temperature)
+        # Use defaults if not provided
+        temperature = temperature if temperature is not None else self.temperature
+        # Validate temperature is in valid range
+        if temperature < 0 or temperature > 1:
+            logger.warning(f"Temperature {temperature} outside valid range [0-1], clamping")
+            temperature = max(0, min(1, temperature))
+        
+        max_tokens = max_tokens or 4000
+        if max_tokens <= 0:
+            logger.warning(f"Invalid max_tokens {max_tokens}, using default")
+            max_tokens = 4000
+        
+        return model, temperature, max_tokens
+    
+    def _invalid_prompt_response(self, prompt: Any) -> Optional[str]:
+        """Get the error response for an invalid prompt, or None if the prompt is valid."""
+        if not prompt or not isinstance(prompt, str):
+            logger.error(f"Invalid prompt: {type(prompt)}")
+            return "Error: Invalid prompt"
+        return None
+    
+    def _needs_formatting(self, response: str, expected_structure: Optional[List[str]]) -> bool:
+        """Whether a response misses its expected structure and must be regenerated with formatting."""
+        if expected_structure and not self._validate_output_structure(response, expected_structure):
+            logger.warning("Output structure validation failed, regenerating with formatting")
+            return True
+        return False
+    
+    def _apply_guardrails(self, prompt: str) -> str:
+        """Simulate failure modes and add guardrails to the prompt if needed."""
+        risk_factors = self._simulate_failure_modes(prompt)
+        
+        if risk_factors["hallucination_risk"] > 0.7:
+            # Add guardrails if high risk detected
+            logger.info(f"Added factuality constraints due to high hallucination risk: {risk_factors['hallucination_risk']:.2f}")
+            return self._add_factuality_constraints(prompt)
+        
+        return prompt
     
     def generate_text(self, 
                      prompt: str, 
@@ -331,106 +432,374 @@ IMPORTANT: Format your response with clear section headings and structure. Inclu
         Returns:
             Generated text from the LLM, or error message if generation fails
         """
-        if not prompt or not isinstance(prompt, str):
-            logger.error(f"Invalid prompt: {type(prompt)}")
-            return "Error: Invalid prompt"
-            
-        # 1. Estimate token usage
-        estimated_tokens = self._estimate_tokens(prompt)
-        logger.info(f"Estimated prompt tokens: {estimated_tokens}")
-        
-        # 2. Choose appropriate model based on complexity and token count
-        if model is None:
-            model = self._select_optimal_model(prompt, task_complexity)
-            logger.info(f"Selected model: {model}")
+        invalid_response = self._invalid_prompt_response(prompt)
+        if invalid_response:
+            return invalid_response
         
-        # Use defaults if not provided
-        temperature = temperature if temperature is not None else self.temperature
-        # Validate temperature is in valid range
-        if temperature < 0 or temperature > 1:
-            logger.warning(f"Temperature {temperature} outside valid range [0-1], clamping")
-            temperature = max(0, min(1, temperature))
-        
-        max_tokens = max_tokens or 4000
-        if max_tokens <= 0:
-            logger.warning(f"Invalid max_tokens {max_tokens}, using default")
-            max_tokens = 4000
+        # 1-2. Estimate tokens, choose model and validate parameters
+        model, temperature, max_tokens = self._prepare_request(
+            prompt, model, temperature, max_tokens, task_complexity
+        )
         
         # 3. Check cache if enabled
         if use_cache:
             cached_response = self._check_cache(prompt, model, temperature)
             if cached_response:
                 return cached_response
+            
+            # Concurrent identical requests share one provider call
+            inflight_key = self._inflight_key(prompt, model, temperature, max_tokens, expected_structure)
+            return self._inflight.do(
+                inflight_key,
+                lambda: self._generate_uncached(prompt, model, temperature, max_tokens, use_cache, expected_structure)
+            )
         
+        return self._generate_uncached(prompt, model, temperature, max_tokens, use_cache, expected_structure)
+    
+    def _inflight_key(self,
+                      prompt: str,
+                      model: str,
+                      temperature: float,
+                      max_tokens: int,
+                      expected_structure: Optional[List[str]] = None) -> str:
+        """Build the request coalescing key for a generation request."""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        structure = "|".join(expected_structure or [])
+        return f"{model}_{temperature:.2f}_{max_tokens}_{structure}_{prompt_hash}"
+    
+    def _generate_uncached(self,
+                           prompt: str,
+                           model: str,
+                           temperature: float,
+                           max_tokens: int,
+                           use_cache: bool,
+                           expected_structure: Optional[List[str]]) -> str:
+        """Generate a response for a cache miss and store it in the cache."""
         # 4. Simulate failure modes
-        risk_factors = self._simulate_failure_modes(prompt)
-        enhanced_prompt = prompt
+        enhanced_prompt = self._apply_guardrails(prompt)
         
-        if risk_factors["hallucination_risk"] > 0.7:
-            # Add guardrails if high risk detected
-            enhanced_prompt = self._add_factuality_constraints(prompt)
-            logger.info(f"Added factuality constraints due to high hallucination risk: {risk_factors['hallucination_risk']:.2f}")
+        try:
+            # 5. Generate with optimized parameters and backoff
+            response = self._generate_with_retries(enhanced_prompt, model, temperature, max_tokens)
+            
+            # 6. Validate output structure
+            if self._needs_formatting(response, expected_structure):
+                response = self._regenerate_with_formatting(enhanced_prompt, model, temperature)
+        except Exception as e:
+            # The fallback text is returned but never cached
+            return self._fallback_response(enhanced_prompt, model, temperature, max_tokens, e)
         
-        # 5. Generate with optimized parameters and backoff
-        response = self._generate_with_backoff(enhanced_prompt, model, temperature, max_tokens)
+        # 7. Cache the successful response if caching is enabled
+        if self._should_cache(use_cache, response):
+            self._update_cache(prompt, model, temperature, response)
         
-        # 6. Validate output structure
-        if expected_structure and not self._validate_output_structure(response, expected_structure):
-            logger.warning("Output structure validation failed, regenerating with formatting")
-            response = self._regenerate_with_formatting(enhanced_prompt, model, temperature)
+        return response
+    
+    async def agenerate_text(self,
+                             prompt: str,
+                             model: Optional[str] = None,
+                             temperature: Optional[float] = None,
+                             max_tokens: Optional[int] = None,
+                             use_cache: bool = True,
+                             task_complexity: str = "medium",
+                             expected_structure: Optional[List[str]] = None) -> str:
+        """Async variant of generate_text using the async provider clients.
         
-        # 7. Cache the successful response if caching is enabled
-        if use_cache and response:
+        Never blocks the event loop: provider calls go through AsyncOpenAI/AsyncAnthropic,
+        retries back off with asyncio.sleep and concurrent calls per provider are bounded
+        by a semaphore. Cancelling the awaiting task cancels the in-flight request.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            model: Optional model override
+            temperature: Optional temperature override
+            max_tokens: Optional max_tokens override
+            use_cache: Whether to use the cache
+            task_complexity: Complexity level ("low", "medium", "high")
+            expected_structure: Optional list of expected section headings
+            
+        Returns:
+            Generated text from the LLM, or error message if generation fails
+        """
+        invalid_response = self._invalid_prompt_response(prompt)
+        if invalid_response:
+            return invalid_response
+        
+        model, temperature, max_tokens = self._prepare_request(
+            prompt, model, temperature, max_tokens, task_complexity
+        )
+        
+        if use_cache:
+            cached_response = await self._acheck_cache(prompt, model, temperature)
+            if cached_response:
+                return cached_response
+            
+            inflight_key = self._inflight_key(prompt, model, temperature, max_tokens, expected_structure)
+            return await self._inflight.ado(
+                inflight_key,
+                lambda: self._agenerate_uncached(prompt, model, temperature, max_tokens, use_cache, expected_structure)
+            )
+        
+        return await self._agenerate_uncached(prompt, model, temperature, max_tokens, use_cache, expected_structure)
+    
+    async def _agenerate_uncached(self,
+                                  prompt: str,
+                                  model: str,
+                                  temperature: float,
+                                  max_tokens: int,
+                                  use_cache: bool,
+                                  expected_structure: Optional[List[str]]) -> str:
+        """Async variant of _generate_uncached."""
+        enhanced_prompt = self._apply_guardrails(prompt)
+        
+        try:
+            response = await self._agenerate_with_retries(enhanced_prompt, model, temperature, max_tokens)
+            
+            if self._needs_formatting(response, expected_structure):
+                response = await self._aregenerate_with_formatting(enhanced_prompt, model, temperature)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return self._fallback_response(enhanced_prompt, model, temperature, max_tokens, e)
+        
+        if self._should_cache(use_cache, response):
+            await self._aupdate_cache(prompt, model, temperature, response)
+        
+        return response
+    
+    def generate_text_stream(self,
+                             prompt: str,
+                             model: Optional[str] = None,
+                             temperature: Optional[float] = None,
+                             max_tokens: Optional[int] = None,
+                             use_cache: bool = True,
+                             task_complexity: str = "medium") -> Iterator[str]:
+        """Stream generated text as the provider produces it.
+        
+        A cached response is yielded as a single chunk. The complete response is
+        cached once the stream finishes. If the stream fails before the first chunk
+        the request falls back to the retrying non-streaming path; a stream that
+        fails after partial output re-raises the error and is not cached.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            model: Optional model override
+            temperature: Optional temperature override
+            max_tokens: Optional max_tokens override
+            use_cache: Whether to use the cache
+            task_complexity: Complexity level ("low", "medium", "high")
+            
+        Yields:
+            Text chunks of the response
+        """
+        invalid_response = self._invalid_prompt_response(prompt)
+        if invalid_response:
+            yield invalid_response
+            return
+        
+        model, temperature, max_tokens = self._prepare_request(
+            prompt, model, temperature, max_tokens, task_complexity
+        )
+        
+        if use_cache:
+            cached_response = self._check_cache(prompt, model, temperature)
+            if cached_response:
+                yield cached_response
+                return
+        
+        enhanced_prompt = self._apply_guardrails(prompt)
+        
+        chunks = []
+        try:
+            for chunk in self._stream_provider(enhanced_prompt, model, temperature, max_tokens):
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            self._handle_stream_error(chunks, e)
+            try:
+                response = self._generate_with_retries(enhanced_prompt, model, temperature, max_tokens)
+            except Exception as retry_error:
+                yield self._fallback_response(enhanced_prompt, model, temperature, max_tokens, retry_error)
+                return
+            chunks.append(response)
+            yield response
+        
+        response = "".join(chunks)
+        if self._should_cache(use_cache, response):
             self._update_cache(prompt, model, temperature, response)
+    
+    async def agenerate_text_stream(self,
+                                    prompt: str,
+                                    model: Optional[str] = None,
+                                    temperature: Optional[float] = None,
+                                    max_tokens: Optional[int] = None,
+                                    use_cache: bool = True,
+                                    task_complexity: str = "medium") -> AsyncIterator[str]:
+        """Async variant of generate_text_stream using the async provider clients.
+        
+        The provider semaphore is held for the lifetime of the stream.
+        """
+        invalid_response = self._invalid_prompt_response(prompt)
+        if invalid_response:
+            yield invalid_response
+            return
+        
+        model, temperature, max_tokens = self._prepare_request(
+            prompt, model, temperature, max_tokens, task_complexity
+        )
         
+        if use_cache:
+            cached_response = await self._acheck_cache(prompt, model, temperature)
+            if cached_response:
+                yield cached_response
+                return
+        
+        enhanced_prompt = self._apply_guardrails(prompt)
+        
+        chunks = []
+        try:
+            async with self._get_async_semaphore():
+                async for chunk in self._astream_provider(enhanced_prompt, model, temperature, max_tokens):
+                    chunks.append(chunk)
+                    yield chunk
+        except asyncio.CancelledError:
+            logger.info("Text streaming cancelled")
+            raise
+        except Exception as e:
+            self._handle_stream_error(chunks, e)
+            try:
+                response = await self._agenerate_with_retries(enhanced_prompt, model, temperature, max_tokens)
+            except asyncio.CancelledError:
+                raise
+            except Exception as retry_error:
+                yield self._fallback_response(enhanced_prompt, model, temperature, max_tokens, retry_error)
+                return
+            chunks.append(response)
+            yield response
+        
+        response = "".join(chunks)
+        if self._should_cache(use_cache, response):
+            await self._aupdate_cache(prompt, model, temperature, response)
+    
+    def _handle_stream_error(self, chunks: List[str], error: Exception):
+        """Re-raise a stream error after partial output; otherwise log the fallback to non-streaming generation."""
+        if chunks:
+            # Surface the failure so callers can tell a truncated response from a complete one
+            logger.error(f"Stream interrupted after partial output: {str(error)}")
+            raise error
+        logger.warning(f"Streaming failed, falling back to non-streaming generation: {str(error)}")
+    
+    def _fallback_response(self, prompt: str, model: str, temperature: float, max_tokens: int, error: Exception) -> str:
+        """Build the response returned once all retries have failed; it is never cached."""
+        error_msg = f"Error generating response after {self.max_retries} retries: {str(error)}"
+        # Fall back to mock if all retries fail
+        try:
+            mock_fallback = self._mock_text(prompt)
+            return f"{error_msg}\n\nFallback response: {mock_fallback}"
+        except Exception:
+            return error_msg
+    
+    def _retry_delay(self, retries: int, error: Exception) -> Optional[int]:
+        """Log a failed attempt and get the backoff before the next one, or None once retries are exhausted."""
+        logger.error(f"Error generating text (retry {retries}/{self.max_retries}): {str(error)}")
+        if retries > self.max_retries:
+            logger.error("Max retries exceeded")
+            return None
+        # Exponential backoff
+        wait_time = 2 ** retries
+        logger.info(f"Retrying in {wait_time} seconds...")
+        return wait_time
+    
+    def _coerce_response(self, response: Any) -> str:
+        """Make sure a provider response is a string."""
+        if not isinstance(response, str):
+            logger.warning(f"Response is not a string: {type(response)}")
+            response = str(response)
         return response
     
-    def _generate_with_backoff(self, prompt: str, model: str, temperature: float = None, max_tokens: int = None) -> str:
-        """Generate text with exponential backoff retry logic."""
+    def _generate_with_retries(self, prompt: str, model: str, temperature: float = None, max_tokens: int = None) -> str:
+        """Generate text with exponential backoff retry logic, raising the last error if all retries fail."""
+        temperature = temperature if temperature is not None else self.temperature
+        max_tokens = max_tokens or 4000
+        
+        retries = 0
+        
+        while True:
+            try:
+                generate = self._provider_method("_generate")
+                return self._coerce_response(generate(prompt, model, temperature, max_tokens))
+            except Exception as e:
+                retries += 1
+                wait_time = self._retry_delay(retries, e)
+                if wait_time is None:
+                    raise
+                time.sleep(wait_time)
+    
+    async def _agenerate_with_retries(self, prompt: str, model: str, temperature: float = None, max_tokens: int = None) -> str:
+        """Async variant of _generate_with_retries."""
         temperature = temperature if temperature is not None else self.temperature
         max_tokens = max_tokens or 4000
         
         retries = 0
-        last_error = None
         
-        while retries <= self.max_retries:
+        while True:
             try:
-                if not self.client and self.api_type != "mock":
-                    logger.warning("No API client available, falling back to mock implementation")
-                    response = self._generate_mock(prompt, model, temperature, max_tokens)
-                elif self.api_type == "openai":
-                    response = self._generate_openai(prompt, model, temperature, max_tokens)
-                elif self.api_type == "anthropic":
-                    response = self._generate_anthropic(prompt, model, temperature, max_tokens)
-                else:
-                    # Mock implementation
-                    response = self._generate_mock(prompt, model, temperature, max_tokens)
-                
-                # Verify response is a string
-                if not isinstance(response, str):
-                    logger.warning(f"Response is not a string: {type(response)}")
-                    response = str(response)
-                
-                return response
-                
+                generate = self._provider_method("_agenerate")
+                async with self._get_async_semaphore():
+                    response = await generate(prompt, model, temperature, max_tokens)
+                return self._coerce_response(response)
+            except asyncio.CancelledError:
+                logger.info("Text generation cancelled")
+                raise
             except Exception as e:
-                last_error = e
                 retries += 1
-                logger.error(f"Error generating text (retry {retries}/{self.max_retries}): {str(e)}")
-                if retries <= self.max_retries:
-                    # Exponential backoff
-                    wait_time = 2 ** retries
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error("Max retries exceeded")
-                    error_msg = f"Error generating response after {self.max_retries} retries: {str(e)}"
-                    # Fall back to mock if all retries fail
-                    try:
-                        mock_fallback = self._generate_mock(prompt, model, temperature, max_tokens)
-                        return f"{error_msg}\n\nFallback response: {mock_fallback}"
-                    except Exception:
-                        return error_msg
+                wait_time = self._retry_delay(retries, e)
+                if wait_time is None:
+                    raise
+                await asyncio.sleep(wait_time)
+    
+    def _get_async_client(self):
+        """Get the shared async API client for the current provider and event loop."""
+        api_key = self.openai_api_key if self.api_type == "openai" else self.anthropic_api_key
+        return get_async_client(self.api_type, api_key, self.config)
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """Get the per-provider concurrency semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with OptimizedLLMService._async_semaphores_lock:
+            semaphores = OptimizedLLMService._async_semaphores.setdefault(loop, {})
+            semaphore = semaphores.get(self.api_type)
+            if semaphore is None:
+                limits = self.config.get("max_concurrent_requests", {})
+                limit = limits.get(self.api_type, 8) if isinstance(limits, dict) else limits
+                semaphore = semaphores[self.api_type] = asyncio.Semaphore(limit)
+        return semaphore
+    
+    def _track_usage(self, model: str, prompt_tokens: int, completion_tokens: int, cost_factor: float = 1.0) -> float:
+        """Record token usage and cost for a completed request."""
+        # Calculate cost
+        model_params = self.model_params.get(model, {})
+        input_cost = (prompt_tokens / 1000) * model_params.get("input_cost_per_1k", 0.01)
+        output_cost = (completion_tokens / 1000) * model_params.get("output_cost_per_1k", 0.03)
+        request_cost = (input_cost + output_cost) * cost_factor
+        
+        with self._usage_lock:
+            self.cost_tracker["prompt_tokens"] += prompt_tokens
+            self.cost_tracker["completion_tokens"] += completion_tokens
+            self.cost_tracker["total_tokens"] += prompt_tokens + completion_tokens
+            self.cost_tracker["requests"] += 1
+            self.cost_tracker["total_cost"] += request_cost
+        
+        logger.info(f"Request cost: ${request_cost:.4f}, Total cost: ${self.cost_tracker['total_cost']:.4f}")
+        return request_cost
+    
+    def _anthropic_usage(self, completion: Any, prompt: str, model: str) -> Tuple[int, int]:
+        """Get prompt and completion token counts from an Anthropic response."""
+        usage = getattr(completion, "usage", None)
+        if usage is not None and getattr(usage, "input_tokens", None) is not None:
+            return usage.input_tokens, usage.output_tokens
+        
+        return self._estimate_tokens(prompt, model), self._estimate_tokens(completion.content[0].text, model)
     
     def _generate_openai(self, prompt: str, model: str, temperature: float, max_tokens: int) -> str:
         """Generate text using OpenAI API with usage tracking."""
@@ -450,19 +819,25 @@ IMPORTANT: Format your response with clear section headings and structure. Inclu
         
         # Track usage
         usage = completion.usage
-        self.cost_tracker["prompt_tokens"] += usage.prompt_tokens
-        self.cost_tracker["completion_tokens"] += usage.completion_tokens
-        self.cost_tracker["total_tokens"] += usage.total_tokens
-        self.cost_tracker["requests"] += 1
+        self._track_usage(model, usage.prompt_tokens, usage.completion_tokens)
         
-        # Calculate cost
-        model_params = self.model_params.get(model, {})
-        input_cost = (usage.prompt_tokens / 1000) * model_params.get("input_cost_per_1k", 0.01)
-        output_cost = (usage.completion_tokens / 1000) * model_params.get("output_cost_per_1k", 0.03)
-        request_cost = input_cost + output_cost
-        self.cost_tracker["total_cost"] += request_cost
+        return completion.choices[0].message.content
+    
+    async def _agenerate_openai(self, prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+        """Generate text using the async OpenAI client with usage tracking."""
+        client = self._get_async_client()
         
-        logger.info(f"Request cost: ${request_cost:.4f}, Total cost: ${self.cost_tracker['total_cost']:.4f}")
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=self.top_p,
+            timeout=self.request_timeout
+        )
+        
+        usage = completion.usage
+        self._track_usage(model, usage.prompt_tokens, usage.completion_tokens)
         
         return completion.choices[0].message.content
     
@@ -478,26 +853,35 @@ IMPORTANT: Format your response with clear section headings and structure. Inclu
             messages=[{"role": "user", "content": prompt}]
         )
         
-        # Track usage (estimated for Anthropic)
-        prompt_tokens = self._estimate_tokens(prompt)
-        completion_tokens = self._estimate_tokens(completion.content[0].text)
+        # Track usage, estimating only if the response carries no counts
+        prompt_tokens, completion_tokens = self._anthropic_usage(completion, prompt, model)
+        self._track_usage(model, prompt_tokens, completion_tokens)
         
-        self.cost_tracker["prompt_tokens"] += prompt_tokens
-        self.cost_tracker["completion_tokens"] += completion_tokens
-        self.cost_tracker["total_tokens"] += prompt_tokens + completion_tokens
-        self.cost_tracker["requests"] += 1
+        return completion.content[0].text
+    
+    async def _agenerate_anthropic(self, prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+        """Generate text using the async Anthropic client with usage tracking."""
+        client = self._get_async_client()
         
-        # Calculate cost
-        model_params = self.model_params.get(model, {})
-        input_cost = (prompt_tokens / 1000) * model_params.get("input_cost_per_1k", 0.01)
-        output_cost = (completion_tokens / 1000) * model_params.get("output_cost_per_1k", 0.03)
-        request_cost = input_cost + output_cost
-        self.cost_tracker["total_cost"] += request_cost
+        completion = await client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=self.request_timeout
+        )
         
-        logger.info(f"Request cost: ${request_cost:.4f}, Total cost: ${self.cost_tracker['total_cost']:.4f}")
+        # Track usage, estimating only if the response carries no counts
+        prompt_tokens, completion_tokens = self._anthropic_usage(completion, prompt, model)
+        self._track_usage(model, prompt_tokens, completion_tokens)
         
         return completion.content[0].text
     
+    def _mock_text(self, prompt: str) -> str:
+        """Create a simple mock response based on the prompt."""
+        first_line = prompt.strip().split("\n")[0]
+        return f"Mock response to: {first_line[:50]}...\n\nThis is a simulated response as no LLM API is configured."
+    
     def _generate_mock(self, prompt: str, model: str, temperature: float, max_tokens: int) -> str:
         """Generate mock responses for testing."""
         # Simple mock implementation that echoes part of the prompt
@@ -506,9 +890,316 @@ IMPORTANT: Format your response with clear section headings and structure. Inclu
         # Wait to simulate API call
         time.sleep(1)
         
-        # Create a simple response based on the prompt
-        first_line = prompt.strip().split("\n")[0]
-        return f"Mock response to: {first_line[:50]}...\n\nThis is a simulated response as no LLM API is configured."
+        return self._mock_text(prompt)
+    
+    async def _agenerate_mock(self, prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+        """Generate mock responses for testing without blocking the event loop."""
+        logger.warning("Using mock LLM implementation")
+        
+        # Wait to simulate API call
+        await asyncio.sleep(1)
+        
+        return self._mock_text(prompt)
+    
+    def _stream_provider(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Stream text chunks from the configured provider."""
+        yield from self._provider_method("_stream")(prompt, model, temperature, max_tokens)
+    
+    async def _astream_provider(self, prompt: str, model: str, temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Stream text chunks from the configured provider's async client."""
+        async for chunk in self._provider_method("_astream")(prompt, model, temperature, max_tokens):
+            yield chunk
+    
+    def _track_stream_usage(self, model: str, prompt: str, chunks: List[str], usage: Any = None):
+        """Record usage for a finished stream, counting tokens if the provider reported none."""
+        if usage is not None:
+            self._track_usage(model, usage.prompt_tokens, usage.completion_tokens)
+        else:
+            self._track_usage(model, self._estimate_tokens(prompt, model), self._estimate_tokens("".join(chunks), model))
+    
+    def _stream_openai(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Stream text using the OpenAI API with usage tracking."""
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=self.top_p,
+            timeout=self.request_timeout,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        chunks, usage = [], None
+        for event in stream:
+            # The final event carries usage and no choices
+            if getattr(event, "usage", None):
+                usage = event.usage
+            if event.choices and event.choices[0].delta.content:
+                chunks.append(event.choices[0].delta.content)
+                yield event.choices[0].delta.content
+        
+        self._track_stream_usage(model, prompt, chunks, usage)
+    
+    async def _astream_openai(self, prompt: str, model: str, temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Stream text using the async OpenAI client with usage tracking."""
+        client = self._get_async_client()
+        
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=self.top_p,
+            timeout=self.request_timeout,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        
+        chunks, usage = [], None
+        async for event in stream:
+            if getattr(event, "usage", None):
+                usage = event.usage
+            if event.choices and event.choices[0].delta.content:
+                chunks.append(event.choices[0].delta.content)
+                yield event.choices[0].delta.content
+        
+        self._track_stream_usage(model, prompt, chunks, usage)
+    
+    def _stream_anthropic(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Stream text using the Anthropic API with usage tracking."""
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
+            message = stream.get_final_message()
+        
+        prompt_tokens, completion_tokens = self._anthropic_usage(message, prompt, model)
+        self._track_usage(model, prompt_tokens, completion_tokens)
+    
+    async def _astream_anthropic(self, prompt: str, model: str, temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Stream text using the async Anthropic client with usage tracking."""
+        client = self._get_async_client()
+        
+        async with client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=self.request_timeout
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            message = await stream.get_final_message()
+        
+        prompt_tokens, completion_tokens = self._anthropic_usage(message, prompt, model)
+        self._track_usage(model, prompt_tokens, completion_tokens)
+    
+    def _stream_mock(self, prompt: str, model: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """Stream a mock response word by word."""
+        logger.warning("Using mock LLM implementation")
+        
+        for chunk in re.findall(r"\S+\s*", self._mock_text(prompt)):
+            time.sleep(0.05)
+            yield chunk
+    
+    async def _astream_mock(self, prompt: str, model: str, temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        """Stream a mock response word by word without blocking the event loop."""
+        logger.warning("Using mock LLM implementation")
+        
+        for chunk in re.findall(r"\S+\s*", self._mock_text(prompt)):
+            await asyncio.sleep(0.05)
+            yield chunk
+    
+    def submit_batch(self,
+                     prompts: List[str],
+                     model: Optional[str] = None,
+                     temperature: Optional[float] = None,
+                     max_tokens: Optional[int] = None,
+                     task_complexity: str = "medium") -> str:
+        """Submit prompts as a bulk batch job for non-interactive pipelines.
+        
+        Prompts already in the cache are not submitted again and identical prompts
+        are submitted once. Results fill the response cache when the job completes,
+        so later generate_text calls for the same prompts are cache hits.
+        
+        Args:
+            prompts: Prompts to generate responses for
+            model: Optional model override
+            temperature: Optional temperature override
+            max_tokens: Optional max_tokens override
+            task_complexity: Complexity level ("low", "medium", "high")
+            
+        Returns:
+            Job id to poll, wait for or resume the job with
+        """
+        job_id = self.batch_store.new_job_id()
+        job = {
+            "job_id": job_id,
+            "backend": None,
+            "provider_job_id": None,
+            "status": STATUS_SUBMITTED,
+            "created_at": datetime.now().isoformat(),
+            "order": [],
+            "requests": {},
+            "responses": {},
+            "errors": {}
+        }
+        batch_requests = []
+        
+        for prompt in prompts:
+            req_model, req_temperature, req_max_tokens = self._prepare_request(
+                prompt, model, temperature, max_tokens, task_complexity
+            )
+            custom_id = self._generate_cache_key(prompt, req_model, req_temperature)
+            job["order"].append(custom_id)
+            if custom_id in job["requests"] or custom_id in job["responses"]:
+                continue
+            
+            cached_response = self.cache.get(custom_id)
+            if cached_response is not None:
+                job["responses"][custom_id] = cached_response
+                continue
+            
+            job["requests"][custom_id] = {"prompt": prompt, "model": req_model, "temperature": req_temperature}
+            batch_requests.append({
+                "custom_id": custom_id,
+                "prompt": self._apply_guardrails(prompt),
+                "model": req_model,
+                "temperature": req_temperature,
+                "max_tokens": req_max_tokens
+            })
+        
+        backend = self._get_batch_backend()
+        job["backend"] = backend.name
+        if batch_requests:
+            input_path = self.batch_store.write_input(job_id, batch_requests)
+            job["provider_job_id"] = backend.submit(input_path, batch_requests)
+        else:
+            job["status"] = STATUS_COMPLETED
+        
+        self.batch_store.save(job)
+        logger.info(f"Submitted batch job {job_id} with {len(batch_requests)} requests "
+                    f"({len(prompts) - len(batch_requests)} cached or duplicate) via {backend.name} backend")
+        return job_id
+    
+    def get_batch_status(self, job_id: str) -> Dict[str, Any]:
+        """Poll a batch job once and collect its results if it has finished.
+        
+        Args:
+            job_id: Job id returned by submit_batch
+            
+        Returns:
+            Dictionary with the job status and progress counts
+        """
+        job = self._load_batch_job(job_id)
+        
+        if job["status"] == STATUS_SUBMITTED:
+            backend = self._get_batch_backend(job["backend"])
+            status = backend.status(job["provider_job_id"])
+            if status == STATUS_COMPLETED:
+                self._collect_batch_results(job, backend)
+            elif status == STATUS_FAILED:
+                job["status"] = STATUS_FAILED
+                self.batch_store.save(job)
+                logger.error(f"Batch job {job_id} failed at the provider")
+        
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "backend": job["backend"],
+            "total": len(job["order"]),
+            "submitted": len(job["requests"]),
+            "completed": len(job["responses"]),
+            "errors": len(job["errors"])
+        }
+    
+    def wait_for_batch(self, job_id: str, poll_interval: Optional[float] = None, timeout: Optional[float] = None) -> List[Optional[str]]:
+        """Poll a batch job until it finishes and return its responses.
+        
+        Can be called from a new process to resume a previously submitted job.
+        
+        Args:
+            job_id: Job id returned by submit_batch
+            poll_interval: Seconds between polls
+            timeout: Optional maximum seconds to wait
+            
+        Returns:
+            Responses in prompt order, None for prompts that failed
+        """
+        poll_interval = poll_interval if poll_interval is not None else self.config.get("batch_poll_interval", 30)
+        start_time = time.time()
+        
+        while self.get_batch_status(job_id)["status"] == STATUS_SUBMITTED:
+            if timeout is not None and time.time() - start_time >= timeout:
+                raise TimeoutError(f"Batch job {job_id} still running after {timeout} seconds")
+            time.sleep(poll_interval)
+        
+        return self.get_batch_results(job_id)
+    
+    def get_batch_results(self, job_id: str) -> List[Optional[str]]:
+        """Get the responses collected for a batch job, in prompt order.
+        
+        Args:
+            job_id: Job id returned by submit_batch
+            
+        Returns:
+            Responses in prompt order, None for prompts that failed or are still pending
+        """
+        job = self._load_batch_job(job_id)
+        return [job["responses"].get(custom_id) for custom_id in job["order"]]
+    
+    def _load_batch_job(self, job_id: str) -> Dict[str, Any]:
+        """Load a batch job or raise if it does not exist."""
+        job = self.batch_store.load(job_id)
+        if job is None:
+            raise ValueError(f"Unknown batch job: {job_id}")
+        return job
+    
+    def _get_batch_backend(self, name: Optional[str] = None):
+        """Create the batch backend for a job."""
+        name = name or self.config.get("batch_backend", "auto")
+        if name == "auto":
+            name = self.api_type if self.client and self.api_type in ("openai", "anthropic") else "local"
+        
+        if name == "local":
+            # Failures must raise so they are recorded as errors, not fallback responses
+            return LocalBatchBackend(self._generate_with_retries)
+        if name != self.api_type or not self.client:
+            raise ValueError(f"Batch backend '{name}' requires an initialized {name} client")
+        if name == "openai":
+            return OpenAIBatchBackend(self.client, self.config.get("batch_completion_window", "24h"))
+        return AnthropicBatchBackend(self.client)
+    
+    def _collect_batch_results(self, job: Dict[str, Any], backend):
+        """Store the results of a finished batch job and fill the response cache."""
+        cost_factor = self.config.get("batch_cost_factor", 0.5)
+        
+        for result in backend.results(job["provider_job_id"]):
+            request = job["requests"].get(result["custom_id"])
+            if request is None:
+                continue
+            
+            if "response" in result:
+                job["responses"][result["custom_id"]] = result["response"]
+                # Local results without a provider client are mock output and stay uncached
+                if self._should_cache(True, result["response"]):
+                    self._update_cache(request["prompt"], request["model"], request["temperature"], result["response"])
+                # The local backend tracks usage itself through _generate_with_retries
+                if "prompt_tokens" in result:
+                    self._track_usage(request["model"], result["prompt_tokens"], result["completion_tokens"], cost_factor)
+            else:
+                job["errors"][result["custom_id"]] = result.get("error")
+        
+        job["status"] = STATUS_COMPLETED
+        job["completed_at"] = datetime.now().isoformat()
+        self.batch_store.save(job)
+        logger.info(f"Batch job {job['job_id']} completed: {len(job['responses'])} responses, "
+                    f"{len(job['errors'])} errors")
     
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get usage statistics for the LLM service."""
@@ -517,6 +1208,11 @@ IMPORTANT: Format your response with clear section headings and structure. Inclu
             "model": self.model,
             "cache_entries": len(self.cache),
             "cache_ttl": self.cache_ttl,
+            "cache": self.cache.get_stats(),
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache else None,
+            "coalescing": self._inflight.get_stats(),
+            "token_counter": self.token_counter.get_stats(),
+            "clients": get_registry_stats(),
             "total_tokens": self.cost_tracker["total_tokens"],
             "prompt_tokens": self.cost_tracker["prompt_tokens"],
             "completion_tokens": self.cost_tracker["completion_tokens"],
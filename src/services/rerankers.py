@@ -0,0 +1,160 @@
+"""
+Local rerankers for Domain-SC retrieval.
+These score (query, chunk) pairs without any LLM calls so that candidate
+filtering in the RAG service costs no tokens. Raw model scores are mapped
+onto the scale of LLM relevance scores (0-10 divided by 10), so the same
+min_relevance thresholds apply whichever scorer is configured.
+"""
+
+import logging
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+from src.utils.sentence_models import HAVE_SENTENCE_TRANSFORMERS, get_sentence_transformer, get_cross_encoder
+
+logger = setup_logger(__name__, "rag_service.log")
+
+
+class BaseReranker:
+    """Base class for local relevance scorers."""
+
+    name = "base"
+
+    # Raw scores mapped to relevance 0 and 1; subclasses set model-specific defaults
+    score_range = (0.0, 1.0)
+
+    def calibrate(self, raw_scores) -> List[float]:
+        """Map raw model scores linearly onto the 0-1 LLM relevance scale, clipped."""
+        low, high = self.score_range
+        raw_scores = np.asarray(raw_scores, dtype=np.float32)
+        return np.clip((raw_scores - low) / (high - low), 0.0, 1.0).tolist()
+
+    def score(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Score documents against a query.
+
+        Args:
+            query: The search query
+            documents: Candidate documents as returned by the vector store
+
+        Returns:
+            Relevance scores on the 0-1 LLM relevance scale, in the same order as documents
+        """
+        raise NotImplementedError
+
+
+class EmbeddingReranker(BaseReranker):
+    """Scores candidates by cosine similarity between query and chunk embeddings.
+
+    Chunk embeddings returned by the vector store are reused when present, so
+    only the query has to be encoded.
+    """
+
+    name = "embedding"
+
+    # MiniLM cosine similarities: unrelated text scores ~0-0.1, relevant chunks
+    # commonly 0.3-0.6, so a cosine of ~0.28 lands on the default 0.45 threshold
+    score_range = (0.05, 0.55)
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", score_range=None):
+        """Initialize the embedding reranker.
+
+        Args:
+            model_name: Sentence-transformers model
+            score_range: Cosine similarities mapped to relevance 0 and 1
+        """
+        self.model_name = model_name
+        if score_range is not None:
+            self.score_range = tuple(score_range)
+        self.model = get_sentence_transformer(model_name)
+
+    def score(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Score all documents with a single matrix-vector product."""
+        if not documents:
+            return []
+
+        query_embedding = np.asarray(self.model.encode(query), dtype=np.float32)
+
+        stored = [doc.get("embedding") for doc in documents]
+        if all(embedding is not None for embedding in stored):
+            doc_embeddings = np.asarray(stored, dtype=np.float32)
+        else:
+            contents = [doc.get("document", doc.get("text", "")) for doc in documents]
+            doc_embeddings = np.asarray(self.model.encode(contents, batch_size=32), dtype=np.float32)
+
+        # Normalize once, then score every chunk at once
+        query_embedding /= max(np.linalg.norm(query_embedding), 1e-12)
+        doc_embeddings /= np.maximum(np.linalg.norm(doc_embeddings, axis=1, keepdims=True), 1e-12)
+        similarities = doc_embeddings @ query_embedding
+
+        return self.calibrate(similarities)
+
+
+class CrossEncoderReranker(BaseReranker):
+    """Scores candidates with a local cross-encoder over (query, chunk) pairs."""
+
+    name = "cross_encoder"
+
+    # ms-marco logits: irrelevant passages score around -10, relevant ones above 0
+    score_range = (-5.0, 5.0)
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", batch_size: int = 32,
+                 score_range=None):
+        """Initialize the cross-encoder reranker.
+
+        Args:
+            model_name: Cross-encoder model
+            batch_size: Pairs scored per forward pass
+            score_range: Logits mapped to relevance 0 and 1
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        if score_range is not None:
+            self.score_range = tuple(score_range)
+        self.model = get_cross_encoder(model_name)
+
+    def score(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Score all (query, chunk) pairs in one batched forward pass."""
+        if not documents:
+            return []
+
+        pairs = [(query, doc.get("document", doc.get("text", ""))) for doc in documents]
+        logits = np.asarray(self.model.predict(pairs, batch_size=self.batch_size), dtype=np.float32)
+
+        return self.calibrate(logits)
+
+
+def create_reranker(backend: str, settings: Dict[str, Any]) -> Optional[BaseReranker]:
+    """Create a local reranker for the configured backend.
+
+    Args:
+        backend: "embedding", "cross_encoder" or "llm"
+        settings: RAG settings providing model names
+
+    Returns:
+        A reranker instance, or None if the LLM path should be used
+    """
+    if backend in (None, "", "llm"):
+        return None
+
+    if not HAVE_SENTENCE_TRANSFORMERS:
+        logger.warning(f"sentence-transformers not installed, falling back to LLM relevance scoring "
+                       f"instead of '{backend}' reranker")
+        return None
+
+    try:
+        if backend == "embedding":
+            return EmbeddingReranker(settings.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2"),
+                                     score_range=settings.get("embedding_score_range"))
+        if backend == "cross_encoder":
+            return CrossEncoderReranker(
+                settings.get("cross_encoder_model", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+                score_range=settings.get("cross_encoder_score_range")
+            )
+    except Exception as e:
+        logger.warning(f"Error loading '{backend}' reranker, falling back to LLM relevance scoring: {str(e)}")
+        return None
+
+    logger.warning(f"Unknown reranker backend '{backend}', falling back to LLM relevance scoring")
+    return None
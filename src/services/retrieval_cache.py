@@ -0,0 +1,95 @@
+"""
+Retrieval result cache for Domain-SC.
+Keeps the documents retrieved for recent queries in a bounded LRU, keyed on the
+normalized query, retrieval parameters, collection and index version, so
+repeated retrievals skip embedding, vector search and relevance scoring.
+"""
+
+import copy
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "rag_service.log")
+
+# (normalized query, min_relevance, top_k, collection, index version)
+CacheKey = Tuple[str, float, int, str, str]
+
+
+def normalize_query(query: str) -> str:
+    """Normalize case and whitespace so trivially different queries share an entry."""
+    return " ".join(query.lower().split())
+
+
+class RetrievalCache:
+    """In-memory LRU of retrieval results."""
+
+    def __init__(self, max_entries: int = 512):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached query results; 0 disables caching
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[CacheKey, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, min_relevance: float, top_k: int, collection: str, index_version: str) -> CacheKey:
+        """Build the cache key of a retrieval."""
+        return (normalize_query(query), round(float(min_relevance), 6), int(top_k), collection, str(index_version))
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached documents for a key, or None on a miss."""
+        with self._lock:
+            documents = self._entries.get(key)
+            if documents is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers may annotate the documents they get back
+        return copy.deepcopy(documents)
+
+    def put(self, key: CacheKey, documents: List[Dict[str, Any]]) -> None:
+        """Store the documents retrieved for a key."""
+        if self.max_entries <= 0:
+            return
+        documents = copy.deepcopy(documents)
+        with self._lock:
+            self._entries[key] = documents
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached results, e.g. after the index changed."""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,161 @@
+"""
+Request coalescing (single-flight) for Domain-SC services.
+Concurrent calls with the same key share one in-flight execution and all
+receive its result. Thread-based and asyncio-based callers share one table,
+so a thread and a task (in any event loop) asking for the same key coalesce.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import logging
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "llm_service.log")
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Get the event loop running in this thread, or None."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _InFlightCall:
+    """State of a call shared by concurrent callers."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        # Event loop running the call as a task, None when a thread runs it
+        self.loop = loop
+        self.task: Optional[asyncio.Task] = None
+        # Callers other than a synchronous leader waiting for the result
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent executions that share a key."""
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _InFlightCall] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all callers concurrently calling with the same key.
+
+        A thread joining a call that an event loop runs blocks until it
+        finishes, unless that loop runs in the calling thread, in which case
+        fn is executed without coalescing rather than deadlocking the loop.
+
+        Args:
+            key: Deduplication key
+            fn: Function to execute
+
+        Returns:
+            The result of fn; errors raised by fn are re-raised in every caller
+        """
+        running = _running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            # Waiting in the thread of the loop running the call would deadlock that loop
+            leader = call is None or (call.loop is not None and call.loop is running)
+            if leader:
+                call = _InFlightCall()
+                self._calls.setdefault(key, call)
+                self.executions += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            logger.info("Joining in-flight request with identical parameters")
+            try:
+                return call.future.result()
+            finally:
+                with self._lock:
+                    call.waiters -= 1
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, call)
+            call.future.set_exception(e)
+            raise
+        self._finish(key, call)
+        call.future.set_result(result)
+        return result
+
+    async def ado(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await coro_fn once for all callers concurrently calling with the same key.
+
+        The shared execution runs as its own task. It is only cancelled when
+        every caller waiting on it has been cancelled.
+
+        Args:
+            key: Deduplication key
+            coro_fn: Function returning the coroutine to execute
+
+        Returns:
+            The result of the coroutine
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _InFlightCall(loop)
+                call.task = loop.create_task(coro_fn())
+                call.task.add_done_callback(lambda task: self._finish_task(key, call, task))
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                logger.info("Joining in-flight request with identical parameters")
+                self.coalesced += 1
+            call.waiters += 1
+
+        cancelled = False
+        try:
+            # Shield so one cancelled caller does not cancel the result for the others
+            return await asyncio.shield(asyncio.wrap_future(call.future))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = cancelled and call.waiters == 0 and not call.future.done()
+            if abandoned and call.task is not None:
+                # Last interested caller gave up, cancel the shared request
+                if call.loop is loop:
+                    call.task.cancel()
+                else:
+                    call.loop.call_soon_threadsafe(call.task.cancel)
+
+    def _finish(self, key: str, call: _InFlightCall):
+        """Remove a finished call from the in-flight table."""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def _finish_task(self, key: str, call: _InFlightCall, task: asyncio.Task):
+        """Publish the outcome of a shared task to every caller waiting on it."""
+        self._finish(key, call)
+        if task.cancelled():
+            call.future.cancel()
+        elif task.exception() is not None:
+            call.future.set_exception(task.exception())
+        else:
+            call.future.set_result(task.result())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get execution and coalescing counters."""
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls)
+        }
@@ -0,0 +1,220 @@
+"""
+Sparse BM25 retrieval for Domain-SC.
+An inverted index over the same chunks as the vector store, maintained by the
+incremental indexer, so exact identifiers such as "CQRS" or "TOGAF ADM" are
+found even when dense similarity misses them. Results are combined with dense
+results by rank fusion.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import threading
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "rag_service.log")
+
+# Identifiers such as "event-sourcing", "v1.2" or "snake_case" stay one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or that the their "
+    "this to was were will with which".split()
+)
+
+_REGISTRY_LOCK = threading.Lock()
+_INDEXES: Dict[str, "BM25Index"] = {}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms without stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 inverted index, persisted as a JSON file of per-chunk term counts."""
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        """Initialize the index, loading it from disk if present.
+
+        Args:
+            path: JSON file the index is persisted to; None keeps it in memory
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+
+        # Chunk id -> term counts; postings are derived from it
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for doc_id, terms in json.load(f).get("docs", {}).items():
+                        self._add(doc_id, terms)
+            except Exception as e:
+                logger.warning(f"Error loading BM25 index, rebuilding it: {str(e)}")
+                self.doc_terms, self.postings, self.doc_lengths, self.total_length = {}, {}, {}, 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def _add(self, doc_id: str, terms: Dict[str, int]):
+        self.doc_terms[doc_id] = terms
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        length = sum(terms.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+    def _remove(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    def add(self, ids: List[str], texts: List[str]):
+        """Add or replace chunks."""
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                self._remove(doc_id)
+                self._add(doc_id, dict(Counter(tokenize(text or ""))))
+
+    def remove(self, ids: List[str]):
+        """Remove chunks."""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def clear(self):
+        """Remove all chunks."""
+        with self._lock:
+            self.doc_terms, self.postings, self.doc_lengths, self.total_length = {}, {}, {}, 0
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Find the chunks with the highest BM25 score for a query.
+
+        Args:
+            query: Query text
+            top_k: Number of results
+
+        Returns:
+            List of (chunk id, score), best first
+        """
+        with self._lock:
+            if not self.doc_terms:
+                return []
+            n_docs = len(self.doc_terms)
+            avg_length = self.total_length / n_docs or 1.0
+
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def save(self):
+        """Write the index atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"docs": self.doc_terms}, f)
+            os.replace(tmp_path, self.path)
+
+    def rebuild_from(self, collection, batch_size: int = 1000) -> int:
+        """Rebuild the index from the documents stored in a collection.
+
+        Returns:
+            Number of chunks indexed
+        """
+        self.clear()
+        offset = 0
+        while True:
+            page = collection.get(include=["documents"], limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            self.add(page["ids"], page["documents"])
+            offset += len(page["ids"])
+        self.save()
+        logger.info(f"Rebuilt BM25 index from {offset} stored chunks")
+        return offset
+
+
+def get_bm25_index(path: str, k1: float = 1.5, b: float = 0.75) -> BM25Index:
+    """Get the shared BM25 index persisted at a path."""
+    path = os.path.abspath(path)
+    with _REGISTRY_LOCK:
+        if path not in _INDEXES:
+            _INDEXES[path] = BM25Index(path, k1=k1, b=b)
+        return _INDEXES[path]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60,
+                           weights: Optional[List[float]] = None) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists by reciprocal rank.
+
+    Args:
+        rankings: Id lists, best first
+        k: Rank constant damping the weight of top ranks
+        weights: Optional weight per ranking
+
+    Returns:
+        List of (id, fused score), best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_score_fusion(scored: List[List[Tuple[str, float]]],
+                          weights: Optional[List[float]] = None) -> List[Tuple[str, float]]:
+    """Fuse scored id lists by a weighted sum of min-max normalized scores.
+
+    Args:
+        scored: Lists of (id, score) where higher is better
+        weights: Optional weight per list
+
+    Returns:
+        List of (id, fused score), best first
+    """
+    weights = weights or [1.0] * len(scored)
+    fused: Dict[str, float] = {}
+    for results, weight in zip(scored, weights):
+        if not results:
+            continue
+        values = [score for _, score in results]
+        low, high = min(values), max(values)
+        for doc_id, score in results:
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight * normalized
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,647 @@
+"""
+Vector store backends for Domain-SC.
+Besides Chroma, collections can be served by an in-process ANN index
+(hnswlib or FAISS HNSW) or by exact search. Non-Chroma collections keep their
+vectors in a memory-mapped float32 file and documents and metadata in a SQLite
+sidecar, and expose the subset of the Chroma collection API that the RAG
+service and the incremental indexer use, so the backend can be chosen through
+RAG_SETTINGS without touching callers.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "rag_service.log")
+
+# If available, use hnswlib and FAISS for approximate nearest-neighbour search
+try:
+    import hnswlib
+    HAVE_HNSWLIB = True
+except ImportError:
+    HAVE_HNSWLIB = False
+
+try:
+    import faiss
+    HAVE_FAISS = True
+except ImportError:
+    HAVE_FAISS = False
+
+# "flat" is exact search over the memory-mapped vectors, with no ANN index
+BACKENDS = ("chroma", "hnsw", "faiss", "flat")
+
+DEFAULT_ANN_SETTINGS = {
+    "ann_m": 16,
+    "ann_ef_construction": 200,
+    "ann_ef_search": 64,
+    "ann_initial_capacity": 10000,
+    "ann_compact_ratio": 0.25
+}
+
+_REGISTRY_LOCK = threading.Lock()
+_COLLECTIONS: Dict[str, "ANNCollection"] = {}
+
+
+class HNSWLibIndex:
+    """hnswlib graph over inner-product similarity of normalized vectors."""
+
+    def __init__(self, dim: int, settings: Dict[str, Any]):
+        if not HAVE_HNSWLIB:
+            raise ImportError("hnswlib not installed. Install with: pip install hnswlib")
+        self.settings = settings
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        self.index.init_index(max_elements=settings["ann_initial_capacity"],
+                              ef_construction=settings["ann_ef_construction"],
+                              M=settings["ann_m"])
+        self.index.set_ef(settings["ann_ef_search"])
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray):
+        needed = self.index.get_current_count() + len(labels)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(vectors, labels)
+
+    def delete(self, labels: List[int]):
+        for label in labels:
+            self.index.mark_deleted(int(label))
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return labels and similarities of the k nearest live vectors per query."""
+        self.index.set_ef(max(self.settings["ann_ef_search"], k))
+        labels, distances = self.index.knn_query(queries, k=k)
+        return labels.astype(np.int64), 1.0 - distances
+
+    def save(self, path: str):
+        self.index.save_index(path)
+
+    def load(self, path: str, deleted: List[int]):
+        # Deletions are stored in the index file itself
+        self.index.load_index(path, max_elements=self.settings["ann_initial_capacity"])
+        self.index.set_ef(self.settings["ann_ef_search"])
+
+
+class FaissHNSWIndex:
+    """FAISS HNSW index over inner-product similarity of normalized vectors.
+
+    FAISS HNSW cannot remove vectors, so deleted labels are excluded at search
+    time with an ID selector until the collection is compacted.
+
+    A saved index is memory-mapped on load, so searches page it in from disk
+    instead of reading it into memory. A mapped index is read-only; it is read
+    into memory on the first add.
+    """
+
+    def __init__(self, dim: int, settings: Dict[str, Any]):
+        if not HAVE_FAISS:
+            raise ImportError("faiss not installed. Install with: pip install faiss-cpu")
+        self.settings = settings
+        self.index = faiss.IndexHNSWFlat(dim, settings["ann_m"], faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efConstruction = settings["ann_ef_construction"]
+        self.deleted: set = set()
+        self._mapped_path: Optional[str] = None
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray):
+        if self._mapped_path is not None:
+            self.index = faiss.read_index(self._mapped_path)
+            self._mapped_path = None
+        # Labels are vector file rows, which FAISS assigns in the same order
+        if len(labels) and labels[0] != self.index.ntotal:
+            raise ValueError(f"Non-sequential FAISS labels: expected {self.index.ntotal}, got {labels[0]}")
+        self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def delete(self, labels: List[int]):
+        self.deleted.update(int(label) for label in labels)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return labels and similarities of the k nearest live vectors per query."""
+        params = faiss.SearchParametersHNSW(efSearch=max(self.settings["ann_ef_search"], k))
+        if self.deleted:
+            excluded = faiss.IDSelectorBatch(np.fromiter(self.deleted, dtype=np.int64))
+            params.sel = faiss.IDSelectorNot(excluded)
+        similarities, labels = self.index.search(np.ascontiguousarray(queries, dtype=np.float32), k, params=params)
+        return labels.astype(np.int64), similarities
+
+    def save(self, path: str):
+        faiss.write_index(self.index, path)
+
+    def load(self, path: str, deleted: List[int]):
+        try:
+            self.index = faiss.read_index(path, faiss.IO_FLAG_MMAP)
+            self._mapped_path = path
+        except (AttributeError, RuntimeError) as e:
+            # Older FAISS builds cannot map HNSW indexes
+            logger.debug(f"Memory-mapping {path} failed, reading it into memory: {str(e)}")
+            self.index = faiss.read_index(path)
+            self._mapped_path = None
+        self.deleted = set(deleted)
+
+
+ANN_INDEXES = {"hnsw": HNSWLibIndex, "faiss": FaissHNSWIndex}
+
+
+class ANNCollection:
+    """Chroma-compatible collection backed by a local vector index.
+
+    Layout of the collection directory:
+        vectors.f32   float32 vectors, one row per label, memory-mapped for reads
+        meta.sqlite3  ids, documents, metadata and the label of every live chunk
+        index.bin     ANN index (hnsw and faiss backends)
+        params.json   backend, dimension and index parameters
+
+    Vectors are expected to be normalized; similarity is the inner product and
+    reported distances are cosine distances.
+    """
+
+    def __init__(self,
+                 path: str,
+                 backend: str = "hnsw",
+                 settings: Optional[Dict[str, Any]] = None,
+                 embed_fn: Optional[Callable[[List[str]], Any]] = None):
+        """Initialize the collection, loading it from disk if present.
+
+        Args:
+            path: Collection directory
+            backend: "hnsw", "faiss" or "flat"
+            settings: ANN settings (ann_m, ann_ef_construction, ann_ef_search, ...)
+            embed_fn: Function embedding texts, used for query_texts and for
+                writes without precomputed embeddings
+        """
+        if backend not in ANN_INDEXES and backend != "flat":
+            raise ValueError(f"Unknown ANN backend: {backend}")
+
+        self.path = path
+        self.name = os.path.basename(path)
+        self.backend = backend
+        self.settings = dict(DEFAULT_ANN_SETTINGS, **{k: v for k, v in (settings or {}).items()
+                                                      if k in DEFAULT_ANN_SETTINGS})
+        self.embed_fn = embed_fn
+        self._lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        self._vector_path = os.path.join(path, "vectors.f32")
+        self._index_path = os.path.join(path, "index.bin")
+        self._params_path = os.path.join(path, "params.json")
+
+        self._conn = sqlite3.connect(os.path.join(path, "meta.sqlite3"), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "id TEXT PRIMARY KEY, label INTEGER UNIQUE NOT NULL, document TEXT, metadata TEXT)"
+            )
+
+        self.dim: Optional[int] = None
+        self.index = None
+        self._vectors: Optional[np.memmap] = None
+        self._live_labels: Optional[np.ndarray] = None
+        self._dirty = False
+        self._load()
+
+    # Storage
+
+    def _load(self):
+        """Load parameters and the ANN index from disk."""
+        if not os.path.exists(self._params_path):
+            return
+        with open(self._params_path, "r", encoding="utf-8") as f:
+            params = json.load(f)
+        self.dim = params["dim"]
+
+        if self.backend in ANN_INDEXES:
+            self.index = ANN_INDEXES[self.backend](self.dim, self.settings)
+            if os.path.exists(self._index_path) and params.get("backend") == self.backend \
+                    and params.get("rows") == self._rows():
+                try:
+                    self.index.load(self._index_path, self._dead_labels())
+                    return
+                except Exception as e:
+                    logger.warning(f"Error loading {self.backend} index for {self.name}: {str(e)}")
+            # Missing, unreadable or out-of-date index: rebuild it from the stored vectors
+            logger.info(f"Rebuilding {self.backend} index for {self.name}")
+            self._rebuild_index()
+
+    def _rows(self) -> int:
+        if self.dim is None or not os.path.exists(self._vector_path):
+            return 0
+        return os.path.getsize(self._vector_path) // (self.dim * 4)
+
+    def _vector_rows(self) -> np.ndarray:
+        """Map the vector file. Caller holds the lock."""
+        rows = self._rows()
+        if self._vectors is None or self._vectors.shape[0] != rows:
+            if rows == 0:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            self._vectors = np.memmap(self._vector_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._vectors
+
+    def _labels(self) -> np.ndarray:
+        """Labels of all live chunks. Caller holds the lock."""
+        if self._live_labels is None:
+            rows = self._conn.execute("SELECT label FROM chunks ORDER BY label").fetchall()
+            self._live_labels = np.array([row[0] for row in rows], dtype=np.int64)
+        return self._live_labels
+
+    def _dead_labels(self) -> List[int]:
+        dead = np.ones(self._rows(), dtype=bool)
+        dead[self._labels()] = False
+        return np.nonzero(dead)[0].tolist()
+
+    def _rebuild_index(self):
+        """Build the ANN index from live vectors. Caller holds the lock."""
+        if self.backend not in ANN_INDEXES or self.dim is None:
+            return
+        self.index = ANN_INDEXES[self.backend](self.dim, self.settings)
+        rows = self._rows()
+        if rows:
+            self.index.add(np.asarray(self._vector_rows()), np.arange(rows, dtype=np.int64))
+            dead = self._dead_labels()
+            if dead:
+                self.index.delete(dead)
+        self._dirty = True
+
+    def save(self):
+        """Persist the ANN index and parameters, compacting first if many chunks were deleted."""
+        with self._lock:
+            if self.dim is None:
+                return
+            rows = self._rows()
+            if rows and (rows - len(self._labels())) / rows > self.settings["ann_compact_ratio"]:
+                self.compact()
+            if self.index is not None and self._dirty:
+                tmp_path = f"{self._index_path}.tmp"
+                self.index.save(tmp_path)
+                os.replace(tmp_path, self._index_path)
+            self._write_params()
+            self._dirty = False
+
+    def _write_params(self):
+        """Write parameters atomically. Caller holds the lock."""
+        params = {"backend": self.backend, "dim": self.dim, "rows": self._rows(),
+                  **{k: self.settings[k] for k in ("ann_m", "ann_ef_construction")}}
+        tmp_path = f"{self._params_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(params, f)
+        os.replace(tmp_path, self._params_path)
+
+    def compact(self):
+        """Rewrite the vector file without deleted rows and rebuild the index."""
+        with self._lock, self._conn:
+            labels = self._labels()
+            vectors = np.array(self._vector_rows()[labels]) if len(labels) else np.zeros((0, self.dim), np.float32)
+            self._vectors = None
+
+            tmp_path = f"{self._vector_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(vectors.astype(np.float32).tobytes())
+            os.replace(tmp_path, self._vector_path)
+
+            # Offset first so the UNIQUE constraint holds while relabelling
+            self._conn.execute("UPDATE chunks SET label = -label - 1")
+            self._conn.executemany("UPDATE chunks SET label = ? WHERE label = ?",
+                                   [(new, -int(old) - 1) for new, old in enumerate(labels)])
+            self._live_labels = None
+            self._rebuild_index()
+            logger.info(f"Compacted {self.name}: {len(labels)} live chunks")
+
+    # Chroma collection API
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._labels())
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        if self.embed_fn is None:
+            raise ValueError(f"Collection {self.name} has no embedding function; pass embeddings")
+        return np.asarray(self.embed_fn(texts), dtype=np.float32)
+
+    def upsert(self, ids: List[str], documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict[str, Any]]] = None, embeddings=None):
+        """Insert or replace chunks."""
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32) if embeddings is not None else self._embed(documents)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+
+        with self._lock, self._conn:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                if self.backend in ANN_INDEXES:
+                    self.index = ANN_INDEXES[self.backend](self.dim, self.settings)
+                # Record the dimension now so the vector file stays readable without a save
+                self._write_params()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self.dim}")
+
+            # Replaced chunks get a new label; their old label becomes a tombstone
+            replaced = self._existing_labels(ids)
+            first_label = self._rows()
+            with open(self._vector_path, "ab") as f:
+                f.write(vectors.tobytes())
+            labels = np.arange(first_label, first_label + len(ids), dtype=np.int64)
+
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+            self._conn.executemany(
+                "INSERT INTO chunks (id, label, document, metadata) VALUES (?, ?, ?, ?)",
+                [(i, int(label), doc, json.dumps(meta) if meta is not None else None)
+                 for i, label, doc, meta in zip(ids, labels, documents, metadatas)]
+            )
+            if self.index is not None:
+                self.index.add(vectors, labels)
+                if replaced:
+                    self.index.delete(replaced)
+                self._dirty = True
+            self._live_labels = None
+
+    add = upsert
+
+    def update(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Replace the metadata of existing chunks."""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE chunks SET metadata = ? WHERE id = ?",
+                                   [(json.dumps(meta), i) for i, meta in zip(ids, metadatas)])
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Delete chunks by id or metadata filter."""
+        with self._lock, self._conn:
+            if where is not None:
+                ids = (ids or []) + self.get(where=where)["ids"]
+            if not ids:
+                return
+            labels = self._existing_labels(ids)
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(i,) for i in ids])
+            if self.index is not None and labels:
+                self.index.delete(labels)
+                self._dirty = True
+            self._live_labels = None
+
+    def _existing_labels(self, ids: List[str]) -> List[int]:
+        labels = []
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            placeholders = ",".join("?" * len(part))
+            labels += [row[0] for row in self._conn.execute(
+                f"SELECT label FROM chunks WHERE id IN ({placeholders})", part).fetchall()]
+        return labels
+
+    def _where_clause(self, where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """Translate an equality metadata filter into SQL."""
+        if not where:
+            return "", []
+        clauses, params = [], []
+        for key, value in where.items():
+            clauses.append("json_extract(metadata, ?) = ?")
+            params += [f"$.{key}", value]
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _fetch(self, labels: List[int]) -> Dict[int, Tuple[str, Optional[str], Optional[str]]]:
+        rows = {}
+        for i in range(0, len(labels), 500):
+            part = [int(label) for label in labels[i:i + 500]]
+            placeholders = ",".join("?" * len(part))
+            for label, chunk_id, document, metadata in self._conn.execute(
+                    f"SELECT label, id, document, metadata FROM chunks WHERE label IN ({placeholders})", part):
+                rows[label] = (chunk_id, document, metadata)
+        return rows
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+            include: Optional[List[str]] = None, limit: Optional[int] = None,
+            offset: Optional[int] = None) -> Dict[str, Any]:
+        """Get chunks by id and/or metadata filter."""
+        include = ["documents", "metadatas"] if include is None else include
+        if ids is not None and not ids:
+            return {"ids": [], **{field: [] for field in include}}
+        sql, params = self._where_clause(where)
+        if ids is not None:
+            sql += (" AND " if sql else " WHERE ") + f"id IN ({','.join('?' * len(ids))})"
+            params += list(ids)
+        sql += " ORDER BY label"
+        if limit or offset:
+            sql += f" LIMIT {int(limit) if limit else -1} OFFSET {int(offset or 0)}"
+
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id, label, document, metadata FROM chunks{sql}", params).fetchall()
+            result: Dict[str, Any] = {"ids": [row[0] for row in rows]}
+            if "documents" in include:
+                result["documents"] = [row[2] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [json.loads(row[3]) if row[3] else None for row in rows]
+            if "embeddings" in include:
+                vectors = self._vector_rows()
+                result["embeddings"] = [np.array(vectors[row[1]]) for row in rows]
+            return result
+
+    def query(self, query_embeddings=None, query_texts: Optional[List[str]] = None, n_results: int = 10,
+              include: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None,
+              exact: bool = False) -> Dict[str, Any]:
+        """Find the nearest chunks to each query.
+
+        Args:
+            query_embeddings: Query vectors
+            query_texts: Query texts, embedded with the collection's embedding function
+            n_results: Results per query
+            include: Fields to return, as in Chroma
+            where: Equality metadata filter; filtered queries use exact search
+            exact: Use exact search instead of the ANN index
+
+        Returns:
+            Chroma-style result with one list per query for every field
+        """
+        include = ["metadatas", "documents", "distances"] if include is None else include
+        queries = np.asarray(query_embeddings, dtype=np.float32) if query_embeddings is not None \
+            else self._embed(query_texts)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        with self._lock:
+            if self.dim is None or not len(self._labels()):
+                label_lists = [[] for _ in queries]
+                similarity_lists = [[] for _ in queries]
+            elif exact or where or self.index is None:
+                label_lists, similarity_lists = self._exact_search(queries, n_results, where)
+            else:
+                label_lists, similarity_lists = self._ann_search(queries, n_results)
+
+            result: Dict[str, Any] = {field: [] for field in ["ids"] + include}
+            vectors = self._vector_rows() if "embeddings" in include else None
+            for labels, similarities in zip(label_lists, similarity_lists):
+                rows = self._fetch(labels)
+                hits = [(label, sim) for label, sim in zip(labels, similarities) if label in rows][:n_results]
+                result["ids"].append([rows[label][0] for label, _ in hits])
+                if "documents" in include:
+                    result["documents"].append([rows[label][1] for label, _ in hits])
+                if "metadatas" in include:
+                    result["metadatas"].append([json.loads(rows[label][2]) if rows[label][2] else None
+                                                for label, _ in hits])
+                if "distances" in include:
+                    result["distances"].append([float(1.0 - sim) for _, sim in hits])
+                if "embeddings" in include:
+                    result["embeddings"].append([np.array(vectors[label]) for label, _ in hits])
+            return result
+
+    def _exact_search(self, queries: np.ndarray, k: int,
+                      where: Optional[Dict[str, Any]] = None) -> Tuple[List[List[int]], List[List[float]]]:
+        """Brute-force inner-product search over live vectors. Caller holds the lock."""
+        if where:
+            sql, params = self._where_clause(where)
+            labels = np.array([row[0] for row in self._conn.execute(f"SELECT label FROM chunks{sql}", params)],
+                              dtype=np.int64)
+        else:
+            labels = self._labels()
+        if not len(labels):
+            return [[] for _ in queries], [[] for _ in queries]
+
+        similarities = queries @ np.asarray(self._vector_rows()[labels]).T
+        k = min(k, len(labels))
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        label_lists, similarity_lists = [], []
+        for row, candidates in zip(similarities, top):
+            ordered = candidates[np.argsort(-row[candidates])]
+            label_lists.append(labels[ordered].tolist())
+            similarity_lists.append(row[ordered].tolist())
+        return label_lists, similarity_lists
+
+    def _ann_search(self, queries: np.ndarray, k: int) -> Tuple[List[List[int]], List[List[float]]]:
+        """Search the ANN index. Caller holds the lock."""
+        k = min(k, len(self._labels()))
+        try:
+            labels, similarities = self.index.search(queries, k)
+        except RuntimeError as e:
+            # hnswlib cannot always return k results from a graph with many deletions
+            logger.warning(f"ANN search failed, using exact search: {str(e)}")
+            return self._exact_search(queries, k)
+        return ([[int(label) for label in row if label >= 0] for row in labels],
+                [[float(sim) for label, sim in zip(row_labels, row) if label >= 0]
+                 for row_labels, row in zip(labels, similarities)])
+
+
+def open_collection(name: str, vector_db_path: str, settings: Dict[str, Any],
+                    embed_fn: Optional[Callable[[List[str]], Any]] = None, create: bool = True):
+    """Open a collection with the backend configured in RAG_SETTINGS.
+
+    ANN collections are shared per directory, so every component sees the same
+    in-memory index.
+
+    Args:
+        name: Collection name
+        vector_db_path: Vector store directory
+        settings: RAG settings with vector_store_backend and ANN parameters
+        embed_fn: Function embedding texts, required by non-Chroma backends for text queries
+        create: Create the collection if it does not exist
+
+    Returns:
+        Chroma collection or ANNCollection, or None if it does not exist and create is False
+    """
+    backend = settings.get("vector_store_backend", "chroma")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector store backend: {backend}")
+
+    if backend == "chroma":
+        import chromadb
+        from chromadb.config import Settings
+
+        client = chromadb.PersistentClient(path=vector_db_path, settings=Settings(anonymized_telemetry=False))
+        if name in [c.name for c in client.list_collections()]:
+            return client.get_collection(name)
+        if not create:
+            return None
+        logger.info(f"Created new collection: {name}")
+        return client.create_collection(name=name, metadata={"description": "Domain-SC knowledge base"})
+
+    path = os.path.abspath(os.path.join(vector_db_path, f"{name}_{backend}"))
+    with _REGISTRY_LOCK:
+        collection = _COLLECTIONS.get(path)
+        if collection is None:
+            if not create and not os.path.exists(path):
+                return None
+            collection = ANNCollection(path, backend=backend, settings=settings, embed_fn=embed_fn)
+            _COLLECTIONS[path] = collection
+            logger.info(f"Opened {backend} collection {name} with {collection.count()} chunks")
+        elif embed_fn is not None and collection.embed_fn is None:
+            collection.embed_fn = embed_fn
+        return collection
+
+
+def copy_collection(source, target, batch_size: int = 1000) -> int:
+    """Copy every chunk with its stored embedding from one collection to another.
+
+    Used to populate a new backend from an existing Chroma collection without
+    re-embedding the corpus.
+
+    Returns:
+        Number of chunks copied
+    """
+    copied = 0
+    while True:
+        page = source.get(include=["documents", "metadatas", "embeddings"], limit=batch_size, offset=copied)
+        if not page["ids"]:
+            break
+        target.upsert(ids=page["ids"], documents=page["documents"], metadatas=page["metadatas"],
+                      embeddings=page["embeddings"])
+        copied += len(page["ids"])
+    if isinstance(target, ANNCollection):
+        target.save()
+    logger.info(f"Copied {copied} chunks into {target.name}")
+    return copied
+
+
+class ExactSearchView:
+    """Exact-search view of an ANNCollection, usable as recall ground truth."""
+
+    def __init__(self, collection: ANNCollection):
+        self.collection = collection
+        self.name = f"{collection.name} (exact)"
+
+    def query(self, **kwargs) -> Dict[str, Any]:
+        return self.collection.query(exact=True, **kwargs)
+
+
+def compare_collections(reference, candidate, query_embeddings, k: int = 10) -> Dict[str, Any]:
+    """Measure the recall and query latency of a collection against a reference.
+
+    Args:
+        reference: Collection treated as ground truth, e.g. Chroma or exact search
+        candidate: Collection to evaluate
+        query_embeddings: Query vectors
+        k: Results per query
+
+    Returns:
+        recall@k of the candidate and per-query latency percentiles of both
+    """
+    def run(collection):
+        latencies, results = [], []
+        for query in query_embeddings:
+            start_time = time.perf_counter()
+            ids = collection.query(query_embeddings=[list(map(float, query))], n_results=k, include=[])["ids"][0]
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            results.append(ids)
+        return results, latencies
+
+    def latency_stats(latencies):
+        if not latencies:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "mean_ms": 0.0}
+        return {
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            "mean_ms": round(float(np.mean(latencies)), 3)
+        }
+
+    reference_ids, reference_latencies = run(reference)
+    candidate_ids, candidate_latencies = run(candidate)
+
+    recalls = [len(set(ref) & set(cand)) / len(ref) for ref, cand in zip(reference_ids, candidate_ids) if ref]
+    return {
+        "queries": len(reference_ids),
+        "k": k,
+        "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else 0.0,
+        "reference_latency": latency_stats(reference_latencies),
+        "candidate_latency": latency_stats(candidate_latencies)
+    }
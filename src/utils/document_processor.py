@@ -6,7 +6,7 @@ Handles text extraction, chunking, and preparation for vector indexing.
 import os
 import hashlib
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import re
 
 from src.utils.logger import setup_logger
@@ -30,47 +30,72 @@ def process_files(file_paths: List[str], chunk_size: int = 1000, chunk_overlap:
     ids = []
     
     for file_path in file_paths:
-        try:
-            # Check if file exists
-            if not os.path.exists(file_path):
-                logger.warning(f"File not found: {file_path}")
-                continue
-                
-            # Extract text based on file type
-            file_ext = os.path.splitext(file_path)[1].lower()
-            
-            if file_ext == '.md':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            elif file_ext == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-            else:
-                logger.warning(f"Unsupported file type: {file_ext} - skipping {file_path}")
-                continue
-                
-            # Generate chunks
-            chunks = _chunk_text(text, chunk_size, chunk_overlap)
-            
-            # Create metadata and IDs
-            for i, chunk in enumerate(chunks):
-                # Generate a consistent ID
-                chunk_id = hashlib.md5(f"{file_path}_{i}".encode()).hexdigest()
-                
-                documents.append(chunk)
-                metadatas.append({
-                    "source": file_path,
-                    "chunk": i,
-                    "total_chunks": len(chunks)
-                })
-                ids.append(chunk_id)
-                
-            logger.info(f"Processed {file_path}: {len(chunks)} chunks")
-            
-        except Exception as e:
-            logger.error(f"Error processing {file_path}: {str(e)}")
+        loaded = load_file_chunks(file_path, chunk_size, chunk_overlap)
+        if loaded is None:
+            continue
+        _, chunks = loaded
+        
+        # Create metadata and IDs
+        for i, chunk in enumerate(chunks):
+            documents.append(chunk)
+            metadatas.append(chunk_metadata(file_path, i, len(chunks)))
+            ids.append(chunk_id(file_path, i))
     
     return documents, metadatas, ids
+
+def load_file_chunks(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> Optional[Tuple[str, List[str]]]:
+    """
+    Read and chunk a single file.
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Size of text chunks
+        chunk_overlap: Overlap between chunks
+        
+    Returns:
+        Tuple of (file content hash, chunks), or None if the file cannot be processed
+    """
+    try:
+        # Check if file exists
+        if not os.path.exists(file_path):
+            logger.warning(f"File not found: {file_path}")
+            return None
+            
+        # Extract text based on file type
+        file_ext = os.path.splitext(file_path)[1].lower()
+        
+        if file_ext in ('.md', '.txt'):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        else:
+            logger.warning(f"Unsupported file type: {file_ext} - skipping {file_path}")
+            return None
+            
+        # Generate chunks
+        chunks = _chunk_text(text, chunk_size, chunk_overlap)
+        logger.info(f"Processed {file_path}: {len(chunks)} chunks")
+        
+        return content_hash(text), chunks
+        
+    except Exception as e:
+        logger.error(f"Error processing {file_path}: {str(e)}")
+        return None
+
+def chunk_id(file_path: str, index: int) -> str:
+    """Generate the consistent vector store ID of a file chunk."""
+    return hashlib.md5(f"{file_path}_{index}".encode()).hexdigest()
+
+def chunk_metadata(file_path: str, index: int, total_chunks: int) -> Dict[str, Any]:
+    """Build the vector store metadata of a file chunk."""
+    return {
+        "source": file_path,
+        "chunk": index,
+        "total_chunks": total_chunks
+    }
+
+def content_hash(text: str) -> str:
+    """Hash text content for change detection."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
     
 def _chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
     """
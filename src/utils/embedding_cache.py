@@ -0,0 +1,224 @@
+"""
+Persistent embedding cache for Domain-SC.
+Vectors are keyed by (model, content hash) and stored as rows of a
+memory-mapped float32 file per model, with a small SQLite index mapping keys
+to rows. Unchanged chunks are never embedded twice, across runs and across the
+components that embed the same text.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Callable
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+from src.utils.document_processor import content_hash
+
+logger = setup_logger(__name__, "rag_service.log")
+
+_REGISTRY_LOCK = threading.Lock()
+_CACHES: Dict[str, "EmbeddingCache"] = {}
+
+
+def cache_model_key(model_name: str, backend: str = "torch") -> str:
+    """Build the model part of a cache key.
+
+    Backends of the same model produce slightly different vectors, so they are
+    cached separately.
+    """
+    return f"{model_name}:{backend}"
+
+
+class EmbeddingCache:
+    """Memory-mapped store of embedding vectors keyed by model and content hash."""
+
+    def __init__(self, cache_dir: str):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the index database and vector files
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # model -> read-only map of its vector file
+        self._maps: Dict[str, np.memmap] = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite3"), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, dim INTEGER NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors ("
+                "model TEXT NOT NULL, hash TEXT NOT NULL, row INTEGER NOT NULL, "
+                "PRIMARY KEY (model, hash))"
+            )
+
+    def _vector_path(self, model: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(model.encode('utf-8')).hexdigest()[:16]}.f32")
+
+    def _dim(self, model: str) -> Optional[int]:
+        row = self._conn.execute("SELECT dim FROM models WHERE model = ?", (model,)).fetchone()
+        return row[0] if row else None
+
+    def _rows(self, model: str, dim: int, needed: int) -> np.memmap:
+        """Get a read-only map of a model's vectors covering at least `needed` rows. Caller holds the lock."""
+        mapped = self._maps.get(model)
+        if mapped is None or mapped.shape[0] < needed:
+            rows = os.path.getsize(self._vector_path(model)) // (dim * 4)
+            mapped = np.memmap(self._vector_path(model), dtype=np.float32, mode="r", shape=(rows, dim))
+            self._maps[model] = mapped
+        return mapped
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Look up cached vectors.
+
+        Args:
+            model: Model key, see cache_model_key
+            hashes: Content hashes to look up
+
+        Returns:
+            Mapping of the hashes found to their vectors
+        """
+        if not hashes:
+            return {}
+
+        with self._lock:
+            dim = self._dim(model)
+            if dim is None:
+                return {}
+
+            rows = {}
+            unique = list(dict.fromkeys(hashes))
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows.update(self._conn.execute(
+                    f"SELECT hash, row FROM vectors WHERE model = ? AND hash IN ({placeholders})", [model] + part
+                ).fetchall())
+            if not rows:
+                return {}
+
+            mapped = self._rows(model, dim, max(rows.values()) + 1)
+            return {h: np.array(mapped[row]) for h, row in rows.items() if row < mapped.shape[0]}
+
+    def put_many(self, model: str, hashes: List[str], vectors) -> None:
+        """Store vectors, ignoring hashes that are already cached.
+
+        Args:
+            model: Model key, see cache_model_key
+            hashes: Content hashes
+            vectors: Vectors in the same order as the hashes
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(hashes):
+            return
+
+        with self._lock:
+            # IMMEDIATE serializes row allocation with writers in other processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self._dim(model)
+                if dim is None:
+                    dim = int(vectors.shape[1])
+                    self._conn.execute("INSERT INTO models (model, dim) VALUES (?, ?)", (model, dim))
+                elif dim != vectors.shape[1]:
+                    raise ValueError(f"Embedding dimension changed for {model}: {dim} != {vectors.shape[1]}")
+
+                new = {}
+                for h, vector in zip(hashes, vectors):
+                    if h not in new and not self._conn.execute(
+                            "SELECT 1 FROM vectors WHERE model = ? AND hash = ?", (model, h)).fetchone():
+                        new[h] = vector
+                if new:
+                    path = self._vector_path(model)
+                    with open(path, "ab") as f:
+                        first_row, partial = divmod(f.tell(), dim * 4)
+                        if partial:
+                            # Drop a partial row left by an interrupted write
+                            f.truncate(first_row * dim * 4)
+                        f.write(np.vstack(list(new.values())).astype(np.float32).tobytes())
+                    self._conn.executemany(
+                        "INSERT INTO vectors (model, hash, row) VALUES (?, ?, ?)",
+                        [(model, h, first_row + i) for i, h in enumerate(new)]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def embed(self, model: str, texts: List[str], embed_fn: Callable[[List[str]], Any]) -> np.ndarray:
+        """Embed texts, invoking the model only for texts not in the cache.
+
+        Args:
+            model: Model key, see cache_model_key
+            texts: Texts to embed
+            embed_fn: Function embedding a list of texts
+
+        Returns:
+            Array of float32 vectors in input order
+        """
+        hashes = [content_hash(text) for text in texts]
+        cached = self.get_many(model, hashes)
+
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in cached:
+                missing.setdefault(h, text)
+
+        misses = sum(1 for h in hashes if h not in cached)
+        with self._lock:
+            self.hits += len(hashes) - misses
+            self.misses += misses
+
+        if missing:
+            vectors = np.asarray(embed_fn(list(missing.values())), dtype=np.float32)
+            cached.update(zip(missing, vectors))
+            try:
+                self.put_many(model, list(missing), vectors)
+            except Exception as e:
+                logger.warning(f"Error storing embeddings in cache: {str(e)}")
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([cached[h] for h in hashes])
+
+    def clear(self) -> None:
+        """Remove all cached vectors."""
+        with self._lock:
+            models = [row[0] for row in self._conn.execute("SELECT model FROM models").fetchall()]
+            self._conn.execute("DELETE FROM vectors")
+            self._conn.execute("DELETE FROM models")
+            self._maps.clear()
+            for model in models:
+                if os.path.exists(self._vector_path(model)):
+                    os.remove(self._vector_path(model))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+def get_embedding_cache(cache_dir: str) -> EmbeddingCache:
+    """Get the shared embedding cache for a directory."""
+    cache_dir = os.path.abspath(cache_dir)
+    with _REGISTRY_LOCK:
+        if cache_dir not in _CACHES:
+            _CACHES[cache_dir] = EmbeddingCache(cache_dir)
+        return _CACHES[cache_dir]
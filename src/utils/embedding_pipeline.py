@@ -0,0 +1,261 @@
+"""
+Batched, multi-process embedding pipeline for Domain-SC.
+Chunks are embedded in fixed-size batches, spread over a pool of worker
+processes that each hold their own copy of the model, and the resulting vectors
+are handed to the vector store so it never embeds documents itself.
+"""
+
+import os
+import time
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+from src.utils.sentence_models import HAVE_SENTENCE_TRANSFORMERS, get_sentence_transformer
+from src.utils.embedding_cache import EmbeddingCache, get_embedding_cache, cache_model_key
+
+logger = setup_logger(__name__, "rag_service.log")
+
+# Model backends: plain PyTorch, ONNX Runtime, or PyTorch with int8 dynamic quantization
+BACKENDS = ("torch", "onnx", "quantized")
+
+# Model held by each worker process, loaded once by the pool initializer
+_WORKER_MODEL = None
+
+
+def load_embedding_model(model_name: str, backend: str = "torch", device: str = "cpu"):
+    """Load a sentence-transformers model for the given backend.
+
+    Falls back to the plain PyTorch model when the requested backend is not
+    supported by the installed packages.
+
+    Args:
+        model_name: Model name or path
+        backend: "torch", "onnx" or "quantized"
+        device: Device to run the model on
+
+    Returns:
+        Model with an encode method
+    """
+    if backend == "onnx":
+        try:
+            from sentence_transformers import SentenceTransformer
+            # Needs sentence-transformers>=3.2 with the onnx extra installed
+            return SentenceTransformer(model_name, device=device, backend="onnx")
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable, using PyTorch: {str(e)}")
+    elif backend == "quantized":
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+            # Separate instance: quantization modifies the model in place
+            model = SentenceTransformer(model_name, device="cpu")
+            return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            logger.warning(f"Quantized backend unavailable, using PyTorch: {str(e)}")
+    return get_sentence_transformer(model_name, device)
+
+
+def _encode(model, texts: List[str], batch_size: int) -> np.ndarray:
+    """Encode texts into normalized float32 vectors."""
+    embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                              normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _init_worker(model_name: str, backend: str, threads: int):
+    """Load the model once per worker process."""
+    global _WORKER_MODEL
+    try:
+        import torch
+        # Keep workers from oversubscribing cores with intra-op threads
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _WORKER_MODEL = load_embedding_model(model_name, backend)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    return _encode(_WORKER_MODEL, texts, batch_size)
+
+
+class EmbeddingPipeline:
+    """Embeds texts in batches, in parallel worker processes for large inputs."""
+
+    def __init__(self,
+                 model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 batch_size: int = 64,
+                 num_workers: int = 0,
+                 backend: str = "torch",
+                 parallel_min_chunks: int = 256,
+                 encode_fn: Optional[Callable[[List[str]], np.ndarray]] = None,
+                 cache: Optional[EmbeddingCache] = None):
+        """Initialize the pipeline. Models are loaded on first use.
+
+        Args:
+            model_name: Sentence-transformers model name
+            batch_size: Texts per model forward pass and per worker task
+            num_workers: Worker processes; 0 uses every CPU core, 1 embeds in-process
+            backend: "torch", "onnx" or "quantized"
+            parallel_min_chunks: Inputs smaller than this are embedded in-process,
+                since they would not amortize the work of dispatching to the pool
+            encode_fn: Optional function embedding a batch of texts in-process,
+                used instead of a sentence-transformers model
+            cache: Optional persistent cache consulted before invoking the model
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend: {backend}")
+
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.backend = backend
+        self.parallel_min_chunks = parallel_min_chunks
+        self.encode_fn = encode_fn
+        self.cache = cache
+
+        self._model = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.chunks = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def _local_encode(self, texts: List[str]) -> np.ndarray:
+        if self.encode_fn is not None:
+            return np.asarray(self.encode_fn(texts), dtype=np.float32)
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_embedding_model(self.model_name, self.backend)
+        return _encode(self._model, texts, self.batch_size)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the worker pool on first use and keep it for later calls."""
+        with self._lock:
+            if self._pool is None:
+                threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+                # Spawn rather than fork: forking a process with live torch threads can deadlock
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.num_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.backend, threads)
+                )
+                logger.info(f"Started {self.num_workers} embedding worker processes ({self.backend} backend)")
+            return self._pool
+
+    def embed(self, texts: List[str],
+              progress_callback: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+        """Embed texts.
+
+        Args:
+            texts: Texts to embed
+            progress_callback: Called with (chunks done, total chunks) after each batch;
+                chunks served from the cache are not counted
+
+        Returns:
+            Array of shape (len(texts), dimension) with normalized float32 vectors
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self.cache is not None:
+            return self.cache.embed(cache_model_key(self.model_name, self.backend), texts,
+                                    lambda missing: self._embed_uncached(missing, progress_callback))
+        return self._embed_uncached(texts, progress_callback)
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed search queries.
+
+        Queries bypass the persistent cache, which holds indexed chunks and is
+        never evicted, so it does not grow with every distinct query.
+
+        Returns:
+            Array of shape (len(queries), dimension) with normalized float32 vectors
+        """
+        if not queries:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._embed_uncached(queries)
+
+    def _embed_uncached(self, texts: List[str],
+                        progress_callback: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+        """Embed texts with the model."""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        start_time = time.perf_counter()
+        done = 0
+        results = []
+
+        # The lock only guards pool and model creation and the stats, so small
+        # query embeddings do not wait behind a bulk indexing job
+        parallel = (self.encode_fn is None and self.num_workers > 1
+                    and len(texts) >= self.parallel_min_chunks)
+        if parallel:
+            # map keeps batch order while workers run ahead
+            batch_results = self._get_pool().map(_encode_in_worker, batches, [self.batch_size] * len(batches))
+        else:
+            batch_results = (self._local_encode(batch) for batch in batches)
+
+        for batch, embeddings in zip(batches, batch_results):
+            results.append(embeddings)
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, len(texts))
+
+        elapsed = time.perf_counter() - start_time
+        with self._lock:
+            self.chunks += len(texts)
+            self.batches += len(batches)
+            self.seconds += elapsed
+
+        log = logger.info if parallel else logger.debug
+        log(f"Embedded {len(texts)} chunks in {elapsed:.2f}s "
+            f"({len(texts) / max(elapsed, 1e-9):.1f} chunks/sec, "
+            f"{self.num_workers if parallel else 1} process(es))")
+        return np.vstack(results)
+
+    def close(self):
+        """Shut down the worker pool."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get throughput statistics."""
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "workers": self.num_workers,
+            "batch_size": self.batch_size,
+            "chunks": self.chunks,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "chunks_per_sec": round(self.chunks / self.seconds, 1) if self.seconds else 0.0,
+            "cache": self.cache.get_stats() if self.cache is not None else None
+        }
+
+
+def create_embedding_pipeline(settings: Dict[str, Any]) -> Optional[EmbeddingPipeline]:
+    """Create the embedding pipeline configured in RAG_SETTINGS.
+
+    Returns None when sentence-transformers is not installed, in which case the
+    vector store falls back to its own embedding function.
+    """
+    if not HAVE_SENTENCE_TRANSFORMERS:
+        logger.info("sentence-transformers not installed, vector store embeds documents itself")
+        return None
+
+    return EmbeddingPipeline(
+        model_name=settings.get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2"),
+        batch_size=settings.get("embedding_batch_size", 64),
+        num_workers=settings.get("embedding_workers", 0),
+        backend=settings.get("embedding_backend", "torch"),
+        parallel_min_chunks=settings.get("embedding_parallel_min_chunks", 256),
+        cache=get_embedding_cache(settings["embedding_cache_dir"]) if settings.get("embedding_cache_dir") else None
+    )
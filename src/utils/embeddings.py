@@ -1,30 +1,69 @@
 import os
+import hashlib
 import logging
 from typing import List, Dict, Any, Optional
+from langchain_core.embeddings import Embeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import Chroma
 
+from src.config.config import RAG_SETTINGS
+from src.utils.embedding_cache import EmbeddingCache, get_embedding_cache, cache_model_key
+from src.services.vector_stores import ANNCollection, open_collection
+
 logger = logging.getLogger(__name__)
 
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that serve document vectors from the persistent embedding cache."""
+    
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_key: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_key = model_key
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.cache.embed(self.model_key, texts, self.embeddings.embed_documents).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries in one batch, bypassing the cache like embed_query."""
+        return self.embeddings.embed_documents(texts)
+
+
 class VectorStoreManager:
     """Manages vector database operations for RAG."""
     
     def __init__(self, 
                  db_directory: str,
-                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"):
+                 embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 embedding_cache_dir: Optional[str] = RAG_SETTINGS.get("embedding_cache_dir"),
+                 backend: str = RAG_SETTINGS.get("vector_store_backend", "chroma")):
         self.db_directory = db_directory
         self.embedding_model = embedding_model
+        self.backend = backend
         
         # Create directory if it doesn't exist
         os.makedirs(self.db_directory, exist_ok=True)
         
+        # Normalized like the indexing pipeline, so both share cached vectors
         self.embeddings = HuggingFaceEmbeddings(
             model_name=embedding_model,
-            model_kwargs={"device": "cpu"}
+            model_kwargs={"device": "cpu"},
+            encode_kwargs={"normalize_embeddings": True}
         )
+        if embedding_cache_dir:
+            self.embeddings = CachedEmbeddings(
+                self.embeddings, get_embedding_cache(embedding_cache_dir), cache_model_key(embedding_model)
+            )
         
         # Initialize DB if exists, otherwise it will be created when documents are added
-        if os.path.exists(os.path.join(db_directory, "chroma.sqlite3")):
+        if backend != "chroma":
+            # In-process ANN index; stored next to Chroma data under its own directory
+            self.db = open_collection("langchain", db_directory, dict(RAG_SETTINGS, vector_store_backend=backend),
+                                      embed_fn=self.embeddings.embed_documents)
+        elif os.path.exists(os.path.join(db_directory, "chroma.sqlite3")):
             self.db = Chroma(persist_directory=db_directory, embedding_function=self.embeddings)
         else:
             self.db = None
@@ -32,8 +71,16 @@ class VectorStoreManager:
     def add_documents(self, documents: List[Dict[str, Any]], collection_name: Optional[str] = None) -> None:
         """Add documents to the vector store."""
         try:
+            if isinstance(self.db, ANNCollection):
+                self.db.upsert(
+                    ids=[hashlib.md5(f"{doc.metadata.get('source', '')}_{doc.page_content}".encode()).hexdigest()
+                         for doc in documents],
+                    documents=[doc.page_content for doc in documents],
+                    metadatas=[doc.metadata or None for doc in documents]
+                )
+                self.db.save()
             # Instantiate a new DB if not exists
-            if self.db is None:
+            elif self.db is None:
                 self.db = Chroma.from_documents(
                     documents=documents,
                     embedding=self.embeddings,
@@ -57,6 +104,18 @@ class VectorStoreManager:
             return []
         
         try:
+            if isinstance(self.db, ANNCollection):
+                results = self.db.query(query_embeddings=[self.embeddings.embed_query(query)], n_results=k)
+                return [
+                    {
+                        "content": content,
+                        "metadata": metadata or {},
+                        "score": distance
+                    } for content, metadata, distance in zip(
+                        results["documents"][0], results["metadatas"][0], results["distances"][0]
+                    )
+                ]
+            
             results = self.db.similarity_search_with_score(query, k=k)
             return [
                 {
@@ -69,17 +128,60 @@ class VectorStoreManager:
             logger.error(f"Error retrieving similar documents: {str(e)}")
             return []
     
+    def retrieve_many(self, queries: List[str], k: int = 5) -> List[List[Dict[str, Any]]]:
+        """Retrieve similar documents for several queries with one batched search.
+        
+        Queries are embedded in one batch and searched in a single multi-query
+        call. Repeated queries are searched once.
+        
+        Returns:
+            One list of similar documents per query, in query order
+        """
+        if self.db is None:
+            logger.warning("Vector store not initialized. No documents to search.")
+            return [[] for _ in queries]
+        if not queries:
+            return []
+        
+        unique_queries = list(dict.fromkeys(queries))
+        try:
+            # Queries are not written to the embedding cache
+            if isinstance(self.embeddings, CachedEmbeddings):
+                query_embeddings = self.embeddings.embed_queries(unique_queries)
+            else:
+                query_embeddings = self.embeddings.embed_documents(unique_queries)
+            collection = self.db if isinstance(self.db, ANNCollection) else self.db._collection
+            results = collection.query(query_embeddings=query_embeddings, n_results=k,
+                                       include=["documents", "metadatas", "distances"])
+            
+            by_query = {}
+            for i, query in enumerate(unique_queries):
+                by_query[query] = [
+                    {
+                        "content": content,
+                        "metadata": metadata or {},
+                        "score": distance
+                    } for content, metadata, distance in zip(
+                        results["documents"][i], results["metadatas"][i], results["distances"][i]
+                    )
+                ]
+            return [[dict(doc) for doc in by_query[query]] for query in queries]
+        except Exception as e:
+            logger.error(f"Error retrieving similar documents: {str(e)}")
+            return [[] for _ in queries]
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store collection."""
         if self.db is None:
             return {"status": "not_initialized", "count": 0}
         
         try:
-            count = self.db._collection.count()
+            count = self.db.count() if isinstance(self.db, ANNCollection) else self.db._collection.count()
             return {
                 "status": "active",
                 "count": count,
                 "embedding_model": self.embedding_model,
+                "backend": self.backend,
                 "location": self.db_directory
             }
         except Exception as e:
@@ -90,6 +192,11 @@ class VectorStoreManager:
         """Clear all documents from the vector store."""
         if self.db is not None:
             try:
+                if isinstance(self.db, ANNCollection):
+                    self.db.delete(ids=self.db.get(include=[])["ids"])
+                    self.db.save()
+                    logger.info("Vector store cleared successfully")
+                    return
                 self.db._collection.delete()
                 self.db = None
                 logger.info("Vector store cleared successfully")
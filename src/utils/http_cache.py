@@ -0,0 +1,215 @@
+"""
+HTTP response cache for the Domain-SC knowledge base builder.
+Response bodies are stored on disk with their ETag, Last-Modified and
+Cache-Control metadata. Later fetches of the same URL are served from disk
+while fresh and revalidated with conditional GETs otherwise, so refreshes only
+download, parse and score pages that actually changed.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from email.utils import formatdate
+from typing import Dict, Any, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "knowledge_base_builder.log")
+
+# Outcomes of a cached fetch
+FRESH = "fresh"                # Served from disk without a request
+NOT_MODIFIED = "not_modified"  # Server answered 304 to a conditional GET
+UNCHANGED = "unchanged"        # Downloaded again, but with the same content
+CHANGED = "changed"            # New or modified content
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class CachedResponse:
+    """Body and cache state of a URL fetched through the HTTP cache."""
+
+    def __init__(self, url: str, state: str, content: bytes, entry: Dict[str, Any]):
+        self.url = url
+        self.state = state
+        self.content = content
+        self.entry = entry
+
+    @property
+    def changed(self) -> bool:
+        """Whether the content differs from what was processed before."""
+        return self.state == CHANGED
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.entry.get("encoding") or "utf-8", errors="replace")
+
+
+def parse_max_age(cache_control: Optional[str]) -> Optional[int]:
+    """Get how long a response may be served without revalidation, in seconds.
+
+    Returns 0 for no-cache/no-store responses and None when the header does
+    not say.
+    """
+    if not cache_control:
+        return None
+    directives = cache_control.lower()
+    if "no-cache" in directives or "no-store" in directives:
+        return 0
+    match = _MAX_AGE.search(directives)
+    return int(match.group(1)) if match else None
+
+
+class HTTPCache:
+    """On-disk store of response bodies and their validators, keyed by URL."""
+
+    def __init__(self, cache_dir: str, default_max_age: int = 0):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the index database and response bodies
+            default_max_age: Seconds a response without Cache-Control max-age
+                is served without revalidation
+        """
+        self.cache_dir = cache_dir
+        self.default_max_age = default_max_age
+        self.body_dir = os.path.join(cache_dir, "bodies")
+        os.makedirs(self.body_dir, exist_ok=True)
+
+        self.stats = {FRESH: 0, NOT_MODIFIED: 0, UNCHANGED: 0, CHANGED: 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.sqlite3"), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, expires_at REAL NOT NULL, "
+                "fetched_at REAL NOT NULL, content_hash TEXT NOT NULL, encoding TEXT, result TEXT)"
+            )
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self.body_dir, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the cache entry of a URL, or None if it is not cached."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, expires_at, fetched_at, content_hash, encoding, result "
+                "FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._body_path(url)):
+            return None
+        etag, last_modified, expires_at, fetched_at, content_hash, encoding, result = row
+        return {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": expires_at,
+            "fetched_at": fetched_at,
+            "content_hash": content_hash,
+            "encoding": encoding,
+            "result": json.loads(result) if result else None
+        }
+
+    def read_body(self, url: str) -> bytes:
+        with open(self._body_path(url), "rb") as f:
+            return f.read()
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Build the validator headers of a conditional GET for a cache entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            elif not entry.get("etag"):
+                headers["If-Modified-Since"] = formatdate(entry["fetched_at"], usegmt=True)
+        return headers
+
+    def _expires_at(self, headers) -> float:
+        max_age = parse_max_age(headers.get("cache-control"))
+        return time.time() + (self.default_max_age if max_age is None else max_age)
+
+    def store(self, url: str, response, content: bytes) -> Dict[str, Any]:
+        """Store a full response, dropping any result recorded for older content."""
+        path = self._body_path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, etag, last_modified, expires_at, fetched_at, content_hash, encoding, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+                (url, response.headers.get("etag"), response.headers.get("last-modified"),
+                 self._expires_at(response.headers), time.time(), hashlib.sha256(content).hexdigest(),
+                 response.encoding)
+            )
+        return self.get(url)
+
+    def revalidated(self, url: str, response) -> Dict[str, Any]:
+        """Record that cached content was confirmed current, keeping its result."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+                "expires_at = ?, fetched_at = ? WHERE url = ?",
+                (response.headers.get("etag"), response.headers.get("last-modified"),
+                 self._expires_at(response.headers), time.time(), url)
+            )
+        return self.get(url)
+
+    def set_result(self, url: str, result: Dict[str, Any]) -> None:
+        """Record the outcome of processing a URL's current content."""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET result = ? WHERE url = ?", (json.dumps(result), url))
+
+    async def fetch(self, crawler, url: str, revalidate: bool = False, **kwargs) -> CachedResponse:
+        """Fetch a URL through the cache.
+
+        Args:
+            crawler: AsyncCrawler used for requests
+            url: URL to fetch
+            revalidate: Revalidate with the server even if the entry is fresh
+            **kwargs: Passed on to crawler.fetch
+
+        Returns:
+            The response content and whether it changed
+
+        Raises:
+            httpx.HTTPStatusError: On error status codes
+        """
+        entry = self.get(url)
+        if entry and not revalidate and entry["expires_at"] > time.time():
+            self.stats[FRESH] += 1
+            return CachedResponse(url, FRESH, self.read_body(url), entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.update(self.conditional_headers(entry))
+        response = await crawler.fetch(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.stats[NOT_MODIFIED] += 1
+            return CachedResponse(url, NOT_MODIFIED, self.read_body(url), self.revalidated(url, response))
+
+        response.raise_for_status()
+        content = response.content
+        if entry and hashlib.sha256(content).hexdigest() == entry["content_hash"]:
+            # Servers without validators still let us skip processing identical content
+            self.stats[UNCHANGED] += 1
+            return CachedResponse(url, UNCHANGED, content, self.revalidated(url, response))
+
+        self.stats[CHANGED] += 1
+        return CachedResponse(url, CHANGED, content, self.store(url, response, content))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counts of fetch outcomes."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return dict(self.stats, entries=entries)
@@ -0,0 +1,78 @@
+"""
+Multi-keyword matching for Domain-SC.
+An Aho-Corasick automaton is built once from a keyword list and then finds
+every keyword occurring in a text in a single pass, however many keywords
+there are, instead of one substring search per keyword.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed list of keywords."""
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = True):
+        """Build the automaton.
+
+        Args:
+            keywords: Keywords to find; a keyword's id is its position in the list
+            ignore_case: Whether matching is case-insensitive
+        """
+        self.keywords = list(keywords)
+        self.ignore_case = ignore_case
+
+        # State 0 is the root; each state has its transitions, failure link and matched keyword ids
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword.lower() if ignore_case else keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword_id)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        """Link each state to the longest proper suffix that is also a prefix, breadth-first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Keywords ending at the suffix state also end here
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Find all keyword occurrences in a text.
+
+        Yields:
+            (end position, keyword id) for each occurrence, in text order
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text.lower() if self.ignore_case else text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword_id in output[state]:
+                yield position + 1, keyword_id
+
+    def matched(self, text: str) -> Set[int]:
+        """Get the ids of the keywords occurring in a text."""
+        return {keyword_id for _, keyword_id in self.iter_matches(text)}
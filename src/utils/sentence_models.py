@@ -0,0 +1,46 @@
+"""
+Shared loader for local sentence-transformers models.
+Models are loaded once per process and reused by every component that needs them.
+"""
+
+import threading
+import logging
+from typing import Dict, Any
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# If available, use sentence-transformers for local embeddings and reranking
+try:
+    from sentence_transformers import SentenceTransformer, CrossEncoder
+    HAVE_SENTENCE_TRANSFORMERS = True
+except ImportError:
+    HAVE_SENTENCE_TRANSFORMERS = False
+
+_MODEL_CACHE: Dict[str, Any] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _load_model(model_class, model_name: str, device: str = "cpu"):
+    """Load a model, reusing an already loaded instance."""
+    key = f"{model_class.__name__}:{model_name}:{device}"
+    with _MODEL_LOCK:
+        if key not in _MODEL_CACHE:
+            _MODEL_CACHE[key] = model_class(model_name, device=device)
+            logger.info(f"Loaded {model_class.__name__} model: {model_name}")
+        return _MODEL_CACHE[key]
+
+
+def get_sentence_transformer(model_name: str = "sentence-transformers/all-MiniLM-L6-v2", device: str = "cpu"):
+    """Get a shared SentenceTransformer embedding model."""
+    if not HAVE_SENTENCE_TRANSFORMERS:
+        raise ImportError("sentence-transformers not installed. Install with: pip install sentence-transformers")
+    return _load_model(SentenceTransformer, model_name, device)
+
+
+def get_cross_encoder(model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", device: str = "cpu"):
+    """Get a shared CrossEncoder reranking model."""
+    if not HAVE_SENTENCE_TRANSFORMERS:
+        raise ImportError("sentence-transformers not installed. Install with: pip install sentence-transformers")
+    return _load_model(CrossEncoder, model_name, device)
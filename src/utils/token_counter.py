@@ -0,0 +1,180 @@
+"""
+Token counting for Domain-SC LLM requests.
+Uses tiktoken for OpenAI models and a calibrated local estimator for Claude
+models. Counts are memoized by content hash so repeated prompt templates are
+only tokenized once.
+"""
+
+import re
+import math
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "llm_service.log")
+
+# If available, use tiktoken for exact OpenAI token counts
+try:
+    import tiktoken
+    HAVE_TIKTOKEN = True
+except ImportError:
+    HAVE_TIKTOKEN = False
+
+# Pre-tokenization pieces, roughly following the cl100k_base split pattern
+_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\x00-\x7f]|\s+|[^\w\s]+")
+
+# Claude's tokenizer splits text into ~10% more tokens than cl100k_base,
+# more for code and structured data
+DEFAULT_CLAUDE_CALIBRATION = 1.1
+
+
+def heuristic_token_count(text: str) -> int:
+    """Estimate a cl100k_base-like token count without a tokenizer.
+
+    Instead of counting whitespace-separated words, the text is split into
+    letter runs, digit runs, symbol runs and whitespace, which keeps the
+    estimate close for code and JSON as well as prose.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated number of tokens
+    """
+    count = 0
+    for piece in _PIECE_PATTERN.findall(text):
+        first = piece[0]
+        if first.isspace():
+            # A single space merges into the next word; indentation and
+            # blank lines become one token per run
+            if len(piece) > 1 or first == "\n":
+                count += 1
+        elif first.isascii() and first.isalpha():
+            # Common words are one token; long identifiers split every ~6 chars
+            count += max(1, math.ceil(len(piece) / 6))
+        elif first.isdigit():
+            # Numbers are split into groups of up to three digits
+            count += math.ceil(len(piece) / 3)
+        elif not first.isascii():
+            count += 1
+        else:
+            # Symbol runs such as '":', '{"' or '->' often merge in pairs
+            count += math.ceil(len(piece) / 2)
+    return count
+
+
+class TokenCounter:
+    """Counts tokens per model family with memoization by content hash."""
+
+    def __init__(self,
+                 max_entries: int = 10000,
+                 claude_calibration: float = DEFAULT_CLAUDE_CALIBRATION,
+                 default_encoding: str = "cl100k_base"):
+        """Initialize the token counter.
+
+        Args:
+            max_entries: Maximum number of memoized counts
+            claude_calibration: Multiplier applied to cl100k_base counts for Claude models
+            default_encoding: Encoding used for models tiktoken does not know
+        """
+        self.max_entries = max_entries
+        self.claude_calibration = claude_calibration
+        self.default_encoding = default_encoding
+
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._encodings: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Count the tokens of a text for a model.
+
+        Args:
+            text: Text to count
+            model: Model name, used to pick the tokenizer
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+
+        encoding_name = self._encoding_name(model)
+        is_claude = self._is_claude(model)
+        key = f"{encoding_name}:{int(is_claude)}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        tokens = self._count_uncached(text, encoding_name)
+        if is_claude:
+            tokens = int(math.ceil(tokens * self.claude_calibration))
+
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+        return tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memoization statistics."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "tokenizer": "tiktoken" if HAVE_TIKTOKEN and any(self._encodings.values()) else "heuristic"
+        }
+
+    def _is_claude(self, model: Optional[str]) -> bool:
+        """Check whether a model uses Anthropic's tokenizer."""
+        return bool(model) and model.startswith("claude")
+
+    def _encoding_name(self, model: Optional[str]) -> str:
+        """Resolve the tiktoken encoding name for a model."""
+        if HAVE_TIKTOKEN and model and not self._is_claude(model):
+            try:
+                return tiktoken.encoding_name_for_model(model)
+            except KeyError:
+                pass
+        return self.default_encoding
+
+    def _get_encoding(self, encoding_name: str):
+        """Load a tiktoken encoding once, or None if unavailable."""
+        if not HAVE_TIKTOKEN:
+            return None
+
+        with self._lock:
+            if encoding_name in self._encodings:
+                return self._encodings[encoding_name]
+
+        try:
+            encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            # Encoding files are downloaded on first use and may be unreachable offline
+            logger.warning(f"Could not load tiktoken encoding '{encoding_name}', "
+                           f"using heuristic token estimates: {str(e)}")
+            encoding = None
+
+        with self._lock:
+            self._encodings[encoding_name] = encoding
+        return encoding
+
+    def _count_uncached(self, text: str, encoding_name: str) -> int:
+        """Count tokens with tiktoken, falling back to the heuristic estimator."""
+        encoding = self._get_encoding(encoding_name)
+        if encoding is None:
+            return heuristic_token_count(text)
+        return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,309 @@
+"""
+Asynchronous web crawler for the Domain-SC knowledge base builder.
+All requests share one pooled HTTP client and a global concurrency limit.
+Politeness is enforced per host with a token bucket and robots.txt rules,
+so pages from different sites are fetched in parallel while each site sees
+at most the configured request rate.
+"""
+
+import asyncio
+import heapq
+import time
+from urllib.parse import urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterable, Tuple
+
+import httpx
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__, "knowledge_base_builder.log")
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate to a single host."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """Initialize the bucket.
+
+        Args:
+            rate: Requests per second
+            burst: Requests allowed back to back before the rate applies
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                # Waiters queue on the lock, so each one gets the next token in turn
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.updated = time.monotonic()
+                self.tokens = 0.0
+            else:
+                self.tokens -= 1
+
+
+class CrawlFrontier:
+    """Priority frontier of URLs to crawl that admits each URL only once.
+
+    Lower priorities are crawled first; with the depth as priority the crawl
+    is breadth-first.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seen = set()
+        self._counter = 0
+
+    def push(self, url: str, depth: int, priority: Optional[float] = None) -> bool:
+        """Add a URL unless it was added before. Returns whether it was added."""
+        url = normalize_url(url)
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        # The counter keeps insertion order among equal priorities
+        heapq.heappush(self._heap, (depth if priority is None else priority, self._counter, url, depth))
+        self._counter += 1
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        """Remove and return the (url, depth) with the lowest priority."""
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, url: str) -> bool:
+        return normalize_url(url) in self._seen
+
+
+def normalize_url(url: str) -> str:
+    """Drop the fragment of a URL, so anchors of one page are crawled once."""
+    parsed = urlparse(url)
+    return urlunparse(parsed._replace(fragment=""))
+
+
+class AsyncCrawler:
+    """Fetches pages concurrently with per-host rate limiting and robots.txt support.
+
+    Use as an async context manager so the pooled client is closed:
+
+        async with AsyncCrawler(user_agent) as crawler:
+            response = await crawler.fetch(url)
+    """
+
+    def __init__(self,
+                 user_agent: str,
+                 max_concurrency: int = 16,
+                 rate_limit: float = 1.0,
+                 burst: int = 1,
+                 timeout: float = 30.0,
+                 respect_robots: bool = True,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """Initialize the crawler.
+
+        Args:
+            user_agent: User agent sent with requests and matched against robots.txt
+            max_concurrency: Maximum requests in flight across all hosts
+            rate_limit: Maximum requests per second to any one host
+            burst: Requests a host may receive back to back
+            timeout: Default request timeout in seconds
+            respect_robots: Whether to honor robots.txt rules and crawl delays
+            transport: Optional httpx transport, e.g. a mock transport in tests
+        """
+        self.user_agent = user_agent
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.timeout = timeout
+        self.respect_robots = respect_robots
+        self.transport = transport
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+
+        self.requests = 0
+        self.blocked_by_robots = 0
+
+    async def __aenter__(self) -> "AsyncCrawler":
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": self.user_agent},
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+            transport=self.transport
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate_limit, self.burst)
+        return bucket
+
+    async def _get_robots(self, url: str) -> Optional[RobotFileParser]:
+        """Fetch and parse the robots.txt of a URL's host once."""
+        parsed = urlparse(url)
+        host = parsed.netloc
+        lock = self._robots_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            if host in self._robots:
+                return self._robots[host]
+
+            parser = RobotFileParser()
+            try:
+                await self._bucket(host).acquire()
+                async with self._semaphore:
+                    response = await self.client.get(f"{parsed.scheme}://{host}/robots.txt")
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code == 200:
+                    parser.parse(response.text.splitlines())
+                else:
+                    parser.allow_all = True
+            except Exception as e:
+                logger.debug(f"Error fetching robots.txt for {host}, allowing all: {str(e)}")
+                parser.allow_all = True
+
+            # A slower crawl delay than our rate limit takes precedence
+            delay = parser.crawl_delay(self.user_agent)
+            if delay and 1 / float(delay) < self.rate_limit:
+                self._buckets[host] = TokenBucket(1 / float(delay))
+
+            self._robots[host] = parser
+            return parser
+
+    async def allowed(self, url: str) -> bool:
+        """Check whether robots.txt allows fetching a URL."""
+        if not self.respect_robots:
+            return True
+        parser = await self._get_robots(url)
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None,
+                    params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+                    check_robots: bool = True) -> httpx.Response:
+        """Fetch a URL politely.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers
+            params: Query parameters
+            timeout: Request timeout, defaults to the crawler's
+            check_robots: Whether robots.txt applies; off for explicitly
+                requested resources such as API calls
+
+        Returns:
+            The response with its body read
+
+        Raises:
+            PermissionError: If robots.txt disallows the URL
+            httpx.HTTPError: On network errors
+        """
+        if check_robots and not await self.allowed(url):
+            self.blocked_by_robots += 1
+            raise PermissionError(f"Disallowed by robots.txt: {url}")
+
+        await self._bucket(urlparse(url).netloc).acquire()
+        async with self._semaphore:
+            self.requests += 1
+            return await self.client.get(url, headers=headers, params=params,
+                                         timeout=timeout if timeout is not None else self.timeout)
+
+    async def crawl(self,
+                    seeds: Iterable[str],
+                    handle: Callable[[str, httpx.Response, int], Awaitable[Iterable[str]]],
+                    max_depth: int = 2,
+                    accept: Optional[Callable[[str], bool]] = None,
+                    priority: Optional[Callable[[str, int], float]] = None,
+                    on_error: Optional[Callable[[str, Exception], None]] = None,
+                    fetch: Optional[Callable[[str], Awaitable[Any]]] = None) -> int:
+        """Crawl outward from seed URLs.
+
+        Args:
+            seeds: Start URLs, at depth 0
+            handle: Coroutine called with (url, response, depth) for each fetched
+                page; returns the links to follow
+            max_depth: Links are followed from pages up to this depth
+            accept: Filter deciding whether a URL is crawled at all
+            priority: Priority of a URL at a depth, lower first; defaults to the
+                depth, i.e. breadth-first
+            on_error: Called with (url, exception) for pages that failed
+            fetch: Optional coroutine fetching a URL, e.g. through a cache; its
+                result is passed to handle in place of the response
+
+        Returns:
+            Number of pages handled
+        """
+        frontier = CrawlFrontier()
+        ready = asyncio.Condition()
+        in_progress = 0
+        handled = 0
+
+        def push(url: str, depth: int):
+            if accept is None or accept(url):
+                frontier.push(url, depth, priority(url, depth) if priority else None)
+
+        for seed in seeds:
+            push(seed, 0)
+
+        async def worker():
+            nonlocal in_progress, handled
+            while True:
+                async with ready:
+                    # Done once nothing is queued and no page can add more links
+                    await ready.wait_for(lambda: len(frontier) or not in_progress)
+                    if not len(frontier):
+                        ready.notify_all()
+                        return
+                    url, depth = frontier.pop()
+                    in_progress += 1
+                try:
+                    if not await self.allowed(url):
+                        # Politeness, not a failure
+                        self.blocked_by_robots += 1
+                        logger.info(f"Skipping {url}: disallowed by robots.txt")
+                        continue
+                    response = await (fetch(url) if fetch else self.fetch(url, check_robots=False))
+                    links = await handle(url, response, depth)
+                    handled += 1
+                    if depth < max_depth:
+                        for link in links or []:
+                            push(link, depth + 1)
+                except Exception as e:
+                    if on_error:
+                        on_error(url, e)
+                    else:
+                        logger.error(f"Error crawling {url}: {str(e)}")
+                finally:
+                    async with ready:
+                        in_progress -= 1
+                        ready.notify_all()
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+        return handled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counters."""
+        return {
+            "requests": self.requests,
+            "hosts": len(self._buckets),
+            "blocked_by_robots": self.blocked_by_robots
+        }
@@ -0,0 +1,93 @@
+"""
+Unit tests for the design store.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services.design_store import DesignStore
+
+
+class TestDesignStore(unittest.TestCase):
+    """Tests for the DesignStore class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "designs.sqlite3")
+        vectors = {"alpha": [1.0, 0.0], "beta": [0.8, 0.6], "gamma": [0.0, 1.0]}
+        self.embed = lambda text: vectors[text]
+        self.store = DesignStore(self.path, embed_fn=self.embed, max_entries=2)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_find_similar_above_threshold(self):
+        """Test that the nearest design is returned only above the threshold."""
+        self.store.put("a", "alpha", {"architecture": "A"}, "v1")
+
+        design, similarity = self.store.find_similar("beta", "v1", threshold=0.75)
+
+        self.assertEqual(design, {"architecture": "A"})
+        self.assertAlmostEqual(similarity, 0.8, places=5)
+        self.assertIsNone(self.store.find_similar("gamma", "v1", threshold=0.75))
+
+    def test_index_version_change_invalidates(self):
+        """Test that designs from another index version are dropped."""
+        self.store.put("a", "alpha", {"architecture": "A"}, "v1")
+
+        self.assertIsNone(self.store.get("a", "v2"))
+        self.assertEqual(len(self.store), 0)
+
+    def test_unknown_index_version_keeps_designs(self):
+        """Test that an unknown index version does not drop designs from other versions."""
+        self.store.put("a", "alpha", {"architecture": "A"}, "3:120")
+
+        self.assertIsNone(self.store.get("b", "0:0"))
+        self.assertIsNone(self.store.get("b", "unknown"))
+        self.assertEqual(self.store.get("a", "3:120"), {"architecture": "A"})
+
+    def test_windowed_embeddings_catch_late_changes(self):
+        """Test that requirements differing only in a later window are not treated as identical."""
+        vectors = {"head": [1.0, 0.0], "tail-a": [0.0, 1.0], "tail-b": [0.6, 0.8]}
+        store = DesignStore(os.path.join(self.temp_dir, "windows.sqlite3"),
+                            embed_fn=lambda text: [vectors[part] for part in text.split("|")])
+        store.put("a", "head|tail-a", {"architecture": "A"}, "v1")
+
+        design, similarity = store.find_similar("head|tail-a", "v1", threshold=0.97)
+        self.assertEqual(design, {"architecture": "A"})
+        self.assertAlmostEqual(similarity, 1.0, places=5)
+        self.assertIsNone(store.find_similar("head|tail-b", "v1", threshold=0.97))
+        self.assertIsNone(store.find_similar("head", "v1", threshold=0.97))
+
+    def test_ttl_and_size_eviction(self):
+        """Test that expired and least recently used designs are evicted."""
+        for key, text in [("a", "alpha"), ("b", "beta"), ("c", "gamma")]:
+            self.store.put(key, text, {"architecture": key}, "v1")
+
+        self.assertEqual(len(self.store), 2)
+
+        with patch("src.services.design_store.datetime") as mock_datetime:
+            mock_datetime.now.return_value.timestamp.return_value = 10 ** 12
+            self.assertIsNone(self.store.get("c", "v1"))
+
+    def test_persists_across_instances(self):
+        """Test that designs survive reopening the store."""
+        self.store.put("a", "alpha", {"architecture": "A"}, "v1")
+
+        reopened = DesignStore(self.path, embed_fn=self.embed)
+
+        self.assertEqual(reopened.get("a", "v1"), {"architecture": "A"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Unit tests for the persistent embedding cache.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Tests for the EmbeddingCache class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = EmbeddingCache(self.temp_dir)
+        self.embedded = []
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def _embed_fn(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+    def test_only_missing_texts_are_embedded(self):
+        """Test that cached texts skip the model and results keep input order."""
+        self.cache.embed("model:torch", ["a", "bb"], self._embed_fn)
+        self.embedded.clear()
+
+        vectors = self.cache.embed("model:torch", ["ccc", "a", "ccc", "bb"], self._embed_fn)
+
+        self.assertEqual(self.embedded, ["ccc"])
+        self.assertEqual(vectors[:, 0].tolist(), [3.0, 1.0, 3.0, 2.0])
+        self.assertEqual(vectors.dtype, np.float32)
+
+    def test_vectors_persist_across_instances(self):
+        """Test that a new cache over the same directory serves stored vectors."""
+        self.cache.embed("model:torch", ["alpha", "beta"], self._embed_fn)
+        self.embedded.clear()
+
+        reopened = EmbeddingCache(self.temp_dir)
+        vectors = reopened.embed("model:torch", ["beta", "alpha"], self._embed_fn)
+
+        self.assertEqual(self.embedded, [])
+        self.assertEqual(vectors[:, 0].tolist(), [4.0, 5.0])
+        self.assertEqual(reopened.get_stats()["hit_rate"], 1.0)
+
+    def test_models_are_cached_separately(self):
+        """Test that the same text is embedded again for another model."""
+        self.cache.embed("model:torch", ["alpha"], self._embed_fn)
+        self.cache.embed("model:onnx", ["alpha"], self._embed_fn)
+
+        self.assertEqual(self.embedded, ["alpha", "alpha"])
+        self.assertEqual(self.cache.get_stats()["entries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for the batched embedding pipeline.
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.embedding_pipeline import EmbeddingPipeline
+
+
+class TestEmbeddingPipeline(unittest.TestCase):
+    """Tests for the EmbeddingPipeline class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.batch_sizes = []
+
+        def encode_fn(texts):
+            self.batch_sizes.append(len(texts))
+            return [[float(len(text)), 0.0] for text in texts]
+
+        self.pipeline = EmbeddingPipeline(batch_size=4, num_workers=1, encode_fn=encode_fn)
+
+    def test_embeds_in_batches_preserving_order(self):
+        """Test that texts are split into batches and results keep input order."""
+        texts = ["x" * i for i in range(1, 11)]
+
+        embeddings = self.pipeline.embed(texts)
+
+        self.assertEqual(self.batch_sizes, [4, 4, 2])
+        self.assertEqual(embeddings.dtype, np.float32)
+        self.assertEqual(embeddings[:, 0].tolist(), [float(i) for i in range(1, 11)])
+
+    def test_progress_and_throughput_stats(self):
+        """Test progress callbacks and chunks/sec statistics."""
+        progress = []
+
+        self.pipeline.embed(["a"] * 9, progress_callback=lambda done, total: progress.append((done, total)))
+        stats = self.pipeline.get_stats()
+
+        self.assertEqual(progress, [(4, 9), (8, 9), (9, 9)])
+        self.assertEqual(stats["chunks"], 9)
+        self.assertEqual(stats["batches"], 3)
+        self.assertGreater(stats["chunks_per_sec"], 0)
+
+    def test_cache_skips_embedded_texts(self):
+        """Test that texts already in the cache are not embedded again."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.pipeline.cache = EmbeddingCache(cache_dir)
+            self.pipeline.embed(["one", "two"])
+            self.batch_sizes.clear()
+
+            embeddings = self.pipeline.embed(["two", "three", "one"])
+
+            self.assertEqual(self.batch_sizes, [1])
+            self.assertEqual(embeddings[:, 0].tolist(), [3.0, 5.0, 3.0])
+            self.assertEqual(self.pipeline.get_stats()["cache"]["hits"], 2)
+
+    def test_queries_bypass_cache(self):
+        """Test that query embeddings are neither served from nor written to the cache."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.pipeline.cache = EmbeddingCache(cache_dir)
+            self.pipeline.embed(["one"])
+
+            embeddings = self.pipeline.embed_queries(["one", "what is cqrs"])
+
+            self.assertEqual(embeddings[:, 0].tolist(), [3.0, 12.0])
+            self.assertEqual(self.batch_sizes, [1, 2])
+            self.assertEqual(self.pipeline.cache.get_stats()["entries"], 1)
+
+    def test_queries_do_not_wait_for_bulk_embedding(self):
+        """Test that a query is embedded while a bulk job is still encoding."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def encode_fn(texts):
+            if "bulk" in texts:
+                started.set()
+                release.wait(10)
+            return [[float(len(text)), 0.0] for text in texts]
+
+        self.pipeline.encode_fn = encode_fn
+        bulk = threading.Thread(target=self.pipeline.embed, args=(["bulk"],))
+        bulk.start()
+        started.wait(5)
+
+        try:
+            embeddings = self.pipeline.embed_queries(["query"])
+            bulk_running = bulk.is_alive()
+        finally:
+            release.set()
+            bulk.join(5)
+
+        self.assertEqual(embeddings[:, 0].tolist(), [5.0])
+        self.assertTrue(bulk_running)
+        self.assertEqual(self.pipeline.get_stats()["chunks"], 2)
+
+    def test_unknown_backend_rejected(self):
+        """Test that an unknown backend raises an error."""
+        with self.assertRaises(ValueError):
+            EmbeddingPipeline(backend="tensorrt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,288 @@
+"""
+Unit tests for page analysis and relevance scoring in the enhanced knowledge base builder.
+"""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+import enhanced_knowledge_base
+from enhanced_knowledge_base import (
+    EnhancedKnowledgeBaseBuilder, PageAnalysisStage, analyze_page, RELEVANCE_CHUNK_SIZE
+)
+from src.utils.embedding_cache import EmbeddingCache
+
+ARTICLE_HTML = """
+<html><head><title>Event Sourcing Guide</title></head>
+<body>
+  <nav><a href="/nav-only">Home</a></nav>
+  <article>
+    <p>Event sourcing stores every change as an event. See <a href="/cqrs">CQRS</a>
+    and <a href="#top">the top</a>.</p>
+  </article>
+</body></html>
+"""
+
+DOC_HTML = """
+<html><head><title>Broker Docs</title></head>
+<body><main>
+  <p>Use a message broker between services.</p>
+  <a href="/docs/queues">Queues</a>
+  <a href="https://other.example.org/page">Elsewhere</a>
+  <a href="#section">Section</a>
+</main></body></html>
+"""
+
+LINK_HTML = "<html><head><title>Saga Pattern</title></head><body><article>Sagas coordinate services.</article></body></html>"
+
+# One relevance chunk each: scored 1.0 and 0.6 against the stub reference
+RELEVANT_CHUNK = "agent ".ljust(RELEVANCE_CHUNK_SIZE, "a")
+OTHER_CHUNK = "x" * RELEVANCE_CHUNK_SIZE
+
+
+class StubModel:
+    """Sentence model stub embedding chunks that mention agents close to the reference."""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False):
+        self.calls.append(list(texts))
+        return np.array([[1.0, 0.0] if "agent" in text else [0.6, 0.8] for text in texts], dtype=np.float32)
+
+
+class TestAnalyzePage(unittest.TestCase):
+    """Tests for the analyze_page function."""
+
+    def test_article(self):
+        """Test that articles are converted with title, source and absolute links."""
+        page = analyze_page("article", "https://blog.example.com/posts/es", ARTICLE_HTML)
+
+        self.assertEqual(page["title"], "Event Sourcing Guide")
+        self.assertEqual(page["links"], ["https://blog.example.com/nav-only", "https://blog.example.com/cqrs"])
+        self.assertTrue(page["filename"].startswith("event-sourcing-guide-"))
+        self.assertTrue(page["final_content"].startswith(
+            "# Event Sourcing Guide\n\nSource: https://blog.example.com/posts/es\n\n"))
+        self.assertNotIn("Home", page["markdown_content"])
+        self.assertEqual(page["relevance_text"], page["final_content"])
+        self.assertIn("event_driven", page["patterns"])
+
+    def test_documentation(self):
+        """Test that documentation pages keep only same-site links."""
+        page = analyze_page("documentation", "https://docs.example.com/guide/broker", DOC_HTML,
+                            base_url="https://docs.example.com")
+
+        self.assertEqual(page["title"], "Broker Docs")
+        self.assertEqual(page["links"], ["https://docs.example.com/docs/queues"])
+        self.assertTrue(page["filename"].startswith("guide-broker-"))
+        self.assertEqual(page["relevance_text"], page["markdown_content"])
+        self.assertIn("event_driven", page["patterns"])
+
+    def test_link(self):
+        """Test that discovered links yield their title and main text only."""
+        page = analyze_page("link", "https://example.com/saga", LINK_HTML)
+        self.assertEqual(page, {"title": "Saga Pattern", "relevance_text": "Sagas coordinate services."})
+
+        untitled = analyze_page("link", "https://example.com/empty", "<html></html>")
+        self.assertEqual(untitled, {"title": "https://example.com/empty", "relevance_text": None})
+
+    def test_unknown_kind_rejected(self):
+        """Test that an unknown page kind raises an error."""
+        with self.assertRaises(ValueError):
+            analyze_page("video", "https://example.com", LINK_HTML)
+
+
+class TestPageAnalysisStage(unittest.TestCase):
+    """Tests for the PageAnalysisStage class."""
+
+    def test_results_match_inline_analysis(self):
+        """Test that pages analyzed in the pool get their analysis and relevance score."""
+        async def run():
+            async with PageAnalysisStage(relevance_fn=len, workers=2) as stage:
+                return await asyncio.gather(
+                    stage.analyze("link", "https://example.com/saga", LINK_HTML),
+                    stage.analyze("link", "https://example.com/empty", "<html></html>")
+                )
+
+        (saga, saga_relevance), (empty, empty_relevance) = asyncio.run(run())
+
+        self.assertEqual(saga, analyze_page("link", "https://example.com/saga", LINK_HTML))
+        self.assertEqual(saga_relevance, len("Sagas coordinate services."))
+        self.assertEqual(empty["relevance_text"], None)
+        self.assertIsNone(empty_relevance)
+
+    def test_bounded_queue_applies_back_pressure(self):
+        """Test that submitters wait once the queue is full instead of buffering pages."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def relevance_fn(text):
+            started.set()
+            release.wait(10)
+            return 1.0
+
+        async def run():
+            async with PageAnalysisStage(relevance_fn=relevance_fn, workers=1, queue_size=1) as stage:
+                tasks = [asyncio.ensure_future(stage.analyze("link", f"https://example.com/{i}", LINK_HTML))
+                         for i in range(4)]
+                while not started.is_set():
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.1)
+
+                # One page is being scored and one waits in the queue; the other two wait to enter it
+                full, done = stage._queue.full(), sum(task.done() for task in tasks)
+                release.set()
+                results = await asyncio.gather(*tasks)
+                return full, done, results
+
+        full, done, results = asyncio.run(run())
+
+        self.assertTrue(full)
+        self.assertEqual(done, 0)
+        self.assertEqual([relevance for _, relevance in results], [1.0] * 4)
+
+    def test_exceptions_reach_the_awaiting_caller(self):
+        """Test that analysis and scoring errors are raised from analyze, and the stage keeps running."""
+        def relevance_fn(text):
+            if "fail" in text:
+                raise RuntimeError("model failed")
+            return 0.5
+
+        async def run():
+            async with PageAnalysisStage(relevance_fn=relevance_fn, workers=1) as stage:
+                failures = await asyncio.gather(
+                    stage.analyze("video", "https://example.com", LINK_HTML),
+                    stage.analyze("link", "https://example.com", "<body>fail</body>"),
+                    return_exceptions=True
+                )
+                return failures, await stage.analyze("link", "https://example.com/saga", LINK_HTML)
+
+        (analysis_error, scoring_error), (_, relevance) = asyncio.run(run())
+
+        self.assertIsInstance(analysis_error, ValueError)
+        self.assertIsInstance(scoring_error, RuntimeError)
+        self.assertEqual(relevance, 0.5)
+
+
+class TestBuilderPageAnalysis(unittest.TestCase):
+    """Tests for page analysis in the EnhancedKnowledgeBaseBuilder class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        dirs = ["resources", "config", "temp", "relationships", "code", "http_cache"]
+        self.builder = EnhancedKnowledgeBaseBuilder(*(str(Path(self.temp_dir) / name) for name in dirs))
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_analyzes_inline_without_stage(self):
+        """Test that pages are analyzed in-process when no analysis stage is running."""
+        scored = []
+        self.builder._calculate_relevance = lambda text: scored.append(text) or 0.7
+
+        page, relevance = asyncio.run(self.builder._analyze_page("link", "https://example.com/saga", LINK_HTML))
+
+        self.assertIsNone(self.builder._analysis_stage)
+        self.assertEqual(page["title"], "Saga Pattern")
+        self.assertEqual(relevance, 0.7)
+        self.assertEqual(scored, ["Sagas coordinate services."])
+
+        _, relevance = asyncio.run(self.builder._analyze_page("link", "https://example.com/empty", "<html></html>"))
+        self.assertIsNone(relevance)
+
+
+
+class TestRelevanceScoring(unittest.TestCase):
+    """Tests for batched relevance scoring in the EnhancedKnowledgeBaseBuilder class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.dirs = [str(Path(self.temp_dir) / name)
+                     for name in ["resources", "config", "temp", "relationships", "code", "http_cache"]]
+        self.builder = EnhancedKnowledgeBaseBuilder(*self.dirs)
+        self.builder.semantic_model = StubModel()
+        self.builder.reference_embedding = np.array([1.0, 0.0], dtype=np.float32)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_mean_and_max_pooling_per_text(self):
+        """Test that texts with different chunk counts are pooled over their own chunks only."""
+        texts = [
+            RELEVANT_CHUNK + OTHER_CHUNK,
+            OTHER_CHUNK,
+            OTHER_CHUNK + OTHER_CHUNK + RELEVANT_CHUNK
+        ]
+
+        mean_scores = self.builder._calculate_relevance_many(texts, pooling="mean")
+        max_scores = self.builder._calculate_relevance_many(texts, pooling="max")
+
+        np.testing.assert_allclose(mean_scores, [0.8, 0.6, (0.6 + 0.6 + 1.0) / 3], rtol=1e-6)
+        np.testing.assert_allclose(max_scores, [1.0, 0.6, 1.0], rtol=1e-6)
+        # All chunks of all texts are encoded in one call
+        self.assertEqual([len(call) for call in self.builder.semantic_model.calls], [6, 6])
+
+    def test_single_chunk_scores_like_unchunked_text(self):
+        """Test that a text of one chunk scores its plain cosine similarity under both poolings."""
+        self.builder.semantic_model.encode = lambda texts, **kwargs: np.array([[3.0, 4.0]] * len(texts))
+
+        for pooling in ("mean", "max"):
+            self.assertAlmostEqual(self.builder._calculate_relevance_many(["short text"], pooling)[0], 0.6)
+
+    def test_empty_inputs(self):
+        """Test that an empty text is scored as one empty chunk and no texts give no scores."""
+        self.assertAlmostEqual(self.builder._calculate_relevance(""), 0.6)
+        self.assertEqual(self.builder.semantic_model.calls, [[""]])
+        self.assertEqual(self.builder._calculate_relevance_many([]), [])
+
+    def test_unknown_pooling_rejected(self):
+        """Test that an unknown pooling raises an error."""
+        with self.assertRaises(ValueError):
+            self.builder._calculate_relevance_many(["text"], pooling="median")
+
+    def test_keyword_fallback(self):
+        """Test that keyword scoring is used without a model and when the model fails."""
+        texts = ["agent coordination via message passing", "unrelated text"]
+        expected = [self.builder._keyword_relevance(text) for text in texts]
+
+        def fail(texts, **kwargs):
+            raise RuntimeError("model failed")
+
+        self.builder.semantic_model.encode = fail
+        self.assertEqual(self.builder._calculate_relevance_many(texts), expected)
+
+        self.builder.semantic_model = None
+        self.assertEqual(self.builder._calculate_relevance_many(texts), expected)
+        self.assertGreater(expected[0], expected[1])
+
+    def test_only_reference_embedding_is_cached(self):
+        """Test that the reference embedding is cached but scored page chunks are not."""
+        cache = EmbeddingCache(str(Path(self.temp_dir) / "embeddings"))
+        with patch.multiple(enhanced_knowledge_base, HAVE_SENTENCE_TRANSFORMERS=True, HAVE_EMBEDDING_CACHE=True,
+                            SentenceTransformer=StubModel, RAG_SETTINGS={"embedding_cache_dir": "unused"},
+                            get_embedding_cache=lambda path: cache, create=True):
+            builder = EnhancedKnowledgeBaseBuilder(*self.dirs)
+
+        self.assertEqual(cache.get_stats()["entries"], 1)
+
+        builder._calculate_relevance_many([RELEVANT_CHUNK + OTHER_CHUNK, OTHER_CHUNK])
+
+        self.assertEqual(cache.get_stats()["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
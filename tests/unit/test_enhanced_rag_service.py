@@ -0,0 +1,213 @@
+"""
+Unit tests for the enhanced RAG service.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services import rerankers
+from src.services.enhanced_rag_service import EnhancedRAGService
+from src.services.sparse_index import BM25Index
+
+
+class TestEnhancedRAGService(unittest.TestCase):
+    """Tests for the EnhancedRAGService class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        with patch.object(EnhancedRAGService, "_initialize_vector_store", return_value=None), \
+             patch("src.services.enhanced_rag_service.create_reranker", return_value=None):
+            self.service = EnhancedRAGService(llm_service=MagicMock())
+
+        self.service.lightweight_llm = MagicMock()
+        self.documents = [
+            {"id": "doc1", "document": "Microservices communicate through an API gateway."},
+            {"id": "doc2", "document": "A recipe for banana bread."},
+            {"id": "doc3", "document": "Event sourcing stores state changes as events."}
+        ]
+
+    def test_batch_relevance_single_call(self):
+        """Test that batch mode scores all candidates with one LLM call."""
+        self.service.lightweight_llm.generate_text.return_value = "1: 9\n2: 1\n3: 7"
+
+        scores = self.service.batch_evaluate_relevance("microservices", self.documents)
+
+        self.assertEqual(scores, [0.9, 0.1, 0.7])
+        self.assertEqual(self.service.lightweight_llm.generate_text.call_count, 1)
+
+    def test_batch_relevance_uses_cache(self):
+        """Test that cached scores are not re-evaluated."""
+        self.service.lightweight_llm.generate_text.return_value = "1: 9\n2: 1\n3: 7"
+        self.service.batch_evaluate_relevance("microservices", self.documents)
+
+        scores = self.service.batch_evaluate_relevance("microservices", self.documents)
+
+        self.assertEqual(scores, [0.9, 0.1, 0.7])
+        self.assertEqual(self.service.lightweight_llm.generate_text.call_count, 1)
+
+    def test_batch_relevance_falls_back_for_missing_scores(self):
+        """Test that unparsed scores fall back to per-document evaluation."""
+        self.service.lightweight_llm.generate_text.side_effect = ["1: 9\n3: 7", "2"]
+
+        scores = self.service.batch_evaluate_relevance("microservices", self.documents)
+
+        self.assertEqual(scores, [0.9, 0.2, 0.7])
+
+    def test_concurrent_relevance(self):
+        """Test that concurrent mode preserves candidate order."""
+        self.service.relevance_scoring_mode = "concurrent"
+        self.service.lightweight_llm.generate_text.side_effect = (
+            lambda prompt, **kwargs: "8" if "Event sourcing" in prompt else "2"
+        )
+
+        scores = self.service.evaluate_relevance("events", self.documents)
+
+        self.assertEqual(scores, [0.2, 0.2, 0.8])
+
+    def test_embedding_reranker_uses_stored_embeddings(self):
+        """Test that the embedding reranker scores stored embeddings without LLM calls."""
+        model = MagicMock()
+        model.encode.return_value = [1.0, 0.0]
+        with patch.object(rerankers, "get_sentence_transformer", return_value=model):
+            self.service.reranker = rerankers.EmbeddingReranker()
+
+        documents = [dict(doc) for doc in self.documents]
+        for doc, embedding in zip(documents, [[2.0, 0.0], [0.0, 1.0], [1.0, 3.0]]):
+            doc["embedding"] = embedding
+
+        scores = self.service.evaluate_relevance("microservices", documents)
+
+        self.assertEqual(len(scores), 3)
+        self.assertAlmostEqual(scores[0], 1.0, places=5)
+        self.assertAlmostEqual(scores[1], 0.0, places=5)
+        # Cosine 0.3162, calibrated onto the LLM scale
+        self.assertAlmostEqual(scores[2], (0.3162 - 0.05) / 0.5, places=3)
+        model.encode.assert_called_once_with("microservices")
+        self.service.lightweight_llm.generate_text.assert_not_called()
+
+    def test_reranker_scores_calibrated_to_default_threshold(self):
+        """Test that realistic MiniLM cosines and ms-marco logits pass the 0.45 threshold as intended."""
+        model = MagicMock()
+        model.encode.return_value = [1.0, 0.0]
+        with patch.object(rerankers, "get_sentence_transformer", return_value=model):
+            reranker = rerankers.EmbeddingReranker()
+
+        # Cosines of typical relevant (0.35, 0.6) and unrelated (0.12) chunks
+        documents = [{"embedding": [cosine, (1 - cosine ** 2) ** 0.5]} for cosine in (0.35, 0.6, 0.12)]
+        scores = reranker.score("event sourcing", documents)
+        self.assertEqual([score >= 0.45 for score in scores], [True, True, False])
+
+        cross_model = MagicMock()
+        cross_model.predict.return_value = [2.5, -0.2, -9.0]
+        with patch.object(rerankers, "get_cross_encoder", return_value=cross_model):
+            cross_reranker = rerankers.CrossEncoderReranker()
+        scores = cross_reranker.score("event sourcing", [{"document": "x"}] * 3)
+        self.assertEqual([score >= 0.45 for score in scores], [True, True, False])
+
+    def test_reranker_error_falls_back_to_llm(self):
+        """Test that reranker failures fall back to LLM scoring."""
+        self.service.reranker = MagicMock()
+        self.service.reranker.score.side_effect = RuntimeError("model unavailable")
+        self.service.lightweight_llm.generate_text.return_value = "1: 9\n2: 1\n3: 7"
+
+        scores = self.service.evaluate_relevance("microservices", self.documents)
+
+        self.assertEqual(scores, [0.9, 0.1, 0.7])
+
+    def test_hybrid_retrieval_adds_exact_term_matches(self):
+        """Test that BM25-only matches are fetched, fused and timed."""
+        self.service.sparse_index = BM25Index()
+        self.service.sparse_index.add(["doc1", "doc3"], [self.documents[0]["document"], "CQRS and saga patterns"])
+        self.service.vector_store = MagicMock()
+        self.service.vector_store.query.return_value = {
+            "ids": [["doc1", "doc2"]],
+            "metadatas": [[{}, {}]],
+            "documents": [[self.documents[0]["document"], self.documents[1]["document"]]],
+            "distances": [[0.2, 0.9]]
+        }
+        self.service.vector_store.get.return_value = {
+            "ids": ["doc3"], "metadatas": [{"source": "cqrs.md"}], "documents": ["CQRS and saga patterns"]
+        }
+        self.service.reranker = MagicMock()
+        self.service.reranker.score.side_effect = lambda query, docs: [0.9] * len(docs)
+        self.service.hybrid_max_candidates = 2
+
+        results = self.service.semantic_retrieval("CQRS saga", min_relevance=0.5)
+
+        # doc3 is found by BM25 only and outranks the weaker dense match doc2
+        self.assertEqual([doc["id"] for doc in results], ["doc1", "doc3"])
+        self.assertIn("bm25_score", results[1])
+        self.service.vector_store.get.assert_called_once()
+        self.assertEqual(set(self.service.get_retrieval_timings()["last"]),
+                         {"dense", "sparse", "fusion", "rerank", "total"})
+
+    def test_retrieve_many_single_vector_query(self):
+        """Test that a query set is searched with one call and repeated queries are collapsed."""
+        self.service.vector_store = MagicMock()
+        self.service.vector_store.query.return_value = {
+            "ids": [["doc1"], ["doc3"]],
+            "metadatas": [[{}], [{}]],
+            "documents": [[self.documents[0]["document"]], [self.documents[2]["document"]]],
+            "distances": [[0.1], [0.2]]
+        }
+        self.service.reranker = MagicMock()
+        self.service.reranker.score.side_effect = lambda query, docs: [0.9] * len(docs)
+
+        results = self.service.semantic_retrieval_many(["gateway", "events", "gateway"], min_relevance=0.5)
+
+        self.service.vector_store.query.assert_called_once()
+        self.assertEqual(self.service.vector_store.query.call_args.kwargs["query_texts"], ["gateway", "events"])
+        self.assertEqual([[doc["id"] for doc in docs] for docs in results], [["doc1"], ["doc3"], ["doc1"]])
+        self.assertIsNot(results[0][0], results[2][0])
+
+    def test_repeated_query_served_from_cache(self):
+        """Test that a repeated query skips retrieval until the index version changes."""
+        self.service.vector_store = MagicMock()
+        self.service.vector_store.count.return_value = 3
+        self.service.vector_store.query.return_value = {
+            "ids": [["doc1"]],
+            "metadatas": [[{}]],
+            "documents": [[self.documents[0]["document"]]],
+            "distances": [[0.1]]
+        }
+        self.service.reranker = MagicMock()
+        self.service.reranker.score.side_effect = lambda query, docs: [0.9] * len(docs)
+
+        first = self.service.retrieve_for_query("API gateway")
+        second = self.service.retrieve_for_query("api  gateway")
+
+        self.assertEqual(first, second)
+        self.service.vector_store.query.assert_called_once()
+        self.assertEqual(self.service.get_retrieval_cache_stats()["hits"], 1)
+
+        self.service.vector_store.count.return_value = 4
+        self.service.retrieve_for_query("API gateway")
+        self.assertEqual(self.service.vector_store.query.call_count, 2)
+
+    def test_failed_retrieval_is_not_cached(self):
+        """Test that a transient vector store error is not cached as an empty result."""
+        self.service.vector_store = MagicMock()
+        self.service.vector_store.count.return_value = 3
+        self.service.vector_store.query.side_effect = [RuntimeError("store unavailable"), {
+            "ids": [["doc1"]],
+            "metadatas": [[{}]],
+            "documents": [[self.documents[0]["document"]]],
+            "distances": [[0.1]]
+        }]
+        self.service.reranker = MagicMock()
+        self.service.reranker.score.side_effect = lambda query, docs: [0.9] * len(docs)
+
+        self.assertEqual(self.service.retrieve_many(["API gateway"]), [[]])
+        recovered = self.service.retrieve_many(["API gateway"])
+
+        self.assertEqual([doc["id"] for doc in recovered[0]], ["doc1"])
+        self.assertEqual(self.service.vector_store.query.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Unit tests for the enhanced system architect agent.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.agents.enhanced_system_architect_agent import EnhancedSystemArchitectAgent
+from src.agents.subtask_stats import SubtaskDeviationStats
+from src.services.design_store import DesignStore
+
+
+class TestEnhancedSystemArchitectAgent(unittest.TestCase):
+    """Tests for the EnhancedSystemArchitectAgent class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.stats_path = os.path.join(self.temp_dir, "stats.json")
+        self.agent = self._create_agent()
+        self.agent.deviation_stats = SubtaskDeviationStats(self.stats_path, min_samples=2, probe_interval=0)
+
+        self.state = {"active": 0, "peak": 0}
+        self.lock = threading.Lock()
+        self.agent._simulate_subtask = MagicMock(side_effect=lambda subtask: self._stage(
+            {"status": "success", "task_type": subtask["type"]}))
+        self.agent._execute_subtask = MagicMock(side_effect=lambda subtask: self._stage(
+            {"status": "success", "task_type": subtask["type"], "result": subtask["type"]}))
+        self.agent._execute_with_guidance = MagicMock(side_effect=lambda subtask, expected: self._stage(
+            {"status": "success", "task_type": subtask["type"], "result": "guided", "guided": True}))
+        self.agent._synthesize_results = MagicMock(return_value={"status": "success", "architecture": {}})
+        self.agent._validate_design = MagicMock(return_value={"complete": True, "gaps": []})
+
+    def _create_agent(self, embed_fn=None):
+        """Create an agent with mocked services and a temporary design store."""
+        store = DesignStore(os.path.join(self.temp_dir, "designs.sqlite3"), embed_fn=embed_fn)
+        with patch("src.agents.enhanced_system_architect_agent.OptimizedLLMService"), \
+             patch("src.agents.enhanced_system_architect_agent.EnhancedRAGService"), \
+             patch("src.agents.enhanced_system_architect_agent.AdaptivePromptSystem"), \
+             patch("src.agents.enhanced_system_architect_agent.create_design_store", return_value=store):
+            agent = EnhancedSystemArchitectAgent()
+        agent.rag_service.get_index_version.return_value = "1:100"
+        return agent
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def _stage(self, result):
+        """Simulate an LLM round-trip while tracking concurrency."""
+        with self.lock:
+            self.state["active"] += 1
+            self.state["peak"] = max(self.state["peak"], self.state["active"])
+        time.sleep(0.02)
+        with self.lock:
+            self.state["active"] -= 1
+        return result
+
+    def test_subtasks_run_concurrently(self):
+        """Test that simulations and executions overlap within the parallelism limit."""
+        self.agent.max_parallel_subtasks = 3
+
+        design = self.agent.design_architecture({"scale": "high"})
+
+        self.assertEqual(self.state["peak"], 3)
+        results = self.agent._synthesize_results.call_args[0][0]
+        self.assertEqual([r["result"] for r in results],
+                         ["pattern_selection", "component_identification", "interface_design", "data_flow_mapping"])
+        timings = design["metadata"]["timings"]
+        self.assertEqual(set(timings["subtasks"]["interface_design"]), {"simulation", "execution"})
+        self.assertIn("synthesis", timings)
+        self.assertIn("validation", timings)
+
+    def test_guided_rerun_on_deviation(self):
+        """Test that a deviating subtask is re-run with guidance."""
+        self.agent._significant_deviation = MagicMock(
+            side_effect=lambda actual, expected: actual["task_type"] == "interface_design")
+
+        design = self.agent.design_architecture({"scale": "low"})
+
+        results = self.agent._synthesize_results.call_args[0][0]
+        self.assertEqual(results[2]["result"], "guided")
+        self.assertEqual(self.agent._execute_with_guidance.call_count, 1)
+        self.assertIn("guided", design["metadata"]["timings"]["subtasks"]["interface_design"])
+
+    def test_dependencies_are_respected(self):
+        """Test that a subtask waits for the subtasks it depends on."""
+        order = []
+        self.agent._execute_subtask = MagicMock(side_effect=lambda subtask: order.append(subtask["id"]) or
+                                                {"status": "success", "task_type": subtask["type"]})
+        subtasks = [
+            {"id": "b", "type": "b", "depends_on": ["a"]},
+            {"id": "a", "type": "a", "depends_on": []}
+        ]
+
+        results, _, _ = self.agent._run_subtask_dag(subtasks)
+
+        self.assertEqual(order, ["a", "b"])
+        self.assertEqual([r["task_type"] for r in results], ["b", "a"])
+
+    def test_simulation_skipped_for_stable_subtask_types(self):
+        """Test that simulations stop once a type has a low deviation rate."""
+        for run in range(2):
+            first = self.agent.design_architecture({"run": run})
+        self.assertEqual(first["metadata"]["simulation_calls_saved"], 0)
+
+        design = self.agent.design_architecture({"run": "third"})
+
+        self.assertEqual(design["metadata"]["simulation_calls_saved"], 4)
+        self.assertEqual(self.agent._simulate_subtask.call_count, 8)
+        # Statistics survive a restart
+        reloaded = SubtaskDeviationStats(self.stats_path, min_samples=2, probe_interval=0)
+        self.assertEqual(reloaded.get_stats()["pattern_selection"]["runs"], 2)
+        self.assertEqual(reloaded.get_stats()["pattern_selection"]["skipped"], 1)
+
+    def test_skipped_simulation_runs_when_execution_fails(self):
+        """Test that a failed execution still gets simulation guidance."""
+        for _ in range(2):
+            self.agent.deviation_stats.record("interface_design", False)
+        subtask = {"id": "interface_design", "type": "interface_design", "depends_on": []}
+        self.agent._execute_subtask = MagicMock(return_value={"status": "error", "task_type": "interface_design"})
+
+        results, _, skipped = self.agent._run_subtask_dag([subtask])
+
+        self.assertEqual(skipped, [])
+        self.assertEqual(self.agent._simulate_subtask.call_count, 1)
+        self.assertEqual(results[0]["result"], "guided")
+
+    def test_design_store_persists_across_agents(self):
+        """Test that an identical request is served from the persistent store."""
+        first = self.agent.design_architecture({"scale": "high"})
+        agent = self._create_agent()
+        agent._run_subtask_dag = MagicMock()
+
+        second = agent.design_architecture({"scale": "high"})
+
+        self.assertEqual(second["architecture"], first["architecture"])
+        agent._run_subtask_dag.assert_not_called()
+
+    def test_similar_requirements_warm_start(self):
+        """Test that edited requirements refine the nearest prior design."""
+        vectors = {"1000": [1.0, 0.0], "5000": [0.9, 0.4]}
+        embed = lambda text: next(v for word, v in vectors.items() if word in text)
+        self.agent.design_store = DesignStore(os.path.join(self.temp_dir, "similar.sqlite3"), embed_fn=embed)
+        self.agent.design_architecture({"users": 1000})
+        self.agent._run_subtask_dag = MagicMock()
+
+        design = self.agent.design_architecture({"users": 5000})
+
+        self.agent._run_subtask_dag.assert_not_called()
+        self.assertEqual(self.agent._validate_design.call_count, 2)
+        self.assertIn("warm_started_from", design["metadata"])
+
+    def test_design_store_invalidated_on_index_change(self):
+        """Test that designs built against an older index are not reused."""
+        self.agent.design_architecture({"scale": "high"})
+        self.agent.rag_service.get_index_version.return_value = "2:120"
+        self.agent._synthesize_results.reset_mock()
+
+        self.agent.design_architecture({"scale": "high"})
+
+        self.agent._synthesize_results.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for the knowledge-base HTTP response cache.
+"""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.http_cache import HTTPCache, parse_max_age, FRESH, NOT_MODIFIED, UNCHANGED, CHANGED
+from src.utils.web_crawler import AsyncCrawler
+
+URL = "https://docs.example.com/page"
+
+
+class TestHTTPCache(unittest.TestCase):
+    """Tests for the HTTPCache class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = HTTPCache(self.temp_dir)
+        self.body = "v1"
+        self.headers = {"ETag": '"v1"'}
+        self.requests = []
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def _handler(self, request):
+        self.requests.append(request)
+        etag = self.headers.get("ETag")
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers=self.headers)
+        return httpx.Response(200, text=self.body, headers=self.headers)
+
+    def _fetch(self):
+        async def run():
+            async with AsyncCrawler("test-agent", rate_limit=1000, respect_robots=False,
+                                    transport=httpx.MockTransport(self._handler)) as crawler:
+                return await self.cache.fetch(crawler, URL)
+        return asyncio.run(run())
+
+    def test_conditional_get_keeps_result(self):
+        """Test that a 304 serves the cached body and keeps the recorded result."""
+        self.assertEqual(self._fetch().state, CHANGED)
+        self.cache.set_result(URL, {"output_path": "page.md"})
+
+        response = self._fetch()
+
+        self.assertEqual(response.state, NOT_MODIFIED)
+        self.assertEqual(response.text, "v1")
+        self.assertEqual(response.entry["result"], {"output_path": "page.md"})
+        self.assertEqual(self.requests[-1].headers["if-none-match"], '"v1"')
+
+    def test_same_content_without_validators_is_unchanged(self):
+        """Test that identical content is detected by hash when the server sends no validators."""
+        self.headers = {}
+        self._fetch()
+
+        self.assertEqual(self._fetch().state, UNCHANGED)
+
+        self.body = "v2"
+        response = self._fetch()
+        self.assertEqual(response.state, CHANGED)
+        self.assertIsNone(response.entry["result"])
+
+    def test_fresh_response_skips_request(self):
+        """Test that a response within its max-age is served without a request."""
+        self.headers = {"Cache-Control": "public, max-age=3600"}
+        self._fetch()
+
+        self.assertEqual(self._fetch().state, FRESH)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_parse_max_age(self):
+        """Test Cache-Control parsing."""
+        self.assertEqual(parse_max_age("public, max-age=60"), 60)
+        self.assertEqual(parse_max_age("no-cache"), 0)
+        self.assertIsNone(parse_max_age("public"))
+
+
+if __name__ == "__main__":
+    unittest.main()
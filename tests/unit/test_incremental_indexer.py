@@ -0,0 +1,142 @@
+"""
+Unit tests for incremental document indexing.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services.incremental_indexer import IndexManifest, IncrementalIndexer
+from src.utils.document_processor import chunk_id
+
+
+class FakeCollection:
+    """Minimal in-memory stand-in for a Chroma collection."""
+
+    def __init__(self):
+        self.records = {}
+        self.embedded = []
+        self.embeddings = {}
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        self.embedded.extend(ids)
+        if embeddings is not None:
+            self.embeddings.update(zip(ids, embeddings))
+        for i, doc, meta in zip(ids, documents, metadatas):
+            self.records[i] = (doc, meta)
+
+    def update(self, ids, metadatas):
+        for i, meta in zip(ids, metadatas):
+            self.records[i] = (self.records[i][0], meta)
+
+    def delete(self, ids):
+        for i in ids:
+            self.records.pop(i, None)
+
+    def get(self, where, include):
+        matches = [rec for rec in self.records.values() if rec[1]["source"] == where["source"]]
+        return {"documents": [doc for doc, _ in matches], "metadatas": [meta for _, meta in matches]}
+
+    def count(self):
+        return len(self.records)
+
+
+class TestIncrementalIndexer(unittest.TestCase):
+    """Tests for the IncrementalIndexer class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest_path = os.path.join(self.temp_dir, "manifest.json")
+        self.collection = FakeCollection()
+        self.file_a = self._write("a.md", "Alpha sentence number one. " * 10)
+        self.file_b = self._write("b.md", "Beta sentence number two. " * 10)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, text):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _index(self, file_paths):
+        indexer = IncrementalIndexer(self.collection, IndexManifest(self.manifest_path), chunk_size=100, chunk_overlap=10)
+        return indexer.index(file_paths)
+
+    def test_unchanged_corpus_is_skipped(self):
+        """Test that re-indexing an unchanged corpus embeds nothing."""
+        first = self._index([self.file_a, self.file_b])
+        self.collection.embedded.clear()
+
+        second = self._index([self.file_a, self.file_b])
+
+        self.assertGreater(first["added"], 0)
+        self.assertEqual(second["files_skipped"], 2)
+        self.assertEqual(second["skipped"], first["added"])
+        self.assertEqual(self.collection.embedded, [])
+
+    def test_changed_file_upserts_changed_chunks_and_removes_orphans(self):
+        """Test that only changed chunks are re-embedded and trailing chunks deleted."""
+        first = self._index([self.file_a, self.file_b])
+        original = "Alpha sentence number one. " * 10
+        self._write("a.md", original[:150] + "Changed!")
+        self.collection.embedded.clear()
+
+        counts = self._index([self.file_a, self.file_b])
+
+        self.assertEqual(counts["files_processed"], 1)
+        self.assertEqual(counts["updated"], 1)
+        self.assertGreater(counts["removed"], 0)
+        self.assertEqual(self.collection.embedded, [chunk_id(self.file_a, 1)])
+        self.assertEqual(self.collection.count(), first["added"] - counts["removed"])
+
+    def test_deleted_file_chunks_removed(self):
+        """Test that chunks of files deleted from disk are removed."""
+        first = self._index([self.file_a, self.file_b])
+        os.remove(self.file_b)
+
+        counts = self._index([self.file_a])
+
+        self.assertEqual(counts["removed"], first["added"] // 2)
+        self.assertTrue(all(meta["source"] == self.file_a for _, meta in self.collection.records.values()))
+
+    def test_existing_index_without_manifest_is_reused(self):
+        """Test that chunks stored before the manifest existed are not re-embedded."""
+        self._index([self.file_a])
+        os.remove(self.manifest_path)
+        self.collection.embedded.clear()
+
+        counts = self._index([self.file_a])
+
+        self.assertEqual(counts["added"] + counts["updated"], 0)
+        self.assertEqual(self.collection.embedded, [])
+
+    def test_precomputed_embeddings_are_passed_to_collection(self):
+        """Test that chunks are embedded by embed_fn and handed over with the upsert."""
+        embedded_batches = []
+
+        def embed_fn(texts):
+            embedded_batches.append(len(texts))
+            return [[float(len(text)), 1.0] for text in texts]
+
+        indexer = IncrementalIndexer(self.collection, IndexManifest(self.manifest_path),
+                                     chunk_size=100, chunk_overlap=10, embed_fn=embed_fn)
+        counts = indexer.index([self.file_a])
+
+        self.assertEqual(embedded_batches, [counts["added"]])
+        self.assertEqual(set(self.collection.embeddings), set(self.collection.records))
+        for record_id, (document, _) in self.collection.records.items():
+            self.assertEqual(self.collection.embeddings[record_id], [float(len(document)), 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
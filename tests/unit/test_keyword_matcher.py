@@ -0,0 +1,51 @@
+"""
+Unit tests for the Aho-Corasick keyword matcher.
+"""
+
+import unittest
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    """Tests for the KeywordMatcher class."""
+
+    def test_finds_overlapping_keywords(self):
+        """Test that keywords inside and overlapping other keywords are all found."""
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+        matches = list(matcher.iter_matches("ushers"))
+
+        self.assertEqual(matches, [(4, 1), (4, 0), (6, 3)])
+
+    def test_matches_substrings_like_in(self):
+        """Test that matched() agrees with substring checks for every keyword."""
+        keywords = ["message passing", "coordination", "agent coordination", "event", "event sourcing", "cqrs"]
+        matcher = KeywordMatcher(keywords)
+        texts = [
+            "Agent Coordination relies on message passing.",
+            "Event sourcing and CQRS go together.",
+            "Nothing relevant here.",
+            ""
+        ]
+
+        for text in texts:
+            expected = {i for i, keyword in enumerate(keywords) if keyword in text.lower()}
+            self.assertEqual(matcher.matched(text), expected)
+
+    def test_duplicate_keywords_and_case_sensitivity(self):
+        """Test that duplicate keywords each match and that case can be respected."""
+        matcher = KeywordMatcher(["saga", "saga"])
+        self.assertEqual(matcher.matched("A Saga pattern"), {0, 1})
+
+        case_sensitive = KeywordMatcher(["Saga"], ignore_case=False)
+        self.assertEqual(case_sensitive.matched("a saga"), set())
+        self.assertEqual(case_sensitive.matched("a Saga"), {0})
+
+
+if __name__ == "__main__":
+    unittest.main()
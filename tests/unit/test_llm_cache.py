@@ -0,0 +1,144 @@
+"""
+Unit tests for the LLM response cache backends.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services.llm_cache import (
+    LRUCacheBackend, SQLiteCacheBackend, TieredCacheBackend, SemanticCacheIndex, create_llm_cache
+)
+
+
+class TestLLMCache(unittest.TestCase):
+    """Tests for the LLM cache backends."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "llm_cache.sqlite3")
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test that the LRU tier evicts the least recently used entry."""
+        cache = LRUCacheBackend(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_lru_byte_budget(self):
+        """Test that the LRU tier stays within its byte budget."""
+        cache = LRUCacheBackend(max_entries=100, max_bytes=10)
+        cache.set("a", "12345")
+        cache.set("b", "12345")
+        cache.set("c", "12345")
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.total_bytes, 10)
+        self.assertIsNone(cache.get("a"))
+
+    def test_lru_expiry(self):
+        """Test that expired entries are treated as misses."""
+        cache = LRUCacheBackend(ttl=60)
+        cache.set("a", "1", timestamp=0)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get_stats()["misses"], 1)
+
+    def test_sqlite_persists_across_instances(self):
+        """Test that the SQLite tier survives a restart."""
+        SQLiteCacheBackend(self.db_path).set("key", "value")
+
+        reopened = SQLiteCacheBackend(self.db_path)
+
+        self.assertEqual(reopened.get("key"), "value")
+        self.assertEqual(reopened.get_stats()["hits"], 1)
+
+    def test_sqlite_size_eviction(self):
+        """Test that the SQLite tier evicts entries beyond its size limit."""
+        cache = SQLiteCacheBackend(self.db_path, max_entries=5)
+        with patch.object(SQLiteCacheBackend, "EVICTION_INTERVAL", 1):
+            for i in range(8):
+                cache.set(f"key{i}", "value")
+
+        self.assertEqual(len(cache), 5)
+        self.assertEqual(cache.get_stats()["evictions"], 3)
+
+    def test_tiered_promotes_persistent_hits(self):
+        """Test that persistent hits are promoted into the memory tier."""
+        SQLiteCacheBackend(self.db_path).set("key", "value")
+        cache = TieredCacheBackend(LRUCacheBackend(), SQLiteCacheBackend(self.db_path))
+
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(cache.memory.get("key"), "value")
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_create_llm_cache(self):
+        """Test creating cache backends from configuration."""
+        config = {"cache_path": self.db_path, "cache_ttl": 60}
+
+        self.assertIsInstance(create_llm_cache(dict(config, cache_backend="memory")), LRUCacheBackend)
+        self.assertIsInstance(create_llm_cache(dict(config, cache_backend="sqlite")), SQLiteCacheBackend)
+        self.assertIsInstance(create_llm_cache(config), TieredCacheBackend)
+
+    def test_semantic_index_matches_similar_prompts(self):
+        """Test that near-duplicate prompts for the same model and temperature match."""
+        vectors = {
+            "design a payment service": [1.0, 0.0, 0.0],
+            "design a payments service": [0.99, 0.1, 0.0],
+            "describe a cooking recipe": [0.0, 1.0, 0.0]
+        }
+        index = SemanticCacheIndex(embed_fn=lambda prompt: vectors[prompt], threshold=0.95)
+        index.add("design a payment service", "gpt-4", 0.2, "key1")
+
+        self.assertEqual(index.lookup("design a payments service", "gpt-4", 0.2), "key1")
+        self.assertIsNone(index.lookup("describe a cooking recipe", "gpt-4", 0.2))
+        self.assertIsNone(index.lookup("design a payments service", "gpt-4", 0.7))
+        self.assertIsNone(index.lookup("design a payments service", "gpt-3.5-turbo", 0.2))
+
+        index.remove("key1")
+        self.assertIsNone(index.lookup("design a payments service", "gpt-4", 0.2))
+
+    def test_semantic_index_requires_every_window_to_match(self):
+        """Test that one changed window of a long prompt prevents a hit that pooling would allow."""
+        # Ten section windows with inter-window cosine 0.3, and a rewritten requirements section
+        rng = np.random.default_rng(0)
+        basis = np.linalg.qr(rng.normal(size=(32, 12)))[0].T
+        sections = [0.3 ** 0.5 * basis[0] + 0.7 ** 0.5 * basis[i + 1] for i in range(10)]
+        changed = list(sections)
+        changed[4] = 0.5 * sections[4] + (1 - 0.5 ** 2) ** 0.5 * basis[11]
+        windows = {"original": np.array(sections), "changed": np.array(changed), "same": np.array(sections)}
+
+        pooled_similarity = np.dot(np.mean(sections, axis=0), np.mean(changed, axis=0)) / (
+            np.linalg.norm(np.mean(sections, axis=0)) * np.linalg.norm(np.mean(changed, axis=0)))
+        self.assertGreater(pooled_similarity, 0.97)
+
+        index = SemanticCacheIndex(embed_fn=lambda prompt: windows[prompt], threshold=0.97, max_length_ratio=10)
+        index.add("original", "gpt-4", 0.2, "key1")
+
+        self.assertIsNone(index.lookup("changed", "gpt-4", 0.2))
+        self.assertEqual(index.lookup("same", "gpt-4", 0.2), "key1")
+        self.assertEqual(index.get_stats()["lookups"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for the LLM client registry.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services import llm_clients
+
+
+class TestLLMClientRegistry(unittest.TestCase):
+    """Tests for the process-wide client registry."""
+
+    def setUp(self):
+        """Set up test environment."""
+        llm_clients.close_clients()
+        self.config = {"request_timeout": 60, "http_pool": {"max_connections": 7}}
+
+    def tearDown(self):
+        """Clean up test environment."""
+        llm_clients.close_clients()
+
+    def test_clients_shared_per_api_key(self):
+        """Test that one client is reused per provider and API key."""
+        first = llm_clients.get_client("openai", "sk-test-1", self.config)
+        second = llm_clients.get_client("openai", "sk-test-1", self.config)
+        other = llm_clients.get_client("openai", "sk-test-2", self.config)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(llm_clients.get_registry_stats()["clients"], {"openai": 2})
+
+    def test_transport_uses_pool_settings(self):
+        """Test that configured pool limits and timeouts reach the transport."""
+        import openai
+        options = llm_clients._transport_options(openai, self.config)
+
+        self.assertEqual(options["limits"].max_connections, 7)
+        self.assertEqual(options["limits"].max_keepalive_connections, 20)
+        self.assertEqual(options["timeout"].read, 60)
+        self.assertEqual(options["timeout"].connect, 10.0)
+
+    def test_http2_only_with_h2_installed(self):
+        """Test that HTTP/2 is requested only when h2 is available and not disabled."""
+        import openai
+        with patch.object(llm_clients, "HAVE_H2", False):
+            self.assertNotIn("http2", llm_clients._transport_options(openai, self.config))
+        with patch.object(llm_clients, "HAVE_H2", True):
+            self.assertTrue(llm_clients._transport_options(openai, self.config)["http2"])
+            disabled = {"http_pool": {"http2": False}}
+            self.assertNotIn("http2", llm_clients._transport_options(openai, disabled))
+
+    def test_async_clients_per_event_loop(self):
+        """Test that async clients are shared within a loop but not across loops."""
+        async def get_twice():
+            first = llm_clients.get_async_client("openai", "sk-test-1", self.config)
+            second = llm_clients.get_async_client("openai", "sk-test-1", self.config)
+            return first, second
+
+        first, second = asyncio.run(get_twice())
+        third, _ = asyncio.run(get_twice())
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(llm_clients.get_registry_stats()["async_clients"], {"openai": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,315 @@
+"""
+Unit tests for the optimized LLM service.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.config.config import LLM_CONFIG
+from src.services.optimized_llm_service import OptimizedLLMService
+
+
+class TestOptimizedLLMService(unittest.TestCase):
+    """Tests for the OptimizedLLMService class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        with patch.dict("os.environ", {"OPENAI_API_KEY": "", "ANTHROPIC_API_KEY": ""}), \
+             patch.dict(LLM_CONFIG, {"cache_backend": "memory", "semantic_cache_enabled": False}):
+            self.service = OptimizedLLMService()
+        # Responses are only cached when they come from a provider
+        self.service.client = MagicMock()
+        self.service.api_type = "openai"
+        self.prompt = "Describe the layered architecture pattern in detail"
+
+    def test_agenerate_text_uses_cache(self):
+        """Test that async generation fills and reuses the response cache."""
+        self.service._agenerate_openai = AsyncMock(return_value="async response")
+
+        first = asyncio.run(self.service.agenerate_text(self.prompt))
+        second = asyncio.run(self.service.agenerate_text(self.prompt))
+
+        self.assertEqual(first, "async response")
+        self.assertEqual(second, "async response")
+        self.assertEqual(self.service._agenerate_openai.call_count, 1)
+
+    def test_semantic_cache_hit(self):
+        """Test that an exact-key miss falls back to the semantic index."""
+        self.service._update_cache("original prompt", "gpt-4", 0.2, "cached response")
+        original_key = self.service._generate_cache_key("original prompt", "gpt-4", 0.2)
+        self.service.semantic_cache = MagicMock()
+        self.service.semantic_cache.lookup.return_value = original_key
+
+        response = self.service._check_cache("reworded prompt", "gpt-4", 0.2)
+
+        self.assertEqual(response, "cached response")
+        self.service.semantic_cache.lookup.assert_called_once_with("reworded prompt", "gpt-4", 0.2)
+
+    def test_async_semantic_lookup_runs_off_the_event_loop(self):
+        """Test that async generation embeds prompts for the semantic cache outside the loop thread."""
+        lookup_threads = []
+        self.service.semantic_cache = MagicMock()
+        self.service.semantic_cache.lookup.side_effect = (
+            lambda *args: lookup_threads.append(threading.get_ident())
+        )
+        self.service._agenerate_openai = AsyncMock(return_value="async response")
+
+        async def generate():
+            response = await self.service.agenerate_text(self.prompt)
+            return response, threading.get_ident()
+
+        response, loop_thread = asyncio.run(generate())
+
+        self.assertEqual(response, "async response")
+        self.assertEqual(len(lookup_threads), 1)
+        self.assertNotEqual(lookup_threads[0], loop_thread)
+
+    def test_exact_cache_key_uses_whole_prompt(self):
+        """Test that prompts sharing a tail do not collide."""
+        first = self.service._generate_cache_key("Summarize A. query: same", "gpt-4", 0.2)
+        second = self.service._generate_cache_key("Summarize B. query: same", "gpt-4", 0.2)
+
+        self.assertNotEqual(first, second)
+
+    def test_agenerate_text_retries_with_async_backoff(self):
+        """Test that retries back off with asyncio.sleep instead of blocking."""
+        self.service._agenerate_openai = AsyncMock(side_effect=[RuntimeError("rate limited"), "recovered"])
+
+        with patch("src.services.optimized_llm_service.asyncio.sleep", new=AsyncMock()) as sleep_mock, \
+             patch("src.services.optimized_llm_service.time.sleep") as blocking_sleep:
+            response = asyncio.run(self.service.agenerate_text(self.prompt, use_cache=False))
+
+        self.assertEqual(response, "recovered")
+        sleep_mock.assert_awaited_once_with(2)
+        blocking_sleep.assert_not_called()
+
+    def test_agenerate_text_bounded_concurrency(self):
+        """Test that concurrent requests are limited by the provider semaphore."""
+        self.service.config = dict(self.service.config, max_concurrent_requests={"openai": 2})
+        state = {"active": 0, "peak": 0}
+
+        async def slow_mock(prompt, model, temperature, max_tokens):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return prompt
+
+        self.service._agenerate_openai = slow_mock
+
+        async def run_all():
+            return await asyncio.gather(*[
+                self.service.agenerate_text(f"{self.prompt} {i}", use_cache=False) for i in range(6)
+            ])
+
+        responses = asyncio.run(run_all())
+
+        self.assertEqual(len(responses), 6)
+        self.assertEqual(state["peak"], 2)
+
+    def test_async_semaphore_per_event_loop(self):
+        """Test that event loops running at the same time keep their own provider semaphore."""
+        barrier = threading.Barrier(2)
+        semaphores = {}
+
+        def run_loop(name):
+            async def get_twice():
+                first = self.service._get_async_semaphore()
+                # Let the other loop fetch its semaphore in between
+                await asyncio.get_running_loop().run_in_executor(None, barrier.wait, 5)
+                return first, self.service._get_async_semaphore()
+
+            semaphores[name] = asyncio.run(get_twice())
+
+        threads = [threading.Thread(target=run_loop, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertIs(semaphores["a"][0], semaphores["a"][1])
+        self.assertIs(semaphores["b"][0], semaphores["b"][1])
+        self.assertIsNot(semaphores["a"][0], semaphores["b"][0])
+
+    def test_agenerate_text_cancellation(self):
+        """Test that cancelling the caller cancels the in-flight request."""
+        async def hanging_mock(prompt, model, temperature, max_tokens):
+            await asyncio.sleep(60)
+
+        self.service._agenerate_openai = hanging_mock
+
+        async def cancel_request():
+            task = asyncio.ensure_future(self.service.agenerate_text(self.prompt, use_cache=False))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(cancel_request())
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        """Test that identical concurrent threads share one provider call."""
+        calls = []
+
+        def slow_mock(prompt, model, temperature, max_tokens):
+            calls.append(prompt)
+            time.sleep(0.05)
+            return "shared response"
+
+        self.service._generate_openai = slow_mock
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(self.service.generate_text(self.prompt)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(responses, ["shared response"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_identical_async_requests_are_coalesced(self):
+        """Test that identical concurrent tasks share one provider call."""
+        calls = []
+
+        async def slow_mock(prompt, model, temperature, max_tokens):
+            calls.append(prompt)
+            await asyncio.sleep(0.01)
+            return "shared response"
+
+        self.service._agenerate_openai = slow_mock
+
+        async def run_all():
+            return await asyncio.gather(*[self.service.agenerate_text(self.prompt) for _ in range(5)])
+
+        responses = asyncio.run(run_all())
+
+        self.assertEqual(responses, ["shared response"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_identical_sync_and_async_requests_are_coalesced(self):
+        """Test that a thread and a task asking for the same response share one provider call."""
+        started = threading.Event()
+        release = threading.Event()
+
+        async def slow_mock(prompt, model, temperature, max_tokens):
+            started.set()
+            await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+            return "shared response"
+
+        self.service._agenerate_openai = slow_mock
+        self.service._generate_openai = MagicMock(return_value="sync response")
+        responses = {}
+
+        def run_async():
+            responses["async"] = asyncio.run(self.service.agenerate_text(self.prompt))
+
+        def run_sync():
+            responses["sync"] = self.service.generate_text(self.prompt)
+
+        async_thread = threading.Thread(target=run_async)
+        async_thread.start()
+        started.wait(5)
+        coalesced = self.service._inflight.get_stats()["coalesced"]
+        sync_thread = threading.Thread(target=run_sync)
+        sync_thread.start()
+        while self.service._inflight.get_stats()["coalesced"] == coalesced and sync_thread.is_alive():
+            time.sleep(0.01)
+        release.set()
+        async_thread.join(5)
+        sync_thread.join(5)
+
+        self.assertEqual(responses, {"async": "shared response", "sync": "shared response"})
+        self.service._generate_openai.assert_not_called()
+
+    def test_generate_text_stream_fills_cache(self):
+        """Test that streamed chunks are cached once the stream completes."""
+        self.service._stream_openai = MagicMock(return_value=iter(["Layered ", "architecture"]))
+
+        chunks = list(self.service.generate_text_stream(self.prompt))
+        cached = list(self.service.generate_text_stream(self.prompt))
+
+        self.assertEqual(chunks, ["Layered ", "architecture"])
+        self.assertEqual(cached, ["Layered architecture"])
+        self.assertEqual(self.service._stream_openai.call_count, 1)
+
+    def test_generate_text_stream_interrupted_is_not_cached(self):
+        """Test that a stream failing after partial output is not cached."""
+        def broken_stream(prompt, model, temperature, max_tokens):
+            yield "partial"
+            raise RuntimeError("connection reset")
+
+        self.service._stream_openai = broken_stream
+
+        chunks = []
+        with self.assertRaises(RuntimeError):
+            for chunk in self.service.generate_text_stream(self.prompt):
+                chunks.append(chunk)
+
+        self.assertEqual(chunks, ["partial"])
+        self.assertEqual(len(self.service.cache), 0)
+
+    def test_agenerate_text_stream_falls_back_before_first_chunk(self):
+        """Test that a stream failing before any output uses the retrying path."""
+        async def failing_stream(prompt, model, temperature, max_tokens):
+            raise RuntimeError("stream not supported")
+            yield
+
+        self.service._astream_openai = failing_stream
+        self.service._agenerate_openai = AsyncMock(return_value="full response")
+
+        async def collect():
+            return [chunk async for chunk in self.service.agenerate_text_stream(self.prompt)]
+
+        chunks = asyncio.run(collect())
+
+        self.assertEqual(chunks, ["full response"])
+        self.assertEqual(self.service._check_cache(self.prompt, self.service.model, self.service.temperature),
+                         "full response")
+
+
+    def test_mock_responses_are_not_cached(self):
+        """Test that mock output generated without a provider client is never cached."""
+        self.service.client = None
+        self.service.api_type = "mock"
+        self.service._generate_mock = MagicMock(return_value="mock response")
+
+        self.assertEqual(self.service.generate_text(self.prompt), "mock response")
+        self.assertEqual(self.service.generate_text(self.prompt), "mock response")
+
+        self.assertEqual(self.service._generate_mock.call_count, 2)
+        self.assertEqual(len(self.service.cache), 0)
+
+    def test_fallback_responses_are_not_cached(self):
+        """Test that the fallback returned after exhausted retries is not cached."""
+        self.service.max_retries = 0
+        self.service._generate_openai = MagicMock(side_effect=RuntimeError("provider down"))
+        self.service._agenerate_openai = AsyncMock(side_effect=RuntimeError("provider down"))
+
+        response = self.service.generate_text(self.prompt)
+        async_response = asyncio.run(self.service.agenerate_text(self.prompt))
+
+        self.assertIn("Error generating response", response)
+        self.assertIn("Fallback response", async_response)
+        self.assertEqual(len(self.service.cache), 0)
+
+    def test_cache_key_depends_on_provider(self):
+        """Test that responses cached for one provider are not served for another."""
+        openai_key = self.service._generate_cache_key(self.prompt, "gpt-4", 0.2)
+        self.service.api_type = "mock"
+
+        self.assertNotEqual(self.service._generate_cache_key(self.prompt, "gpt-4", 0.2), openai_key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the retrieval result cache.
+"""
+
+import unittest
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services.retrieval_cache import RetrievalCache
+
+
+class TestRetrievalCache(unittest.TestCase):
+    """Tests for the RetrievalCache class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.cache = RetrievalCache(max_entries=2)
+        self.documents = [{"id": "doc1", "relevance": 0.9}]
+
+    def test_normalized_query_hits(self):
+        """Test that case and whitespace differences share an entry and hits are counted."""
+        self.cache.put(RetrievalCache.make_key("API  Gateway", 0.45, 5, "kb", "1:10"), self.documents)
+
+        cached = self.cache.get(RetrievalCache.make_key("api gateway", 0.45, 5, "kb", "1:10"))
+
+        self.assertEqual(cached, self.documents)
+        self.assertIsNone(self.cache.get(RetrievalCache.make_key("api gateway", 0.45, 5, "kb", "2:12")))
+        self.assertEqual(self.cache.get_stats()["hit_rate"], 0.5)
+
+    def test_returns_copies(self):
+        """Test that callers cannot modify cached results."""
+        key = RetrievalCache.make_key("saga", 0.45, 5, "kb", "1:10")
+        self.cache.put(key, self.documents)
+
+        self.cache.get(key)[0]["relevance"] = 0.0
+
+        self.assertEqual(self.cache.get(key)[0]["relevance"], 0.9)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted first."""
+        keys = [RetrievalCache.make_key(query, 0.45, 5, "kb", "1:10") for query in ("a", "b", "c")]
+        self.cache.put(keys[0], self.documents)
+        self.cache.put(keys[1], self.documents)
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], self.documents)
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertEqual(self.cache.get_stats()["evictions"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
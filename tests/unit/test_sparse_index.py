@@ -0,0 +1,78 @@
+"""
+Unit tests for BM25 retrieval and rank fusion.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services.sparse_index import BM25Index, tokenize, reciprocal_rank_fusion, weighted_score_fusion
+
+
+class TestBM25Index(unittest.TestCase):
+    """Tests for the BM25Index class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "bm25.json")
+        self.index = BM25Index(self.path)
+        self.index.add(
+            ["cqrs", "saga", "general"],
+            ["CQRS separates the command model from the query model.",
+             "A saga coordinates long-running transactions across services.",
+             "Services communicate over the network and share a model of the domain."]
+        )
+
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_exact_identifier_ranks_first(self):
+        """Test that a rare identifier outranks common terms."""
+        results = self.index.search("CQRS model", top_k=3)
+
+        self.assertEqual(results[0][0], "cqrs")
+        self.assertEqual(self.index.search("saga")[0][0], "saga")
+
+    def test_replace_remove_and_persist(self):
+        """Test that replaced and removed chunks are reflected after a reload."""
+        self.index.add(["saga"], ["Choreography with events."])
+        self.index.remove(["general"])
+        self.index.save()
+
+        reloaded = BM25Index(self.path)
+
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.search("saga"), [])
+        self.assertEqual(reloaded.search("choreography")[0][0], "saga")
+
+    def test_tokenize_keeps_compound_identifiers(self):
+        """Test that hyphenated identifiers stay single tokens and stopwords are dropped."""
+        self.assertEqual(tokenize("The event-sourcing of TOGAF ADM"), ["event-sourcing", "togaf", "adm"])
+
+
+class TestFusion(unittest.TestCase):
+    """Tests for rank fusion."""
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        """Test that ids ranked by both lists come first."""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]])
+
+        self.assertEqual([doc_id for doc_id, _ in fused], ["a", "c", "b"])
+
+    def test_weighted_fusion_normalizes_scores(self):
+        """Test that score scales do not dominate the weighted fusion."""
+        fused = weighted_score_fusion([[("a", -0.1), ("b", -0.5)], [("b", 40.0), ("c", 2.0)]], weights=[1.0, 0.5])
+
+        self.assertEqual([doc_id for doc_id, _ in fused], ["a", "b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Unit tests for server-sent event streaming.
+"""
+
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.api.sse import sse_event, sse_text_stream
+
+
+async def _collect(chunks):
+    return [event async for event in sse_text_stream(chunks)]
+
+
+class TestSSETextStream(unittest.TestCase):
+    """Tests for sse_text_stream."""
+
+    def test_complete_stream_ends_with_done(self):
+        """Test that a finished stream relays every chunk and ends with a done event."""
+        async def chunks():
+            yield "Layered "
+            yield "architecture"
+
+        events = asyncio.run(_collect(chunks()))
+
+        self.assertEqual(events, [
+            sse_event({"delta": "Layered "}),
+            sse_event({"delta": "architecture"}),
+            sse_event({}, event="done")
+        ])
+
+    def test_failed_stream_ends_with_error(self):
+        """Test that a stream failing after partial output ends with an error event, not done."""
+        async def chunks():
+            yield "partial"
+            raise RuntimeError("connection reset")
+
+        events = asyncio.run(_collect(chunks()))
+
+        self.assertEqual(events, [
+            sse_event({"delta": "partial"}),
+            sse_event({"error": "connection reset"}, event="error")
+        ])
+        self.assertTrue(events[-1].startswith("event: error\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
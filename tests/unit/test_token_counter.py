@@ -0,0 +1,65 @@
+"""
+Unit tests for the token counter.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+from pathlib import Path
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.token_counter import TokenCounter, heuristic_token_count
+
+
+class TestTokenCounter(unittest.TestCase):
+    """Tests for the TokenCounter class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.counter = TokenCounter(max_entries=2, claude_calibration=1.5)
+        # Never download encodings during tests
+        self.counter._get_encoding = MagicMock(return_value=None)
+
+    def test_heuristic_counts_structured_text(self):
+        """Test that JSON and code are not counted as a handful of words."""
+        text = '{"service": "auth", "replicas": 3, "ports": [8080, 8443]}'
+
+        self.assertGreater(heuristic_token_count(text), len(text.split()) * 1.3)
+        self.assertEqual(heuristic_token_count("hello world"), 2)
+
+    def test_counts_are_memoized(self):
+        """Test that repeated texts are only tokenized once."""
+        with patch.object(self.counter, "_count_uncached", return_value=7) as count_mock:
+            first = self.counter.count("repeated template section", "gpt-4")
+            second = self.counter.count("repeated template section", "gpt-4")
+
+        self.assertEqual(first, second)
+        self.assertEqual(count_mock.call_count, 1)
+        self.assertEqual(self.counter.get_stats()["hits"], 1)
+
+    def test_memo_is_bounded(self):
+        """Test that the least recently used counts are evicted."""
+        for text in ["one", "two", "three"]:
+            self.counter.count(text, "gpt-4")
+
+        self.assertEqual(self.counter.get_stats()["entries"], 2)
+
+    def test_claude_calibration(self):
+        """Test that Claude counts are scaled from the base count."""
+        with patch.object(self.counter, "_count_uncached", return_value=10):
+            self.assertEqual(self.counter.count("some text", "gpt-4"), 10)
+            self.assertEqual(self.counter.count("some text", "claude-3-opus"), 15)
+
+    def test_uses_tiktoken_encoding(self):
+        """Test that a loaded encoding is used for exact counts."""
+        encoding = MagicMock()
+        encoding.encode.return_value = [1, 2, 3, 4]
+        self.counter._get_encoding = MagicMock(return_value=encoding)
+
+        self.assertEqual(self.counter.count("def main(): pass", "gpt-4"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
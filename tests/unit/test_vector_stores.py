@@ -0,0 +1,179 @@
+"""
+Unit tests for the local vector store backends.
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.services import vector_stores
+from src.services.vector_stores import (
+    ANNCollection, ExactSearchView, FaissHNSWIndex, DEFAULT_ANN_SETTINGS, compare_collections
+)
+
+
+class FakeANNIndex:
+    """Brute-force stand-in for an ANN index with the same interface."""
+
+    loaded = 0
+
+    def __init__(self, dim, settings):
+        self.vectors = {}
+        self.deleted = set()
+
+    def add(self, vectors, labels):
+        self.vectors.update(zip(labels.tolist(), np.asarray(vectors)))
+
+    def delete(self, labels):
+        self.deleted.update(labels)
+
+    def search(self, queries, k):
+        labels = [label for label in self.vectors if label not in self.deleted]
+        matrix = np.vstack([self.vectors[label] for label in labels])
+        similarities = queries @ matrix.T
+        order = np.argsort(-similarities, axis=1)[:, :k]
+        return np.array(labels)[order], np.take_along_axis(similarities, order, axis=1)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            f.write("fake")
+
+    def load(self, path, deleted):
+        FakeANNIndex.loaded += 1
+        raise RuntimeError("fake index cannot be loaded")
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class TestANNCollection(unittest.TestCase):
+    """Tests for the ANNCollection class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_patch = patch.dict(vector_stores.ANN_INDEXES, {"hnsw": FakeANNIndex})
+        self.index_patch.start()
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.index_patch.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def _collection(self, backend="flat", **settings):
+        return ANNCollection(f"{self.temp_dir}/kb_{backend}", backend=backend, settings=settings)
+
+    def _fill(self, collection):
+        collection.upsert(
+            ids=["a", "b", "c"],
+            documents=["doc a", "doc b", "doc c"],
+            metadatas=[{"source": "x.md"}, {"source": "y.md"}, {"source": "x.md"}],
+            embeddings=[unit(1, 0, 0), unit(0, 1, 0), unit(1, 1, 0)]
+        )
+
+    def test_exact_query_and_metadata_filters(self):
+        """Test nearest-neighbour order, cosine distances and source filters."""
+        collection = self._collection()
+        self._fill(collection)
+
+        result = collection.query(query_embeddings=[unit(1, 0.1, 0)], n_results=2)
+        by_source = collection.get(where={"source": "x.md"})
+
+        self.assertEqual(result["ids"][0], ["a", "c"])
+        self.assertAlmostEqual(result["distances"][0][0], 1 - np.dot(unit(1, 0.1, 0), unit(1, 0, 0)), places=5)
+        self.assertEqual(result["documents"][0], ["doc a", "doc c"])
+        self.assertEqual(sorted(by_source["ids"]), ["a", "c"])
+
+    def test_upsert_replaces_and_delete_removes(self):
+        """Test that replaced and deleted chunks are not returned by the ANN index."""
+        collection = self._collection("hnsw")
+        self._fill(collection)
+
+        collection.upsert(ids=["a"], documents=["doc a2"], metadatas=[{"source": "x.md"}],
+                          embeddings=[unit(0, 0, 1)])
+        collection.delete(ids=["b"])
+        result = collection.query(query_embeddings=[unit(0, 0.2, 1)], n_results=5)
+
+        self.assertEqual(collection.count(), 2)
+        self.assertEqual(result["ids"][0], ["a", "c"])
+        self.assertEqual(result["documents"][0][0], "doc a2")
+
+    def test_reopen_rebuilds_unloadable_index_and_compacts(self):
+        """Test persistence across instances, index rebuild and compaction of deleted rows."""
+        collection = self._collection("hnsw", ann_compact_ratio=0.25)
+        self._fill(collection)
+        collection.delete(ids=["a", "b"])
+        collection.save()
+
+        reopened = self._collection("hnsw")
+        result = reopened.query(query_embeddings=[unit(1, 1, 0)], n_results=3, include=["embeddings"])
+
+        self.assertEqual(reopened._rows(), 1)
+        self.assertEqual(FakeANNIndex.loaded, 1)
+        self.assertEqual(result["ids"][0], ["c"])
+        np.testing.assert_allclose(result["embeddings"][0][0], unit(1, 1, 0), rtol=1e-6)
+
+    def test_compare_with_exact_search(self):
+        """Test recall and latency reporting against exact search."""
+        collection = self._collection("hnsw")
+        self._fill(collection)
+
+        comparison = compare_collections(ExactSearchView(collection), collection,
+                                         [unit(1, 0, 0), unit(0, 1, 0)], k=2)
+
+        self.assertEqual(comparison["recall_at_k"], 1.0)
+        self.assertEqual(comparison["queries"], 2)
+        self.assertIn("p95_ms", comparison["candidate_latency"])
+
+
+class TestFaissHNSWIndex(unittest.TestCase):
+    """Tests for loading the FaissHNSWIndex class."""
+
+    def setUp(self):
+        """Set up test environment."""
+        self.faiss = MagicMock()
+        self.faiss_patch = patch.multiple(vector_stores, faiss=self.faiss, HAVE_FAISS=True, create=True)
+        self.faiss_patch.start()
+        self.faiss.read_index.side_effect = lambda path, *flags: MagicMock(ntotal=2, flags=flags)
+        self.index = FaissHNSWIndex(3, DEFAULT_ANN_SETTINGS)
+
+    def tearDown(self):
+        """Clean up test environment."""
+        self.faiss_patch.stop()
+
+    def test_load_maps_index_until_first_add(self):
+        """Test that a saved index is memory-mapped and read into memory before it is modified."""
+        self.index.load("index.bin", [1])
+
+        self.assertEqual(self.index.index.flags, (self.faiss.IO_FLAG_MMAP,))
+        self.assertEqual(self.index.deleted, {1})
+
+        self.index.add(np.zeros((1, 3), dtype=np.float32), np.array([2]))
+        self.index.add(np.zeros((1, 3), dtype=np.float32), np.array([2]))
+
+        self.assertEqual(self.index.index.flags, ())
+        self.assertEqual(self.faiss.read_index.call_count, 2)
+        self.assertEqual(self.index.index.add.call_count, 2)
+
+    def test_load_without_mmap_support(self):
+        """Test that FAISS builds unable to map the index read it into memory."""
+        self.faiss.read_index.side_effect = [RuntimeError("mmap not supported"), MagicMock(ntotal=2)]
+
+        self.index.load("index.bin", [])
+        self.index.add(np.zeros((1, 3), dtype=np.float32), np.array([2]))
+
+        self.assertEqual(self.faiss.read_index.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for the asynchronous knowledge-base crawler.
+"""
+
+import re
+import asyncio
+import time
+import unittest
+from pathlib import Path
+
+import httpx
+
+# Add project root to Python path
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from src.utils.web_crawler import AsyncCrawler, CrawlFrontier, TokenBucket
+
+PAGES = {
+    "/": '<a href="/a">a</a> <a href="/b#section">b</a>',
+    "/a": '<a href="/b">b</a> <a href="/private">private</a> <a href="/deep">deep</a>',
+    "/b": "",
+    "/deep": '<a href="/deeper">deeper</a>',
+    "/private": "",
+    "/robots.txt": "User-agent: *\nDisallow: /private\n"
+}
+
+
+def site_handler(request):
+    if request.url.path in PAGES:
+        return httpx.Response(200, text=PAGES[request.url.path])
+    return httpx.Response(404)
+
+
+class TestAsyncCrawler(unittest.TestCase):
+    """Tests for the AsyncCrawler class."""
+
+    def _crawl(self, max_depth):
+        visited = []
+
+        async def handle(url, response, depth):
+            visited.append((url, depth))
+            return [str(response.url.join(href)) for href in
+                    re.findall(r'href="([^"]+)"', response.text)]
+
+        async def run():
+            async with AsyncCrawler("test-agent", rate_limit=1000,
+                                    transport=httpx.MockTransport(site_handler)) as crawler:
+                await crawler.crawl(["https://docs.example.com/"], handle, max_depth=max_depth)
+                return crawler.get_stats()
+
+        return visited, asyncio.run(run())
+
+    def test_crawl_is_breadth_first_within_depth(self):
+        """Test that pages are visited once, by depth, and robots.txt is honored."""
+        visited, stats = self._crawl(max_depth=2)
+
+        self.assertEqual(visited, [
+            ("https://docs.example.com/", 0),
+            ("https://docs.example.com/a", 1),
+            ("https://docs.example.com/b", 1),
+            ("https://docs.example.com/deep", 2)
+        ])
+        self.assertEqual(stats["blocked_by_robots"], 1)
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency requests are in flight."""
+        in_flight = 0
+        peak = 0
+
+        async def slow_handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, text="ok")
+
+        async def run():
+            async with AsyncCrawler("test-agent", max_concurrency=3, rate_limit=1000, respect_robots=False,
+                                    transport=httpx.MockTransport(slow_handler)) as crawler:
+                await asyncio.gather(*(crawler.fetch(f"https://host{i}.example.com/") for i in range(10)))
+
+        asyncio.run(run())
+
+        self.assertEqual(peak, 3)
+
+    def test_token_bucket_spaces_requests(self):
+        """Test that a host's requests are spaced by its rate."""
+        async def run():
+            bucket = TokenBucket(rate=20)
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.09)
+
+    def test_frontier_orders_by_priority_and_dedupes(self):
+        """Test that the frontier pops lower priorities first and ignores repeats."""
+        frontier = CrawlFrontier()
+        frontier.push("https://example.com/deep", 2)
+        frontier.push("https://example.com/top", 0)
+        self.assertFalse(frontier.push("https://example.com/top#anchor", 1))
+
+        self.assertEqual(frontier.pop(), ("https://example.com/top", 0))
+        self.assertEqual(len(frontier), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()